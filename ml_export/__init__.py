@@ -0,0 +1 @@
+"""Windowed, sharded ML exports of harmonized trials."""
@@ -0,0 +1,312 @@
+"""
+Windowed export: harmonized trials → fixed-length labelled windows in sharded files.
+
+Every trial matching the catalog filters is cut into overlapping windows of
+--window seconds (hop = window * (1 - --overlap)) with a strided view
+(numpy sliding_window_view, no copy until a window is written). Each window
+carries the trial's dataset, pid, session and activity, plus the trial number
+and start sample it came from. Windows touching a NaN/inf sample are dropped.
+
+Windows are written in order into shards of exactly --shard-size windows (the
+last one may be shorter):
+
+  06_windows/<name>/shard-00000.npz     X (n, channels, window) float32, label arrays
+  06_windows/<name>/shard-00001.npz
+  06_windows/<name>/index.json          channels, fs, window, hop, shards, trials, label counts
+
+--format parquet writes shard-NNNNN.parquet instead: one row per window, the label
+columns plus one fixed-size list column per channel. Window i of the export is
+row i % shard_size of shard i // shard_size, so a training job can stream the
+shards in order (iter_shards) or seek to any window without reading the rest.
+
+Trials come from the catalog (sync_columns/catalog.py), so run `catalog.py scan`
+first. The default input is 05_restruc, where every trial has a single activity;
+all trials must be at the same rate (the harmonized stages are at TARGET_FS) and
+must have every exported channel.
+
+Usage:
+  python window_export.py --channels L_FOOT_ACC_X L_FOOT_ACC_Y L_FOOT_ACC_Z
+  python window_export.py --dataset HUGADB YARETA --channels "*_SHANK_ACC_*" --window 2.56 --overlap 0.5
+  python window_export.py --stage 04_freq_unit_synced --activity %Gait% --format parquet --name gait
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from sync_columns.config import (
+    BLUE, GREEN, YELLOW, RESET, CATALOG_PATH, PARQUET_COMPRESSION, SENSOR_DTYPE, TARGET_FS, WINDOWS_DIR,
+)
+from sync_columns.catalog import Catalog
+from sync_columns.loader import DEFAULT_PREFETCH, SENSOR_CHANNELS, TrialSet, check_channels, is_channel_pattern
+
+SHARD_FORMATS = ("npz", "parquet")
+DEFAULT_WINDOW_S = 2.0
+DEFAULT_OVERLAP = 0.5
+DEFAULT_SHARD_SIZE = 4096      # windows per shard
+DEFAULT_STAGE = "05_restruc"
+INDEX_FILE = "index.json"
+LABEL_FIELDS = ("dataset", "pid", "session", "activity")
+
+
+def window_starts(n_samples, window, hop):
+    """Start sample of every full window in a trial of n_samples."""
+    if n_samples < window:
+        return np.empty(0, dtype=np.int64)
+    return np.arange(0, n_samples - window + 1, hop, dtype=np.int64)
+
+
+def make_windows(data, window, hop):
+    """
+    (n_windows, n_channels, window) strided view of a (n_channels, n_samples) array
+    and the start sample of each window. Windows with a non-finite sample are left out.
+    """
+    starts = window_starts(data.shape[1], window, hop)
+    if not len(starts):
+        return np.empty((0, data.shape[0], window), dtype=data.dtype), starts
+    view = sliding_window_view(data, window, axis=1)[:, ::hop].transpose(1, 0, 2)
+    bad = np.concatenate([[0], np.cumsum(~np.isfinite(data).all(axis=0))])
+    keep = bad[starts + window] == bad[starts]
+    if keep.all():
+        return view, starts
+    return view[keep], starts[keep]
+
+
+def expand_channels(channels):
+    """Exact channel list for an export: patterns expand over every SEGMENT_SENSOR_AXIS name."""
+    check_channels(channels)
+    out = []
+    for name in channels:
+        out.extend(fnmatch.filter(SENSOR_CHANNELS, name) if is_channel_pattern(name) else [name])
+    return list(dict.fromkeys(out))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Shards
+# ══════════════════════════════════════════════════════════════════════════════
+
+def shard_name(i, fmt):
+    return f"shard-{i:05d}.{fmt}"
+
+
+def write_shard(path, X, labels, channels, fmt):
+    """Write one shard atomically (tmp file + rename)."""
+    tmp = f"{path}.tmp"
+    if fmt == "npz":
+        with open(tmp, "wb") as f:
+            np.savez(f, X=X, **labels)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        cols = {k: pa.array(v) for k, v in labels.items()}
+        for c, name in enumerate(channels):
+            flat = pa.array(np.ascontiguousarray(X[:, c, :]).ravel())
+            cols[name] = pa.FixedSizeListArray.from_arrays(flat, X.shape[2])
+        pq.write_table(pa.table(cols), tmp, compression=PARQUET_COMPRESSION)
+    os.replace(tmp, path)
+
+
+def read_shard(path, channels=None):
+    """(X, labels) of one shard; X is (n, channels, window)."""
+    if path.endswith(".npz"):
+        with np.load(path) as z:
+            labels = {k: z[k] for k in z.files if k != "X"}
+            return z["X"], labels
+    import pyarrow.parquet as pq
+    table = pq.read_table(path)
+    if channels is None:
+        channels = [c for c in table.column_names if c not in LABEL_FIELDS + ("trial", "start")]
+    n = table.num_rows
+    X = np.stack([table[c].combine_chunks().flatten().to_numpy().reshape(n, -1) for c in channels], axis=1)
+    labels = {k: table[k].to_numpy() for k in table.column_names if k not in channels}
+    return X, labels
+
+
+def load_index(export_dir):
+    with open(os.path.join(export_dir, INDEX_FILE)) as f:
+        return json.load(f)
+
+
+def iter_shards(export_dir):
+    """Yield (X, labels) shard by shard, in window order."""
+    index = load_index(export_dir)
+    for shard in index["shards"]:
+        yield read_shard(os.path.join(export_dir, shard["file"]), index["channels"])
+
+
+class ShardWriter:
+    """Buffers windows and labels, writing a shard each time shard_size windows are in."""
+
+    def __init__(self, out_dir, channels, window, shard_size, fmt, dtype):
+        self.out_dir = out_dir
+        self.channels = channels
+        self.shard_size = shard_size
+        self.fmt = fmt
+        self.X = np.empty((shard_size, len(channels), window), dtype=dtype)
+        self.labels = {k: [] for k in LABEL_FIELDS}
+        self.trial = np.empty(shard_size, dtype=np.int32)
+        self.start = np.empty(shard_size, dtype=np.int64)
+        self.fill = 0
+        self.shards = []
+
+    @property
+    def n_windows(self):
+        return sum(s["n_windows"] for s in self.shards) + self.fill
+
+    def add(self, windows, starts, trial_no, meta):
+        """Append a trial's windows; meta supplies the label fields."""
+        i = 0
+        while i < len(windows):
+            n = min(len(windows) - i, self.shard_size - self.fill)
+            sl = slice(self.fill, self.fill + n)
+            self.X[sl] = windows[i:i + n]
+            self.trial[sl] = trial_no
+            self.start[sl] = starts[i:i + n]
+            for k in LABEL_FIELDS:
+                self.labels[k].extend([str(meta.get(k) or "")] * n)
+            self.fill += n
+            i += n
+            if self.fill == self.shard_size:
+                self.flush()
+
+    def flush(self):
+        if not self.fill:
+            return
+        name = shard_name(len(self.shards), self.fmt)
+        labels = {k: np.array(v, dtype=str) for k, v in self.labels.items()}
+        labels["trial"] = self.trial[:self.fill]
+        labels["start"] = self.start[:self.fill]
+        write_shard(os.path.join(self.out_dir, name), self.X[:self.fill], labels, self.channels, self.fmt)
+        self.shards.append({"file": name, "n_windows": self.fill})
+        self.labels = {k: [] for k in LABEL_FIELDS}
+        self.fill = 0
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Export
+# ══════════════════════════════════════════════════════════════════════════════
+
+def select_trials(cat, channels, datasets=None, stage=DEFAULT_STAGE, activity=None, pid=None):
+    """Catalog entries with every channel, over one or more dataset patterns."""
+    found = {}
+    for ds in datasets or [None]:
+        for t in cat.find(dataset=ds, stage=stage, activity=activity, pid=pid, channels=channels):
+            found[t["path"]] = t
+    return [found[p] for p in sorted(found)]
+
+
+def export_windows(channels, out_dir, datasets=None, stage=DEFAULT_STAGE, activity=None, pid=None,
+                   window_s=DEFAULT_WINDOW_S, overlap=DEFAULT_OVERLAP, fs=TARGET_FS,
+                   shard_size=DEFAULT_SHARD_SIZE, fmt="npz", dtype=SENSOR_DTYPE, seed=None,
+                   catalog=CATALOG_PATH, prefetch=DEFAULT_PREFETCH):
+    """Window every matching trial into shards under out_dir; returns the index dict."""
+    if fmt not in SHARD_FORMATS:
+        raise ValueError(f"Unknown shard format '{fmt}' (choose from {', '.join(SHARD_FORMATS)})")
+    if not 0 <= overlap < 1:
+        raise ValueError("overlap must be in [0, 1)")
+    channels = expand_channels(channels)
+    window = int(round(window_s * fs))
+    hop = max(int(round(window * (1 - overlap))), 1)
+    if window < 1:
+        raise ValueError(f"Window of {window_s} s at {fs:g} Hz has no samples")
+
+    with Catalog(catalog) as cat:
+        trials = select_trials(cat, channels, datasets, stage, activity, pid)
+        root = cat.root
+    off_rate = [t for t in trials if t["fs"] is not None and abs(t["fs"] - fs) > 1e-6]
+    if off_rate:
+        print(f"{YELLOW}[WARN] Skipping {len(off_rate)} trials not at {fs:g} Hz "
+              f"(e.g. {off_rate[0]['path']} at {off_rate[0]['fs']:g} Hz){RESET}")
+        trials = [t for t in trials if t not in off_rate]
+    if seed is not None:
+        random.Random(seed).shuffle(trials)  # mixes subjects / datasets across shards
+
+    print(f"{BLUE}WINDOW EXPORT: {len(trials)} trials, {len(channels)} channels, "
+          f"window {window} / hop {hop} samples at {fs:g} Hz{RESET}")
+    print(f"  → {out_dir}")
+    os.makedirs(out_dir, exist_ok=True)
+    old_shards = {e.name for e in os.scandir(out_dir) if e.name.startswith("shard-")}
+
+    writer = ShardWriter(out_dir, channels, window, shard_size, fmt, dtype)
+    trial_index, counts = [], {k: {} for k in ("dataset", "activity")}
+    t0 = time.perf_counter()
+    for no, trial in enumerate(TrialSet(trials, channels, prefetch=prefetch, dtype=dtype, errors="keep")):
+        rel = Path(os.path.relpath(trial.path, root)).as_posix()
+        if trial.error:
+            print(f"  {YELLOW}[SKIP]{RESET} {rel}: {trial.error}")
+            continue
+        windows, starts = make_windows(trial.data, window, hop)
+        first = writer.n_windows
+        writer.add(windows, starts, no, trials[no])
+        trial_index.append({"trial": no, "path": rel, "first_window": first,
+                            "n_windows": len(windows), "n_samples": len(trial),
+                            **{k: trials[no].get(k) for k in LABEL_FIELDS}})
+        for k in counts:
+            key = str(trials[no].get(k) or "")
+            counts[k][key] = counts[k].get(key, 0) + len(windows)
+    writer.flush()
+
+    index = {"channels": channels, "fs": fs, "window": window, "hop": hop, "window_s": window_s,
+             "overlap": overlap, "dtype": np.dtype(dtype).name, "format": fmt, "shard_size": shard_size,
+             "n_windows": writer.n_windows, "stage": stage, "seed": seed,
+             "label_counts": counts, "shards": writer.shards, "trials": trial_index}
+    tmp = os.path.join(out_dir, INDEX_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, os.path.join(out_dir, INDEX_FILE))
+    for name in old_shards - {s["file"] for s in writer.shards}:
+        os.remove(os.path.join(out_dir, name))  # left over from a larger previous export
+
+    print(f"\n{GREEN}SUMMARY{RESET}: {index['n_windows']} windows from {len(trial_index)} trials "
+          f"in {len(writer.shards)} shards, {time.perf_counter() - t0:.1f} s")
+    for act, n in sorted(counts["activity"].items(), key=lambda kv: -kv[1]):
+        print(f"  {act or '(no activity)':<30} {n:>8}")
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", nargs="+", required=True,
+                        help="SEGMENT_SENSOR_AXIS names or patterns (e.g. \"*_SHANK_ACC_*\")")
+    parser.add_argument("--dataset", nargs="+", default=None, help="Dataset names or LIKE patterns (default: all)")
+    parser.add_argument("--stage", default=DEFAULT_STAGE, help=f"Input stage (default: {DEFAULT_STAGE})")
+    parser.add_argument("--activity", default=None, help="LIKE pattern, e.g. %%walk%%")
+    parser.add_argument("--pid", default=None, help="LIKE pattern")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW_S, metavar="SECONDS",
+                        help=f"Window length (default: {DEFAULT_WINDOW_S:g} s)")
+    parser.add_argument("--overlap", type=float, default=DEFAULT_OVERLAP,
+                        help=f"Fraction shared by consecutive windows (default: {DEFAULT_OVERLAP:g})")
+    parser.add_argument("--fs", type=float, default=TARGET_FS,
+                        help=f"Rate of the input trials in Hz (default: TARGET_FS = {TARGET_FS:g})")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, metavar="N",
+                        help=f"Windows per shard (default: {DEFAULT_SHARD_SIZE})")
+    parser.add_argument("--format", choices=SHARD_FORMATS, default="npz", help="Shard format (default: npz)")
+    parser.add_argument("--dtype", default=SENSOR_DTYPE, help=f"Window dtype (default: {SENSOR_DTYPE})")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Shuffle the trial order with this seed (default: catalog order)")
+    parser.add_argument("--name", default=None, help="Export directory under 06_windows (default: from the filters)")
+    parser.add_argument("--output-dir", default=None, help="Write here instead of 06_windows/<name>")
+    parser.add_argument("--catalog", default=CATALOG_PATH, help="SQLite file (default: CATALOG_PATH)")
+    args = parser.parse_args()
+
+    name = args.name or "{}_{}_w{:g}s_o{:g}".format("+".join(args.dataset or ["all"]), args.stage,
+                                                   args.window, args.overlap)
+    out_dir = args.output_dir or os.path.join(WINDOWS_DIR, name.replace("%", ""))
+    export_windows(args.channels, out_dir, datasets=args.dataset, stage=args.stage, activity=args.activity,
+                   pid=args.pid, window_s=args.window, overlap=args.overlap, fs=args.fs,
+                   shard_size=args.shard_size, fmt=args.format, dtype=args.dtype, seed=args.seed,
+                   catalog=args.catalog)
+
+
+if __name__ == "__main__":
+    main()
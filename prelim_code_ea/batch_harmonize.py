@@ -3,6 +3,7 @@ import re
 import pandas as pd
 from pathlib import Path
 import sys
+from functools import lru_cache
 
 # Import your existing script
 # Assuming your script is named 'harmonize_columns.py' - adjust as needed
@@ -476,8 +477,32 @@ order_standard = {
     'axis': []
 }
 
+# Patterns are compiled once. ANY_PATTERN is one alternation of all of them, so a
+# column that matches no convention is rejected with a single search.
+COMPILED_PATTERNS = {
+    p: re.compile(p)
+    for p in (pattern_hugadb, pattern_xsens_sensor, pattern_xsens_angular, pattern_standard)
+}
+ANY_PATTERN = re.compile("|".join(f"(?:{p})" for p in COMPILED_PATTERNS))
+
 # ============================================================================
 # HELPER FUNCTIONS
+
+# Every NEWBEE file repeats the same header, so per-column results below are memoized
+# on the column name.
+@lru_cache(maxsize=None)
+def _pattern_hits(col):
+    """(HuGaDB, Xsens, Standard) pattern matches for one column name."""
+    if not ANY_PATTERN.search(col):
+        return False, False, False
+    return (
+        bool(COMPILED_PATTERNS[pattern_hugadb].search(col)),
+        bool(COMPILED_PATTERNS[pattern_xsens_sensor].search(col)
+             or COMPILED_PATTERNS[pattern_xsens_angular].search(col)),
+        bool(COMPILED_PATTERNS[pattern_standard].search(col)),
+    )
+
+
 # ============================================================================
 
 def detect_dataset_type(columns):
@@ -487,16 +512,16 @@ def detect_dataset_type(columns):
     """
     sample_cols = columns[:100]  # Check first 100 columns
     
+    hits = [_pattern_hits(col) for col in sample_cols]
+    
     # Check for HuGaDB pattern (sensor_side_bodypart_axis)
-    hugadb_matches = sum(1 for col in sample_cols if re.search(pattern_hugadb, col))
+    hugadb_matches = sum(h[0] for h in hits)
     
     # Check for Xsens pattern (sensorType or angularVelocity prefix)
-    xsens_matches = sum(1 for col in sample_cols 
-                       if re.search(pattern_xsens_sensor, col) or 
-                          re.search(pattern_xsens_angular, col))
+    xsens_matches = sum(h[1] for h in hits)
     
     # Check for standard pattern (lowercase_CamelCase_axis)
-    standard_matches = sum(1 for col in sample_cols if re.search(pattern_standard, col))
+    standard_matches = sum(h[2] for h in hits)
     
     if DEBUG_MODE:
         print(f"    Pattern detection: HuGaDB={hugadb_matches}, Xsens={xsens_matches}, Standard={standard_matches}")
@@ -513,15 +538,23 @@ def detect_dataset_type(columns):
 
 def harmonize_column_name(col_name, pattern, order):
     """
-    Wrapper around your regex_meta_harmonize function.
+    Same result as regex_meta_harmonize, using the precompiled pattern.
     Returns the harmonized column name or None if not ACC/GYR/MAG.
     """
-    # Make a fresh copy of order dict for this call
-    order_copy = {key: [] for key in order.keys()}
-    
+    return _harmonize_column_name(col_name, pattern, tuple(order.keys()))
+
+
+@lru_cache(maxsize=None)
+def _harmonize_column_name(col_name, pattern, order_keys):
+    compiled = COMPILED_PATTERNS.get(pattern) or re.compile(pattern)
     try:
-        # Call your existing function
-        result = regex_meta_harmonize(col_name, pattern, order_copy)
+        match = compiled.search(col_name)
+        if not match:
+            return None
+        sub1, sub2, sub3 = match.groups() # based on the pattern defined
+        parts_by_key = dict(zip(order_keys, [sub1, sub2, sub3]))
+        result = (f"{get_segment(parts_by_key['segment'])}_"
+                  f"{get_sensor(parts_by_key['sensor'])}_{parts_by_key['axis'].upper()}")
         
         # Check if result contains ACC, GYR, or MAG
         if result and not result.startswith("UNKNOWN"):
@@ -539,11 +572,15 @@ def harmonize_column_name(col_name, pattern, order):
     return None
 
 
+@lru_cache(maxsize=None)
 def try_all_patterns(col_name):
     """
     Try all available patterns to harmonize a column name.
     Returns harmonized name or None if no pattern matches.
     """
+    if not ANY_PATTERN.search(col_name):
+        return None
+    
     # Try HuGaDB pattern
     result = harmonize_column_name(col_name, pattern_hugadb, order_hugadb)
     if result:
@@ -582,6 +619,93 @@ def show_sample_columns(columns, n=10):
         print(f"      - {col}")
 
 
+def build_column_mapping(original_cols):
+    """
+    Detect the dataset type of a header and harmonize its columns.
+    Returns (dataset_type, column_mapping, skipped_columns).
+    """
+    dataset_type = detect_dataset_type(original_cols)
+    print(f"    Detected type: {dataset_type}")
+    
+    # Prepare column mapping
+    column_mapping = {}
+    skipped_columns = []
+    
+    # Process based on dataset type
+    if dataset_type == 'hugadb':
+        print(f"    Using HuGaDB pattern...")
+        for col in original_cols:
+            new_name = harmonize_column_name(col, pattern_hugadb, order_hugadb)
+            if new_name:
+                column_mapping[col] = new_name
+            else:
+                skipped_columns.append(col)
+    
+    elif dataset_type == 'xsens':
+        print(f"    Using Xsens patterns...")
+        for col in original_cols:
+            # Try sensor pattern first
+            new_name = harmonize_column_name(col, pattern_xsens_sensor, order_xsens_sensor)
+            
+            # If that didn't work, try angular velocity pattern
+            if not new_name:
+                new_name = harmonize_column_name(col, pattern_xsens_angular, order_xsens_angular)
+            
+            if new_name:
+                column_mapping[col] = new_name
+            else:
+                skipped_columns.append(col)
+    
+    elif dataset_type == 'standard':
+        print(f"    Using Standard pattern...")
+        for col in original_cols:
+            new_name = harmonize_column_name(col, pattern_standard, order_standard)
+            if new_name:
+                column_mapping[col] = new_name
+            else:
+                skipped_columns.append(col)
+    
+    else:  # 'mixed' - try all patterns
+        print(f"    Trying all patterns on each column...")
+        if DEBUG_MODE:
+            print(f"    First 5 column attempts:")
+        
+        for i, col in enumerate(original_cols):
+            if DEBUG_MODE and i < 5:
+                print(f"      Attempting: {col}")
+            
+            new_name = try_all_patterns(col)
+            if new_name:
+                column_mapping[col] = new_name
+            else:
+                skipped_columns.append(col)
+                if DEBUG_MODE and i < 5:
+                    print(f"        -> No match")
+    
+    return dataset_type, column_mapping, skipped_columns
+
+
+# Mapping per distinct header, keyed by the hash of the header tuple: nearly every
+# NEWBEE file has the same header, so only the first file pays for harmonization.
+_HEADER_MAPPINGS = {}
+
+
+def mapping_for_header(original_cols):
+    """
+    build_column_mapping, reused for headers seen before.
+    Returns (dataset_type, column_mapping, skipped_columns, cached).
+    """
+    header = tuple(original_cols)
+    key = hash(header)
+    entry = _HEADER_MAPPINGS.get(key)
+    if entry is not None and entry[0] == header:
+        _, dataset_type, column_mapping, skipped_columns = entry
+        return dataset_type, dict(column_mapping), list(skipped_columns), True
+    dataset_type, column_mapping, skipped_columns = build_column_mapping(original_cols)
+    _HEADER_MAPPINGS[key] = (header, dataset_type, dict(column_mapping), list(skipped_columns))
+    return dataset_type, column_mapping, skipped_columns, False
+
+
 def process_csv(file_path, course, participant_id, output_base_dir):
     """
     Process a single CSV file: filter and rename columns to standard format.
@@ -598,9 +722,8 @@ def process_csv(file_path, course, participant_id, output_base_dir):
     print(f"\n  Processing: {course}/{participant_id}/{file_path.name}")
     
     try:
-        # Read CSV
-        df = pd.read_csv(file_path)
-        original_cols = df.columns.tolist()
+        # Read only the header; the rename/keep lists depend on nothing else
+        original_cols = pd.read_csv(file_path, nrows=0).columns.tolist()
         original_count = len(original_cols)
         
         print(f"    Total columns: {original_count}")
@@ -609,64 +732,9 @@ def process_csv(file_path, course, participant_id, output_base_dir):
         if DEBUG_MODE:
             show_sample_columns(original_cols, n=15)
         
-        # Detect dataset type
-        dataset_type = detect_dataset_type(original_cols)
-        print(f"    Detected type: {dataset_type}")
-        
-        # Prepare column mapping
-        column_mapping = {}
-        skipped_columns = []
-        
-        # Process based on dataset type
-        if dataset_type == 'hugadb':
-            print(f"    Using HuGaDB pattern...")
-            for col in original_cols:
-                new_name = harmonize_column_name(col, pattern_hugadb, order_hugadb)
-                if new_name:
-                    column_mapping[col] = new_name
-                else:
-                    skipped_columns.append(col)
-        
-        elif dataset_type == 'xsens':
-            print(f"    Using Xsens patterns...")
-            for col in original_cols:
-                # Try sensor pattern first
-                new_name = harmonize_column_name(col, pattern_xsens_sensor, order_xsens_sensor)
-                
-                # If that didn't work, try angular velocity pattern
-                if not new_name:
-                    new_name = harmonize_column_name(col, pattern_xsens_angular, order_xsens_angular)
-                
-                if new_name:
-                    column_mapping[col] = new_name
-                else:
-                    skipped_columns.append(col)
-        
-        elif dataset_type == 'standard':
-            print(f"    Using Standard pattern...")
-            for col in original_cols:
-                new_name = harmonize_column_name(col, pattern_standard, order_standard)
-                if new_name:
-                    column_mapping[col] = new_name
-                else:
-                    skipped_columns.append(col)
-        
-        else:  # 'mixed' - try all patterns
-            print(f"    Trying all patterns on each column...")
-            if DEBUG_MODE:
-                print(f"    First 5 column attempts:")
-            
-            for i, col in enumerate(original_cols):
-                if DEBUG_MODE and i < 5:
-                    print(f"      Attempting: {col}")
-                
-                new_name = try_all_patterns(col)
-                if new_name:
-                    column_mapping[col] = new_name
-                else:
-                    skipped_columns.append(col)
-                    if DEBUG_MODE and i < 5:
-                        print(f"        -> No match")
+        dataset_type, column_mapping, skipped_columns, cached = mapping_for_header(original_cols)
+        if cached:
+            print(f"    Detected type: {dataset_type} (header seen before, reusing mapping)")
         
         # Check results
         kept_count = len(column_mapping)
@@ -694,6 +762,9 @@ def process_csv(file_path, course, participant_id, output_base_dir):
                 'skipped_columns': original_count
             }
         
+        # Parse only the mapped columns; skipped columns are never read
+        df = pd.read_csv(file_path, usecols=list(column_mapping.keys()))
+        
         # Filter to only mapped columns
         df_filtered = df[list(column_mapping.keys())].copy()
         
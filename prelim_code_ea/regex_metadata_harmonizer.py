@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 # import pandas as pd
 
 # Construct a pattern based on the convention followed by the dataset you are trying to harmonize
@@ -35,60 +36,89 @@ def regex_meta_harmonize(col_name, pattern, order):
 
     return f"UNKNOWN: {col_name}"
 
-def get_sensor(raw_sensor):
-    sensor_keywords = {
-        'GYR' : ['gyr', 'gyroscope'],
-        'ACC' : ['acc', 'acceleration'],
-        'MAG' : ['mag', 'magnometer']
-    }
+SENSOR_KEYWORDS = {
+    'GYR' : ['gyr', 'gyroscope'],
+    'ACC' : ['acc', 'acceleration'],
+    'MAG' : ['mag', 'magnometer']
+}
+
+# You only need to define the base anatomical terms once
+#   'GROUND_TRUTH'  : ['list', 'of', 'potential', 'names']
+ANATOMY_KEYWORDS = {
+    # Lower Body
+    'THIGH'         : ['thigh', 'THIGH', 'upper_leg', 'upperLeg', 'UPPER_LEG'],
+    'SHANK'         : ['shank', 'SHANK', 'leg', 'LEG', 'lower_leg', 'lowerLeg', 'LOWER_LEG', 'shin', 'SHIN'],
+    'PELVIS'        : ['pelvis', 'PELVIS', 'sacrum', 'SACRUM'],
+    'ANKLE'         : ['ankle', 'ANKLE'],
+    'FOOT'          : ['foot', 'FOOT'],
+    
+    # Upper Body
+    'STERNUM'       : ['sternum', 'STERNUM', 'chest', 'CHEST'],
+    'ARM_UPPER'     : ['upperarm', 'UpperArm','arm_upper', 'ARM_UPPER', 'humerus', 'HUMERUS'],
+    'ARM_LOWER'     : ['arm_lower', 'ARM_LOWER', 'armLower', 'radius', 'RADIUS', 'forearm', 'FOREARM', 'ForeArm', 'LowerArm'],
+    'SHOULDER'      : ['shoulder', 'SHOULDER'],
+    'HAND'          : ['hand', 'HAND'],
+    'HEAD'          : ['head', 'HEAD'],
+    'NECK'          : ['NECK', 'neck', 'Neck']
+}
+
+
+def _compile_keyword_scanner(keywords, transform=None):
+    """
+    One regex that finds every keyword occurrence (overlapping) in a single pass.
+    Returns (pattern, {term: key}). If a term is listed under several keys, the
+    last key wins, as in the original nested loops. transform drops terms that can
+    never match the normalized input (get_segment lowercases and strips '_').
+    """
+    owner = {}
+    for key, terms in keywords.items():
+        for term in terms:
+            if transform is None or transform(term) == term:
+                owner[term] = key
+    # Only one term is captured per start position, so a term may not be a prefix of
+    # another term that belongs to a different key.
+    for a in owner:
+        for b in owner:
+            if a != b and b.startswith(a) and owner[a] != owner[b]:
+                raise ValueError(f"Keyword '{a}' ({owner[a]}) is a prefix of '{b}' ({owner[b]})")
+    alternation = "|".join(re.escape(t) for t in sorted(owner, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))"), owner
+
 
-    found_sensor = "NONE"
-    for key in sensor_keywords:
-        for term in sensor_keywords[key]:
-            if term in raw_sensor:
-                found_sensor = key
-                break
+def _last_key_found(raw, scanner, owner, keys):
+    """Key that the original 'for key: for term: if term in raw' loop ends on."""
+    found = {owner[m.group(1)] for m in scanner.finditer(raw)}
+    for key in reversed(keys):
+        if key in found:
+            return key
+    return "NONE"
 
-    return found_sensor
 
+_SENSOR_SCANNER = _compile_keyword_scanner(SENSOR_KEYWORDS)
+_ANATOMY_SCANNER = _compile_keyword_scanner(
+    ANATOMY_KEYWORDS, transform=lambda t: t.lower().replace("_", "")
+)
 
+
+# Results are memoized per raw name: NEWBEE files repeat the same few hundred headers.
+@lru_cache(maxsize=None)
+def get_sensor(raw_sensor):
+    return _last_key_found(raw_sensor, *_SENSOR_SCANNER, list(SENSOR_KEYWORDS))
+
+
+@lru_cache(maxsize=None)
 def get_segment(raw_segment):
     raw_segment = raw_segment.lower().replace("_", "")
     
     # 1. Determine Side
     side = ""
-    if any(raw_segment.startswith(s) for s in ['l', 'left', 'L', 'LEFT']):
+    if raw_segment.startswith(('l', 'left')):
         side = "L"
-    elif any(raw_segment.startswith(s) for s in ['r', 'right', 'R', "RIGHT"]):
+    elif raw_segment.startswith(('r', 'right')):
         side = "R"
         
     # 2. Determine Anatomy 
-    # You only need to define the base anatomical terms once
-    #   'GROUND_TRUTH'  : ['list', 'of', 'potential', 'names']
-    anatomy_keywords = {
-        # Lower Body
-        'THIGH'         : ['thigh', 'THIGH', 'upper_leg', 'upperLeg', 'UPPER_LEG'],
-        'SHANK'         : ['shank', 'SHANK', 'leg', 'LEG', 'lower_leg', 'lowerLeg', 'LOWER_LEG', 'shin', 'SHIN'],
-        'PELVIS'        : ['pelvis', 'PELVIS', 'sacrum', 'SACRUM'],
-        'ANKLE'         : ['ankle', 'ANKLE'],
-        'FOOT'          : ['foot', 'FOOT'],
-        
-        # Upper Body
-        'STERNUM'       : ['sternum', 'STERNUM', 'chest', 'CHEST'],
-        'ARM_UPPER'     : ['upperarm', 'UpperArm','arm_upper', 'ARM_UPPER', 'humerus', 'HUMERUS'],
-        'ARM_LOWER'     : ['arm_lower', 'ARM_LOWER', 'armLower', 'radius', 'RADIUS', 'forearm', 'FOREARM', 'ForeArm', 'LowerArm'],
-        'SHOULDER'      : ['shoulder', 'SHOULDER'],
-        'HAND'          : ['hand', 'HAND'],
-        'HEAD'          : ['head', 'HEAD'],
-        'NECK'          : ['NECK', 'neck', 'Neck']
-    }
-    
-    found_anatomy = "NONE"
-    for key in anatomy_keywords:
-        for term in anatomy_keywords[key]:
-            if term in raw_segment:
-                found_anatomy = key
-                break
+    found_anatomy = _last_key_found(raw_segment, *_ANATOMY_SCANNER, list(ANATOMY_KEYWORDS))
             
     return f"{side}_{found_anatomy}" if side else found_anatomy
 
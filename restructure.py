@@ -4,6 +4,7 @@ One-shot interactive dataset restructurer.
 
 Walks a source directory of CSV datasets and renames/restructures each file
 into a standardized format:  p-{pid}_s-{session}_a-{activity}.csv
+(Parquet inputs keep their format:  p-{pid}_s-{session}_a-{activity}.parquet)
 
 For each dataset folder, the script:
   1. Shows you sample paths and CSV column headers
@@ -17,26 +18,65 @@ For each dataset folder, the script:
 
 Always run with --dry-run first to verify filenames before writing.
 
+The answers are saved per dataset as {dst}/00_specs/{dataset}.json and reused on
+the next run, so only new datasets are asked about. Spec files can also be
+written by hand, as JSON or YAML (.yaml / .yml, needs PyYAML):
+
+  {"version": 1,
+   "filter": {"match": "name", "regex": "^HuGaDB"},          # or null
+   "pid":      {"source": "filename", "delim": "_", "tok": 3},
+   "session":  {"source": "filename", "delim": "_", "tok": 4,
+                "transforms": [["zfill", 2]]},
+   "activity": {"source": "column", "col": "activity"}}
+
+Files that need no splitting are copied. With --link they are reflinked or
+hardlinked instead when source and destination share a filesystem, falling back
+to a byte copy otherwise. Hardlinked outputs share their data with the input, so
+edit them only by writing a new file.
+
 Usage:
   python restructure.py                          # all datasets, interactive
   python restructure.py --dataset HUGADB         # one dataset only
   python restructure.py --dataset HUGADB --dry-run
+  python restructure.py --no-prompt --workers 8 --link auto   # unattended, saved specs only
+  python restructure.py --dataset HUGADB --reconfigure        # ask again, overwrite the spec
 """
 
 from __future__ import annotations
 
 import argparse
 import csv
+import io
+import itertools
+import json
 import os
 import re
 import shutil
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+from sync_columns.catalog import record_outputs
+from sync_columns.table_io import ParquetChunkWriter, format_of, is_table_file, read_table_columns
+
 DEFAULT_BASE = "/Users/sofiavelasquez/Library/CloudStorage/Box-Box/WHT Datasets"
 DEFAULT_SRC = os.path.join(DEFAULT_BASE, "04_freq_unit_synced")
 DEFAULT_DST = os.path.join(DEFAULT_BASE, "05_restruc")
 
+SPEC_DIRNAME = "00_specs"
+SPEC_VERSION = 1
+SPEC_EXTS = (".json", ".yaml", ".yml")
+FIELDS = ("pid", "session", "activity")
+LINK_MODES = ("copy", "hardlink", "reflink", "auto")
+FICLONE = 0x40049409  # Linux ioctl: share extents with another file (btrfs, XFS)
+SPLIT_CHUNK_ROWS = 100_000   # rows per chunk when splitting a file by column values
+MAX_OPEN_WRITERS = 64        # open CSV outputs per split; least recently used is closed
+
 
 # ── Helpers ─────────────────────────────────────────────────────────────
 
@@ -44,13 +84,15 @@ def collect_csvs(root: str) -> list[str]:
     out = []
     for dp, _, fnames in os.walk(root):
         for f in sorted(fnames):
-            if f.lower().endswith(".csv"):
+            if is_table_file(f):
                 out.append(os.path.join(dp, f))
     return sorted(out)
 
 
 def peek_headers(fpath: str) -> list[str]:
     try:
+        if format_of(fpath) == "parquet":
+            return read_table_columns(fpath)
         with open(fpath, "r", newline="", errors="replace") as f:
             return next(csv.reader(f), [])
     except Exception:
@@ -92,6 +134,52 @@ def prompt_yn(msg: str) -> bool:
             return False
 
 
+# ── Spec files ──────────────────────────────────────────────────────────
+
+def find_spec(spec_dir: str, dataset: str) -> str | None:
+    """Path of the saved spec for dataset, if any (JSON preferred over YAML)."""
+    for ext in SPEC_EXTS:
+        path = os.path.join(spec_dir, dataset + ext)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _require_yaml():
+    try:
+        import yaml
+    except ImportError as e:
+        raise ImportError("YAML spec files need PyYAML: pip install pyyaml") from e
+    return yaml
+
+
+def load_spec(path: str) -> dict:
+    with open(path) as f:
+        if path.endswith(".json"):
+            spec = json.load(f)
+        else:
+            spec = _require_yaml().safe_load(f)
+    if spec.get("version") != SPEC_VERSION:
+        raise ValueError(f"{path}: unsupported spec version {spec.get('version')!r}")
+    missing = [k for k in FIELDS if k not in spec]
+    if missing:
+        raise ValueError(f"{path}: missing field spec(s) {missing}")
+    return spec
+
+
+def save_spec(spec: dict, path: str):
+    """Write the spec atomically (tmp file + rename)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        if path.endswith(".json"):
+            json.dump(spec, f, indent=1)
+            f.write("\n")
+        else:
+            _require_yaml().safe_dump(spec, f, sort_keys=False)
+    os.replace(tmp, path)
+
+
 # ── Build one field spec interactively ──────────────────────────────────
 
 def build_spec(label: str, dirs: list[str], stem: str, headers: list[str]) -> dict:
@@ -158,23 +246,23 @@ def _ask_transforms(spec: dict, sample: str):
                            "Regex capture", "Zero-pad"])
         if t == 0:
             p = input("      Prefix: ")
-            spec.setdefault("transforms", []).append(("prefix", p))
+            spec.setdefault("transforms", []).append(["prefix", p])
             if sample.startswith(p):
                 sample = sample[len(p):]
         elif t == 1:
             s = input("      Suffix: ")
-            spec.setdefault("transforms", []).append(("suffix", s))
+            spec.setdefault("transforms", []).append(["suffix", s])
             if sample.endswith(s):
                 sample = sample[:-len(s)]
         elif t == 2:
             r = input("      Regex: ")
-            spec.setdefault("transforms", []).append(("regex", r))
+            spec.setdefault("transforms", []).append(["regex", r])
             m = re.search(r, sample)
             if m:
                 sample = m.group(1)
         elif t == 3:
             w = prompt_int("      Width: ", 1, 10)
-            spec.setdefault("transforms", []).append(("zfill", w))
+            spec.setdefault("transforms", []).append(["zfill", w])
             if sample.isdigit():
                 sample = sample.zfill(w)
         print(f"      → '{sample}'")
@@ -224,11 +312,58 @@ def extract(spec: dict, dirs: list[str], stem: str) -> str | None:
     return raw
 
 
+# ── Place files ─────────────────────────────────────────────────────────
+
+def _reflink(src: str, dst: str):
+    if sys.platform == "darwin":
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), dst)
+        return
+    import fcntl
+    with open(src, "rb") as fs:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            fcntl.ioctl(fd, FICLONE, fs.fileno())
+        except OSError:
+            os.close(fd)
+            os.unlink(dst)
+            raise
+        os.close(fd)
+    shutil.copystat(src, dst)
+
+
+def place_file(src: str, dst: str, link: str = "copy") -> str:
+    """
+    Put a copy of src at dst. link picks the method: "reflink" (copy-on-write
+    clone), "hardlink", "auto" (reflink, then hardlink) or "copy". Falls back to
+    a byte copy when the filesystem cannot link. Returns the method used.
+    """
+    methods = {"reflink": ["reflink"], "hardlink": ["hardlink"],
+               "auto": ["reflink", "hardlink"]}.get(link, [])
+    for method in methods:
+        try:
+            if method == "reflink":
+                _reflink(src, dst)
+            else:
+                os.link(src, dst)
+            return method
+        except (OSError, AttributeError):
+            continue
+    shutil.copy2(src, dst)
+    return "copy"
+
+
 # ── Process one dataset ─────────────────────────────────────────────────
 
-def process_dataset(dataset: str, src_root: str, dst_root: str, dry_run: bool):
+def process_dataset(dataset: str, src_root: str, dst_root: str, dry_run: bool,
+                    spec_dir: str | None = None, prompt: bool = True, reconfigure: bool = False,
+                    workers: int = 1, link: str = "copy"):
     src_dir = os.path.join(src_root, dataset)
     dst_dir = os.path.join(dst_root, dataset)
+    spec_dir = spec_dir or os.path.join(dst_root, SPEC_DIRNAME)
     csvs = collect_csvs(src_dir)
 
     if not csvs:
@@ -236,8 +371,26 @@ def process_dataset(dataset: str, src_root: str, dst_root: str, dry_run: bool):
         return
 
     print(f"\n{'=' * 60}")
-    print(f"{dataset}: {len(csvs)} CSV files\n")
+    print(f"{dataset}: {len(csvs)} table files\n")
+
+    spec_path = None if reconfigure else find_spec(spec_dir, dataset)
+    if spec_path:
+        spec = load_spec(spec_path)
+        print(f"  Spec: {spec_path}")
+    elif not prompt:
+        print(f"  No spec in {spec_dir}, skipping (run without --no-prompt to create one).")
+        return
+    else:
+        spec = ask_dataset_spec(src_dir, csvs)
+        spec_path = find_spec(spec_dir, dataset) or os.path.join(spec_dir, dataset + ".json")
+        save_spec(spec, spec_path)
+        print(f"\n  Saved spec: {spec_path}")
+
+    restructure_files(csvs, src_dir, dst_dir, spec, dry_run, workers=workers, link=link)
+
 
+def ask_dataset_spec(src_dir: str, csvs: list[str]) -> dict:
+    """Show sample paths and headers, then ask for the filter and each field spec."""
     # Show samples
     print("  Sample paths:")
     for c in csvs[:6]:
@@ -259,119 +412,271 @@ def process_dataset(dataset: str, src_root: str, dst_root: str, dry_run: bool):
 
     # Optional file filter
     file_filter = None
-    filter_on = None
     if prompt_yn("\n  Filter which CSVs to include? [y/n]: "):
-        filter_on = "name" if prompt_choice(
+        on = "name" if prompt_choice(
             "  Filter on: ", ["Filename", "Full relative path"]) == 0 else "path"
-        file_filter = input("  Regex: ").strip()
+        file_filter = {"match": on, "regex": input("  Regex: ").strip()}
 
     # Define fields
-    pid_spec = build_spec("pid", dirs, stem, headers)
-    session_spec = build_spec("session", dirs, stem, headers)
-    activity_spec = build_spec("activity", dirs, stem, headers)
+    spec = {"version": SPEC_VERSION, "filter": file_filter}
+    for label in FIELDS:
+        spec[label] = build_spec(label, dirs, stem, headers)
+    return spec
 
-    has_column = any(s["source"] == "column"
-                     for s in (pid_spec, session_spec, activity_spec))
 
-    # ── Execute ──
+def restructure_files(csvs: list[str], src_dir: str, dst_dir: str, spec: dict, dry_run: bool,
+                      workers: int = 1, link: str = "copy"):
+    """Write every selected file under its p-/s-/a- name(s); workers > 1 runs files on a thread pool."""
     seen: dict[str, str] = {}
-    ok, skip, existed = 0, 0, 0
-
-    for fpath in csvs:
-        rel = os.path.relpath(fpath, src_dir)
-        parts = list(Path(rel).parts)
-        dirs_i, stem_i = parts[:-1], Path(rel).stem
-
-        # Filter
-        if file_filter:
-            target = parts[-1] if filter_on == "name" else rel
-            if not re.search(file_filter, target):
-                skip += 1
-                continue
+    lock = threading.Lock()
+
+    def claim(name, rel):
+        """Register an output name; returns the file that already claimed it, if any."""
+        with lock:
+            prev = seen.get(name)
+            if prev is None:
+                seen[name] = rel
+            return prev
+
+    if not dry_run:
+        os.makedirs(dst_dir, exist_ok=True)
+    def job(fpath):
+        return _restructure_one(fpath, src_dir, dst_dir, spec, dry_run, link, claim)
+
+    if workers > 1 and len(csvs) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(job, csvs))
+    else:
+        results = [job(fpath) for fpath in csvs]
 
-        # Extract non-column fields
-        pid = extract(pid_spec, dirs_i, stem_i) if pid_spec["source"] != "column" else None
-        sess = extract(session_spec, dirs_i, stem_i) if session_spec["source"] != "column" else None
-        act = extract(activity_spec, dirs_i, stem_i) if activity_spec["source"] != "column" else None
+    counts = {"ok": 0, "skip": 0, "existed": 0}
+    methods: dict[str, int] = {}
+    for result in results:
+        for line in result["lines"]:
+            print(line)
+        for k in counts:
+            counts[k] += result[k]
+        for m, n in result["methods"].items():
+            methods[m] = methods.get(m, 0) + n
 
-        if not has_column:
-            if not all((pid, sess, act)):
-                skip += 1
-                continue
-            entries = [{"pid": pid, "session": sess, "activity": act, "rows": None}]
-        else:
-            entries = _split_by_columns(fpath, pid_spec, session_spec, activity_spec,
-                                        pid, sess, act)
-            if not entries:
-                skip += 1
-                continue
+    if not dry_run:
+        record_outputs(p for result in results for p in result["paths"])
 
-        for e in entries:
-            name = f"p-{e['pid']}_s-{e['session']}_a-{e['activity']}.csv"
+    how = ", ".join(f"{n} {m}" for m, n in sorted(methods.items()))
+    print(f"\n  Done: {counts['ok']} written{f' ({how})' if how else ''}, "
+          f"{counts['skip']} skipped, {counts['existed']} already existed")
 
-            if name in seen:
-                print(f"  WARN duplicate: {name}  (prev: {seen[name]}, curr: {rel})")
-            seen[name] = rel
 
-            dst_path = os.path.join(dst_dir, name)
+def _restructure_one(fpath, src_dir, dst_dir, spec, dry_run, link, claim) -> dict:
+    result = {"ok": 0, "skip": 0, "existed": 0, "methods": {}, "lines": [], "paths": []}
+    rel = os.path.relpath(fpath, src_dir)
+    parts = list(Path(rel).parts)
+    dirs_i, stem_i = parts[:-1], Path(rel).stem
+    pid_spec, session_spec, activity_spec = (spec[k] for k in FIELDS)
 
-            if not dry_run and os.path.isfile(dst_path):
-                existed += 1
-                continue
+    # Filter
+    file_filter = spec.get("filter")
+    if file_filter:
+        target = parts[-1] if file_filter["match"] == "name" else rel
+        if not re.search(file_filter["regex"], target):
+            result["skip"] += 1
+            return result
 
-            if dry_run:
-                print(f"  {rel}  →  {name}")
-            else:
-                os.makedirs(dst_dir, exist_ok=True)
-                if e["rows"] is not None:
-                    _write_rows(dst_path, e["headers"], e["rows"])
-                else:
-                    shutil.copy2(fpath, dst_path)
-            ok += 1
+    has_column = any(s["source"] == "column"
+                     for s in (pid_spec, session_spec, activity_spec))
+
+    # Extract non-column fields
+    pid = extract(pid_spec, dirs_i, stem_i) if pid_spec["source"] != "column" else None
+    sess = extract(session_spec, dirs_i, stem_i) if session_spec["source"] != "column" else None
+    act = extract(activity_spec, dirs_i, stem_i) if activity_spec["source"] != "column" else None
+
+    ext = os.path.splitext(fpath)[1].lower()
 
-    print(f"\n  Done: {ok} written, {skip} skipped, {existed} already existed")
+    def place(e):
+        """Claim e's output name; returns its path, or None if it must not be written."""
+        name = f"p-{e['pid']}_s-{e['session']}_a-{e['activity']}{ext}"
+
+        prev = claim(name, rel)
+        if prev is not None:
+            result["lines"].append(f"  WARN duplicate: {name}  (prev: {prev}, curr: {rel})")
+
+        dst_path = os.path.join(dst_dir, name)
+
+        if not dry_run and (prev is not None or os.path.isfile(dst_path)):
+            result["existed"] += 1
+            return None
+
+        if dry_run:
+            result["lines"].append(f"  {rel}  →  {name}")
+        result["ok"] += 1
+        return None if dry_run else dst_path
+
+    if not has_column:
+        if not all((pid, sess, act)):
+            result["skip"] += 1
+            return result
+        dst_path = place({"pid": pid, "session": sess, "activity": act})
+        if dst_path is not None:
+            method = place_file(fpath, dst_path, link)
+            result["methods"][method] = result["methods"].get(method, 0) + 1
+            result["paths"].append(dst_path)
+    else:
+        before = {"ok": result["ok"], "existed": result["existed"], "lines": list(result["lines"])}
+        written = _split_by_columns(fpath, pid_spec, session_spec, activity_spec,
+                                    pid, sess, act, place, keys_only=dry_run,
+                                    written_paths=result["paths"])
+        if written is None:
+            result.update(before)
+            result["skip"] += 1
+        elif written:
+            result["methods"]["split"] = written
+    return result
 
 
 def _split_by_columns(fpath, pid_spec, sess_spec, act_spec,
-                       pid_val, sess_val, act_val) -> list[dict]:
+                      pid_val, sess_val, act_val, place, keys_only=False,
+                      written_paths=None) -> int | None:
+    """
+    Stream fpath in SPLIT_CHUNK_ROWS chunks and append every row to the output of
+    its column-sourced key. Rows with an empty key are dropped.
+
+    place(entry) is called once per new key (entry has pid/session/activity) and
+    returns the output path, or None to drop that key's rows. keys_only reads just
+    the key columns (for --dry-run). Returns the number of outputs written (their
+    paths are appended to written_paths), or None if the file could not be split
+    (partial outputs are removed).
+    """
     col_fields = {}
-    for name, spec, static in [("pid", pid_spec, pid_val),
-                                ("session", sess_spec, sess_val),
-                                ("activity", act_spec, act_val)]:
+    for name, spec in [("pid", pid_spec), ("session", sess_spec), ("activity", act_spec)]:
         if spec["source"] == "column":
             col_fields[name] = spec["col"]
+    static = {"pid": pid_val, "session": sess_val, "activity": act_val}
+    fields = sorted(col_fields)
+    key_cols = [col_fields[fn] for fn in fields]
 
+    if format_of(fpath) == "parquet":
+        chunks = _iter_parquet_chunks(fpath, list(dict.fromkeys(key_cols)) if keys_only else None)
+    else:
+        chunks = _iter_csv_chunks(fpath, key_cols)
+    dst_paths: dict[tuple, str | None] = {}
+    writers = None
     try:
-        with open(fpath, "r", newline="", errors="replace") as f:
-            reader = csv.DictReader(f)
-            headers = reader.fieldnames or []
-            buckets: dict[tuple, list] = {}
-            for row in reader:
-                key = tuple(row.get(col_fields[fn], "").strip()
-                            for fn in sorted(col_fields))
-                if all(key):
-                    buckets.setdefault(key, []).append(row)
+        for header, keys, rows in chunks:
+            if writers is None:
+                writers = SplitWriters(header)
+            keys = keys[key_cols].astype(str).apply(lambda c: c.str.strip())
+            keys.columns = fields
+            valid = (keys != "").all(axis=1).to_numpy()
+            if not valid.any():
+                continue
+            for key, pos in keys[valid].groupby(fields, sort=False).indices.items():
+                key = key if isinstance(key, tuple) else (key,)
+                if key not in dst_paths:
+                    dst_paths[key] = place({**static, **dict(zip(fields, key))})
+                if dst_paths[key] is not None:
+                    idx = valid.nonzero()[0][pos]
+                    writers.write(dst_paths[key], rows.iloc[idx] if header is None else rows[idx])
     except Exception:
-        return []
-
-    entries = []
-    for key, rows in sorted(buckets.items()):
-        vals = dict(zip(sorted(col_fields), key))
-        entries.append({
-            "pid": vals.get("pid", pid_val),
-            "session": vals.get("session", sess_val),
-            "activity": vals.get("activity", act_val),
-            "headers": headers,
-            "rows": rows,
-        })
-    return entries
+        if writers is not None:
+            writers.close()
+            writers.remove_outputs()
+        return None
+    if writers is None:
+        return 0
+    writers.close()
+    if written_paths is not None:
+        written_paths.extend(writers.paths)
+    return len(writers.paths)
+
+
+def _iter_csv_chunks(fpath, key_cols):
+    """
+    (header, keys, rows) chunks of a CSV: only the key columns are parsed, and rows
+    stay raw lines (an object array of bytes) so outputs repeat them byte for byte.
+    """
+    with open(fpath, "rb") as f:
+        header = f.readline()
+        while True:
+            lines = list(itertools.islice(f, SPLIT_CHUNK_ROWS))
+            if not lines:
+                return
+            if not lines[-1].endswith(b"\n"):
+                lines[-1] += b"\n"
+            keys = _parse_csv_keys(header + b"".join(lines), key_cols)
+            if len(keys) != len(lines):
+                raise ValueError(f"{fpath}: quoted line breaks are not supported when splitting")
+            rows = np.empty(len(lines), dtype=object)
+            rows[:] = lines
+            yield header, keys, rows
+
+
+def _parse_csv_keys(buf, key_cols):
+    """Key columns of a CSV buffer as text, one row per line (blank lines give "")."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pcsv
+        cols = list(dict.fromkeys(key_cols))
+        convert = pcsv.ConvertOptions(include_columns=cols, column_types={c: pa.string() for c in cols},
+                                      strings_can_be_null=False, quoted_strings_can_be_null=False)
+        parse = pcsv.ParseOptions(ignore_empty_lines=False)
+        return pcsv.read_csv(io.BytesIO(buf), parse_options=parse, convert_options=convert).to_pandas()
+    except (ImportError, ValueError):  # no pyarrow, or input it rejects (e.g. invalid UTF-8)
+        return pd.read_csv(io.BytesIO(buf), usecols=lambda c: c in key_cols, dtype=str,
+                           keep_default_na=False, skip_blank_lines=False, encoding_errors="replace")
+
+
+def _iter_parquet_chunks(fpath, columns=None):
+    """(None, frame, frame) record batches of a Parquet file."""
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(fpath).iter_batches(batch_size=SPLIT_CHUNK_ROWS, columns=columns):
+        df = batch.to_pandas()
+        yield None, df, df
+
+
+class SplitWriters:
+    """
+    Output files of one split, keyed by path. With a CSV header (bytes), rows are
+    raw lines appended to the outputs, and at most MAX_OPEN_WRITERS stay open: the
+    least recently used is closed and reopened in append mode if needed again.
+    Without one, rows are DataFrames written to Parquet; those files cannot be
+    reopened for appending, so every Parquet writer stays open until close().
+    """
+
+    def __init__(self, header=None, max_open=MAX_OPEN_WRITERS):
+        self.header = header
+        self.max_open = max_open
+        self.paths: list[str] = []
+        self._open: OrderedDict = OrderedDict()
+
+    def write(self, path, rows):
+        if self.header is None:
+            if path not in self._open:
+                self._open[path] = ParquetChunkWriter(path)
+                self.paths.append(path)
+            self._open[path].write(rows)
+            return
+        f = self._open.get(path)
+        if f is None:
+            if len(self._open) >= self.max_open:
+                self._open.popitem(last=False)[1].close()
+            new = path not in self.paths
+            f = open(path, "wb" if new else "ab")
+            self._open[path] = f
+            if new:
+                self.paths.append(path)
+                f.write(self.header)
+        else:
+            self._open.move_to_end(path)
+        f.write(b"".join(rows))
 
+    def close(self):
+        while self._open:
+            self._open.popitem(last=False)[1].close()
 
-def _write_rows(dst_path, headers, rows):
-    with open(dst_path, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=headers)
-        w.writeheader()
-        w.writerows(rows)
+    def remove_outputs(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
 
 
 # ── Main ────────────────────────────────────────────────────────────────
@@ -383,7 +688,20 @@ def main():
     ap.add_argument("--dry-run", action="store_true")
     ap.add_argument("--src", default=DEFAULT_SRC)
     ap.add_argument("--dst", default=DEFAULT_DST)
+    ap.add_argument("--spec-dir", default=None,
+                    help=f"Where per-dataset specs are saved/loaded (default: DST/{SPEC_DIRNAME})")
+    ap.add_argument("--no-prompt", action="store_true",
+                    help="Never ask; skip datasets without a saved spec")
+    ap.add_argument("--reconfigure", action="store_true",
+                    help="Ask again even if a spec exists, and overwrite it")
+    ap.add_argument("--workers", type=int, default=1, metavar="N",
+                    help="Restructure files on a pool of N threads (default: 1, serial)")
+    ap.add_argument("--link", choices=LINK_MODES, default="copy",
+                    help="How unsplit files are placed: byte copy (default), hardlink, "
+                         "reflink, or auto (reflink, then hardlink); falls back to copy")
     args = ap.parse_args()
+    if args.no_prompt and args.reconfigure:
+        ap.error("--reconfigure needs prompts; drop --no-prompt")
 
     if args.dataset:
         datasets = [args.dataset]
@@ -392,7 +710,9 @@ def main():
                           if os.path.isdir(os.path.join(args.src, d)))
 
     for ds in datasets:
-        process_dataset(ds, args.src, args.dst, args.dry_run)
+        process_dataset(ds, args.src, args.dst, args.dry_run, spec_dir=args.spec_dir,
+                        prompt=not args.no_prompt, reconfigure=args.reconfigure,
+                        workers=args.workers, link=args.link)
 
 
 if __name__ == "__main__":
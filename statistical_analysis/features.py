@@ -0,0 +1,139 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import symmetry
+import gait
+import trunk_sway
+from gait_events import GaitEventIndex, TrialEvents
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from sync_columns.loader import load, read_trial
+from sync_columns.table_io import is_table_file
+
+
+# Registry of per-trial features: name -> (columns to read, function(df, fs, events) -> value).
+# events is the trial's TrialEvents (gait_events.py): peak indices detected once per
+# trial and detector, shared by all metrics. Functions must live at module level so
+# they can be sent to worker processes.
+FEATURES = {}
+
+DEFAULT_FEATURES = ("gait_symmetry", "stride_variability")
+
+
+def register_feature(name, columns):
+    """
+    Decorator that registers func(df, fs, events) as feature `name`; only `columns` are read.
+    """
+    def wrap(func):
+        FEATURES[name] = (list(columns), func)
+        return func
+    return wrap
+
+
+@register_feature("gait_symmetry", ["L_FOOT_ACC_Y", "R_FOOT_ACC_Y"])
+def gait_symmetry(df, fs, events):
+    return symmetry.calculate_gait_symmetry(
+        df["L_FOOT_ACC_Y"].values, df["R_FOOT_ACC_Y"].values, fs,
+        peaks_l=events.peaks("L_FOOT_ACC_Y", "symmetry"),
+        peaks_r=events.peaks("R_FOOT_ACC_Y", "symmetry"),
+    )
+
+
+@register_feature("stride_variability", ["R_FOOT_ACC_Y"])
+def stride_variability(df, fs, events):
+    return gait.estimate_stride_variability(
+        df["R_FOOT_ACC_Y"].values, fs, peaks=events.peaks("R_FOOT_ACC_Y", "stride"),
+    )
+
+
+TRUNK_ACC = ["TRUNK_ACC_X", "TRUNK_ACC_Y", "TRUNK_ACC_Z"]
+TRUNK_GYR = ["TRUNK_GYR_X", "TRUNK_GYR_Y", "TRUNK_GYR_Z"]
+
+
+@register_feature("trunk_sway_rms", TRUNK_ACC + TRUNK_GYR)
+def trunk_sway_rms(df, fs, events):
+    return trunk_sway.get_sway_metrics(df[TRUNK_ACC].values, df[TRUNK_GYR].values, fs)
+
+
+def collect_trials(base_path, dataset):
+    """
+    Sorted table files under base_path; for YARETA only the gait trials.
+    Returns (files, number of files skipped).
+    """
+    files = sorted(f for f in Path(base_path).rglob("*") if is_table_file(f.name))
+    print(f"Found {len(files)} files to process.")
+
+    # case for the YARETA dataset
+    skipped_count = 0
+    if dataset == "YARETA":
+        gait_files = [f for f in files if "Gait" in f.name]
+        skipped_count = len(files) - len(gait_files)
+        files = gait_files
+    return files, skipped_count
+
+
+def resolve_features(features=DEFAULT_FEATURES):
+    """
+    [(name, columns, func)] for the requested feature names.
+    """
+    missing = [name for name in features if name not in FEATURES]
+    if missing:
+        raise KeyError(f"Unknown feature(s) {missing}; registered: {sorted(FEATURES)}")
+    return [(name, *FEATURES[name]) for name in features]
+
+
+def spec_columns(specs):
+    """Columns needed by the resolved feature specs, in first-use order."""
+    return list(dict.fromkeys(c for _, cols, _ in specs for c in cols))
+
+
+def compute_features(df, path, fs, specs, event_index_dir=None):
+    """
+    Feature values of one trial whose needed columns are already in df.
+    Gait events come from (and new ones go to) the index in event_index_dir, if given.
+    """
+    index = GaitEventIndex(event_index_dir) if event_index_dir else None
+    events = TrialEvents(path, fs, index=index, frame=df)
+    values = {name: func(df, fs, events) for name, _, func in specs}
+    events.flush()
+    return values
+
+
+def extract_features(path, fs, specs, event_index_dir=None):
+    """
+    Read only the columns the features need and compute them for one file.
+    Returns (values dict, error message or None). The columns are read by the
+    loader's read_trial, the same parser the serial path uses, so results do not
+    depend on the number of workers.
+    """
+    try:
+        df = read_trial({"path": str(path)}, spec_columns(specs)).frame()
+        return compute_features(df, path, fs, specs, event_index_dir), None
+    except Exception as e:
+        return None, str(e)
+
+
+def run_features(files, fs, features=DEFAULT_FEATURES, workers=1, event_index_dir=None):
+    """
+    Compute the registered features for every file, fanning files out to `workers`
+    processes. Yields (index into files, values dict or None, error or None) as each
+    file finishes. Serially, trials come from the lazy loader, so the next files
+    are read on a background thread while the current one is computed.
+    """
+    specs = resolve_features(features)
+    if workers <= 1:
+        trials = load(paths=files, channels=spec_columns(specs), errors="keep")
+        for i, (f, trial) in enumerate(zip(files, trials)):
+            if trial.error is not None:
+                yield i, None, trial.error
+                continue
+            try:
+                yield i, compute_features(trial.frame(), f, fs, specs, event_index_dir), None
+            except Exception as e:
+                yield i, None, str(e)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(extract_features, f, fs, specs, event_index_dir): i for i, f in enumerate(files)}
+        for fut in as_completed(futures):
+            yield (futures[fut], *fut.result())
@@ -1,16 +1,18 @@
 import numpy as np
 from scipy.signal import find_peaks
 
-def estimate_stride_variability(vertical_acc, fs):
+def estimate_stride_variability(vertical_acc, fs, peaks=None):
     """
     Calculates variability using a manual frequency (fs).
+    peaks: precomputed peak indices (gait_events.py); vertical_acc is then only used for its length.
     """
     # Create time based on row count and frequency
     time_simulated = np.arange(len(vertical_acc)) / fs
     
     # Find peaks in vertical acceleration (ISB Y-axis)
     # distance = 0.4s * fs (e.g., 24 samples at 60Hz)
-    peaks, _ = find_peaks(vertical_acc, distance=int(fs * 0.4), prominence=0.5)
+    if peaks is None:
+        peaks, _ = find_peaks(vertical_acc, distance=int(fs * 0.4), prominence=0.5)
     
     if len(peaks) < 3:
         return np.nan
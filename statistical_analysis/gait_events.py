@@ -0,0 +1,185 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+from scipy.signal import find_peaks
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from sync_columns.catalog import table_stat
+from sync_columns.manifest import file_sha256
+from sync_columns.table_io import read_table
+
+
+# Peak detectors used by the gait metrics. distance_s is the minimum time between
+# peaks, center subtracts the median first (removes gravity/offset).
+DETECTORS = {
+    # symmetry.calculate_gait_symmetry: heel strikes per foot
+    "symmetry": {"distance_s": 0.35, "prominence": 0.15, "center": True},
+    # gait.estimate_stride_variability: peaks in vertical acceleration
+    "stride": {"distance_s": 0.4, "prominence": 0.5, "center": False},
+}
+
+INDEX_VERSION = 1
+STAT_DIRNAME = "00_stat"  # per-path (size, mtime_ns) → content hash, so warm runs skip hashing
+
+
+def prepare_signal(signal, center=False):
+    """
+    1-D signal as the detectors see it; center subtracts the median.
+    """
+    sig = np.asarray(signal).flatten()
+    if center:
+        sig = sig - np.median(signal)
+    return sig
+
+
+def detect_peaks(signal, fs, distance_s, prominence, center=False):
+    """
+    Peak indices of one channel (scipy find_peaks with the given detector parameters).
+    """
+    peaks, _ = find_peaks(prepare_signal(signal, center), distance=int(fs * distance_s), prominence=prominence)
+    return peaks
+
+
+def detector_key(detector, fs, params=None):
+    """
+    Index key for a detector run, e.g. 'symmetry|fs=60|distance=21|prominence=0.15|center=1'.
+    """
+    p = dict(DETECTORS[detector]) if params is None else dict(params)
+    return (f"{detector}|fs={fs:g}|distance={int(fs * p['distance_s'])}"
+            f"|prominence={p['prominence']:g}|center={int(bool(p.get('center')))}")
+
+
+def trial_hash(path):
+    """
+    SHA-256 of a trial's contents (for a .chan store: of its header and data files).
+    """
+    if os.path.isdir(path):
+        h = hashlib.sha256()
+        for name in sorted(os.listdir(path)):
+            h.update(name.encode())
+            h.update(file_sha256(os.path.join(path, name)).encode())
+        return h.hexdigest()
+    return file_sha256(path)
+
+
+class GaitEventIndex:
+    """
+    Sidecar store of detected gait events: one JSON file per trial content hash,
+    {"version": 1, "events": {detector key: {channel: [peak indices]}}}.
+    Files are written atomically, so worker processes can share one index directory.
+    The index lives wherever the caller points it (--event-index), never inside the
+    data tree by default; being keyed by content, one directory can serve every dataset.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = str(index_dir)
+
+    def _path(self, digest):
+        return os.path.join(self.index_dir, f"{digest}.json")
+
+    def digest(self, path):
+        """
+        Content hash of a trial, re-hashed only when its (size, mtime_ns) changed
+        (as in manifest.py / catalog.py); the last hash per path is kept under 00_stat.
+        """
+        path = os.path.abspath(str(path))
+        size, mtime = table_stat(path)
+        stat_path = os.path.join(self.index_dir, STAT_DIRNAME,
+                                 hashlib.sha1(path.encode()).hexdigest() + ".json")
+        try:
+            with open(stat_path) as f:
+                rec = json.load(f)
+            if (rec["size"], rec["mtime_ns"]) == (size, mtime):
+                return rec["sha256"]
+        except (OSError, ValueError, KeyError):
+            pass
+        digest = trial_hash(path)
+        os.makedirs(os.path.dirname(stat_path), exist_ok=True)
+        tmp = f"{stat_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"path": path, "size": size, "mtime_ns": mtime, "sha256": digest}, f)
+        os.replace(tmp, stat_path)
+        return digest
+
+    def load(self, digest):
+        try:
+            with open(self._path(digest)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data.get("events", {}) if data.get("version") == INDEX_VERSION else {}
+
+    def save(self, digest, events):
+        os.makedirs(self.index_dir, exist_ok=True)
+        path = self._path(digest)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": INDEX_VERSION, "events": events}, f)
+        os.replace(tmp, path)
+
+
+class TrialEvents:
+    """
+    Gait events of one trial, detected once per (detector, fs, channel) and kept in
+    a GaitEventIndex when one is given. Signals are read only on an index miss
+    (from `frame` if it has the channel, otherwise from the file).
+    """
+
+    def __init__(self, path, fs, index=None, frame=None):
+        self.path = path
+        self.fs = fs
+        self.index = index
+        self.frame = frame
+        self._digest = None
+        self._events = None
+        self._dirty = False
+        self._prepared = {}
+
+    def _load(self):
+        if self._events is None:
+            if self.index is not None:
+                self._digest = self.index.digest(self.path)
+                self._events = self.index.load(self._digest)
+            else:
+                self._events = {}
+
+    def signal(self, channel):
+        if self.frame is not None and channel in self.frame:
+            return self.frame[channel].values
+        return read_table(self.path, columns=[channel])[channel].values
+
+    def prepared(self, channel, center=False):
+        """
+        prepare_signal of a channel, computed once per trial (shared by every detector
+        setting, e.g. across a parameter sweep).
+        """
+        key = (channel, bool(center))
+        if key not in self._prepared:
+            self._prepared[key] = prepare_signal(self.signal(channel), center)
+        return self._prepared[key]
+
+    def peaks(self, channel, detector, params=None):
+        """
+        Peak indices of `channel` for a named detector (see DETECTORS); params overrides
+        the detector's parameters (e.g. in a parameter sweep).
+        """
+        self._load()
+        key = detector_key(detector, self.fs, params)
+        cached = self._events.get(key, {}).get(channel)
+        if cached is not None:
+            return np.asarray(cached, dtype=np.intp)
+        p = DETECTORS[detector] if params is None else params
+        peaks = detect_peaks(self.prepared(channel, p.get("center", False)), self.fs, p["distance_s"], p["prominence"])
+        self._events.setdefault(key, {})[channel] = peaks.tolist()
+        self._dirty = True
+        return peaks
+
+    def flush(self):
+        """Write newly detected events to the index."""
+        if self._dirty and self.index is not None:
+            self.index.save(self._digest, self._events)
+            self._dirty = False
@@ -1,15 +1,34 @@
+import sys
 import pandas as pd
 import statsmodels.formula.api as smf
 from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.stats import pearsonr
-import symmetry  
-import gait        
-
-
-def process_data(data_path, fs, dataset):
-    results = []
+import argparse
+from features import DEFAULT_FEATURES, collect_trials, run_features
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from sync_columns.config import DATASET_FS
+
+
+def _dataset_of(path):
+    # Identify Dataset from the path
+    current_dataset = "Unknown"
+    if "NEWBEE" in str(path).upper():
+        current_dataset = "NEWBEE"
+    elif "YARETA" in str(path).upper():
+        current_dataset = "YARETA"
+    return current_dataset
+
+
+def process_data(data_path, fs, dataset, workers=1, features=DEFAULT_FEATURES, event_index_dir=None):
+    """
+    Compute the registered features (see features.py) for every table under data_path.
+    Only the columns the features need are read; workers > 1 spreads files over processes.
+    With event_index_dir, detected gait events are kept in that directory and
+    reused on later runs (keyed by file hash and detector parameters).
+    """
     # Convert string path to a Path object
     base_path = Path(data_path)
     
@@ -18,68 +37,44 @@ def process_data(data_path, fs, dataset):
         print(f"Error: The directory '{data_path}' does not exist.")
         return pd.DataFrame()
 
-    files = list(base_path.rglob("*.csv"))
-    print(f"Found {len(files)} files to process.")
-    
-    processed_count = 0
-    skipped_count = 0
-
-
-    
+    files, skipped_count = collect_trials(base_path, dataset)
 
-    for f in files:
-        # case for the YARETA dataset
-        if dataset == "YARETA" and "Gait" not in f.name:
-            skipped_count += 1
+    rows = [None] * len(files)
+    processed_count = 0
+    for i, values, error in run_features(files, fs, features=features, workers=workers,
+                                         event_index_dir=event_index_dir):
+        f = files[i]
+        if error is not None:
+            print(f"Skipping {f.name} due to error: {error}")
             continue
-
-        try:
-            df = pd.read_csv(f)
-            processed_count += 1
-            
-            # 2. Extract IMU Data (ISB Mappings)
-            # Adjust these strings if your CSV headers are different
-            # acc = df[['TRUNK_ACC_X', 'TRUNK_ACC_Y', 'TRUNK_ACC_Z']].values
-            # gyro = df[['TRUNK_GYR_X', 'TRUNK_GYR_Y', 'TRUNK_GYR_Y']].values
-            acc_l = df['L_FOOT_ACC_Y'].values
-            acc_r = df['R_FOOT_ACC_Y'].values
-            
-            # 3. Call Modular Functions
-            # sway_rms = trunk_sway.get_sway_metrics(acc, gyro, fs)
-            gait_si = symmetry.calculate_gait_symmetry(acc_l, acc_r, fs)
-            stride_cv = gait.estimate_stride_variability(acc_r, fs)            
-            # 4. Identify Dataset (Fixing the NameError)
-            # We initialize with a default to prevent NameError
-            current_dataset = "Unknown" 
-            if "NEWBEE" in str(f).upper():
-                current_dataset = "NEWBEE"
-            elif "YARETA" in str(f).upper():
-                current_dataset = "YARETA"
-            
-            results.append({
-                "file_name": f.name,
-                "gait_symmetry": gait_si,
-                "stride_variability": stride_cv,
-                "dataset": current_dataset
-            })
-            
-        except Exception as e:
-            print(f"Skipping {f.name} due to error: {e}")
+        processed_count += 1
+        rows[i] = {"file_name": f.name, **values, "dataset": _dataset_of(f)}
             
     print(f"\n--- Processed {processed_count} Gait files ---")
     print(f"--- Skipped {skipped_count} non-Gait files ---\n")
         
-    return pd.DataFrame(results).dropna(subset=["stride_variability"])
+    results = pd.DataFrame([r for r in rows if r is not None],
+                           columns=["file_name", *features, "dataset"])
+    if "stride_variability" in results:
+        results = results.dropna(subset=["stride_variability"])
+    return results
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Gait symmetry vs. stride variability regression.")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Processes used for feature extraction (default: 1)")
+    parser.add_argument("--event-index", default=None, metavar="DIR",
+                        help="Keep detected gait events in DIR and reuse them on later runs (default: off)")
+    args = parser.parse_args()
+
     # 1. --- DATA PROCESSING ---
     path_newbee = r"/Users/emilyannaallendorf/Library/CloudStorage/Box-Box/WHT Datasets/02_coords_synced/NEWBEE"
 
     path_yareta = r"/Users/emilyannaallendorf/Library/CloudStorage/Box-Box/WHT Datasets/02_coords_synced/YARETA"
     
-    df_newbee = process_data(path_newbee, 60.0, "NEWBEE")
-    df_yareta = process_data(path_yareta, 256.0, "YARETA")
+    df_newbee = process_data(path_newbee, DATASET_FS["NEWBEE"], "NEWBEE", workers=args.workers, event_index_dir=args.event_index)
+    df_yareta = process_data(path_yareta, DATASET_FS["YARETA"], "YARETA", workers=args.workers, event_index_dir=args.event_index)
     df_combined = pd.concat([df_newbee, df_yareta], ignore_index=True)
     df_combined = df_combined.dropna(subset=['gait_symmetry', 'stride_variability'])
 
@@ -0,0 +1,156 @@
+"""
+Parameter sweep for the gait peak detectors.
+
+Evaluates a grid of (distance, prominence) settings over every trial in one pass:
+each trial's foot signals are read once, centered once, and every setting reuses
+them. Output is a tidy table (one row per trial and setting) plus a per-setting
+summary with the number of trials whose SI / CV came out NaN. Trials that fail
+(unreadable, missing channels, ...) get NaN for every setting and their error text,
+so they are counted in the summary too.
+
+Usage:
+  python sweep.py DATA_PATH --fs 60 --dataset NEWBEE \
+      --distances 0.3 0.35 0.4 --prominences 0.1 0.15 0.5 --workers 4 -o sweep.csv
+
+--fs may be omitted for trials under 04_freq_unit_synced: the rate is read from
+the stage's 00_freq_unit.json.
+"""
+
+import argparse
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+import symmetry
+import gait
+from features import collect_trials
+from gait_events import GaitEventIndex, TrialEvents
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from sync_columns.table_io import read_table
+from sync_freq.freq_unit_sync import stage_fs
+
+SWEEP_COLUMNS = ["L_FOOT_ACC_Y", "R_FOOT_ACC_Y"]
+TABLE_COLUMNS = ["file_name", "distance_s", "prominence", "gait_symmetry", "stride_variability", "error"]
+
+
+def sweep_trial(path, fs, grid, event_index_dir=None):
+    """
+    SI and CV of one trial for every (distance_s, prominence) in grid.
+    Returns (rows, error message or None).
+    """
+    try:
+        df = read_table(path, columns=SWEEP_COLUMNS)
+        index = GaitEventIndex(event_index_dir) if event_index_dir else None
+        events = TrialEvents(path, fs, index=index, frame=df)
+        left = events.prepared("L_FOOT_ACC_Y", center=True)
+        right = events.prepared("R_FOOT_ACC_Y", center=True)
+        right_raw = df["R_FOOT_ACC_Y"].values
+        rows = []
+        for distance_s, prominence in grid:
+            centered = {"distance_s": distance_s, "prominence": prominence, "center": True}
+            raw = {"distance_s": distance_s, "prominence": prominence, "center": False}
+            si = symmetry.symmetry_index(
+                left, right,
+                events.peaks("L_FOOT_ACC_Y", "symmetry", centered),
+                events.peaks("R_FOOT_ACC_Y", "symmetry", centered),
+            )
+            cv = gait.estimate_stride_variability(
+                right_raw, fs, peaks=events.peaks("R_FOOT_ACC_Y", "stride", raw),
+            )
+            rows.append({
+                "file_name": Path(path).name,
+                "distance_s": distance_s,
+                "prominence": prominence,
+                "gait_symmetry": si,
+                "stride_variability": cv,
+                "error": None,
+            })
+        events.flush()
+        return rows, None
+    except Exception as e:
+        return None, str(e)
+
+
+def run_sweep(files, fs, distances, prominences, workers=1, event_index_dir=None):
+    """
+    Tidy DataFrame with one row per (trial, distance_s, prominence). A failed trial
+    has NaN SI / CV in all its rows and the error message in "error".
+    """
+    grid = list(itertools.product(distances, prominences))
+    results = [None] * len(files)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(sweep_trial, f, fs, grid, event_index_dir): i for i, f in enumerate(files)}
+            for fut in as_completed(futures):
+                results[futures[fut]] = fut.result()
+    else:
+        results = [sweep_trial(f, fs, grid, event_index_dir) for f in files]
+
+    rows = []
+    for f, (trial_rows, error) in zip(files, results):
+        if error is not None:
+            print(f"Error in {Path(f).name} (counted as NaN): {error}")
+            trial_rows = [{"file_name": Path(f).name, "distance_s": d, "prominence": p,
+                           "gait_symmetry": float("nan"), "stride_variability": float("nan"),
+                           "error": error} for d, p in grid]
+        rows.extend(trial_rows)
+    return pd.DataFrame(rows, columns=TABLE_COLUMNS)
+
+
+def summarize_sweep(table):
+    """
+    Per-setting mean SI / CV and the number of trials where each is NaN
+    (failed trials included; n_errors says how many of those failed outright).
+    """
+    grouped = table.groupby(["distance_s", "prominence"])
+    return pd.DataFrame({
+        "n_trials": grouped.size(),
+        "n_errors": grouped["error"].apply(lambda s: int(s.notna().sum())),
+        "gait_symmetry_mean": grouped["gait_symmetry"].mean(),
+        "stride_variability_mean": grouped["stride_variability"].mean(),
+        "gait_symmetry_nan": grouped["gait_symmetry"].apply(lambda s: int(s.isna().sum())),
+        "stride_variability_nan": grouped["stride_variability"].apply(lambda s: int(s.isna().sum())),
+    }).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep peak-detection settings for the gait metrics.")
+    parser.add_argument("data_path", help="Directory of synced trials (searched recursively)")
+    parser.add_argument("--fs", type=float, default=None,
+                        help="Sampling rate in Hz (default: from 00_freq_unit.json above DATA_PATH)")
+    parser.add_argument("--dataset", default="", help="Dataset name (YARETA keeps only gait trials)")
+    parser.add_argument("--distances", type=float, nargs="+", default=[0.3, 0.35, 0.4, 0.45],
+                        help="Minimum time between peaks, in seconds")
+    parser.add_argument("--prominences", type=float, nargs="+", default=[0.1, 0.15, 0.25, 0.5],
+                        help="find_peaks prominence values")
+    parser.add_argument("--workers", type=int, default=1, metavar="N")
+    parser.add_argument("--event-index", default=None, metavar="DIR",
+                        help="Keep detected gait events in DIR and reuse them on later runs (default: off)")
+    parser.add_argument("-o", "--output", default=None, help="Write the tidy table to this CSV")
+    args = parser.parse_args()
+
+    base_path = Path(args.data_path)
+    if not base_path.exists():
+        print(f"Error: The directory '{args.data_path}' does not exist.")
+        return
+    fs = args.fs or stage_fs(base_path)
+    if fs is None:
+        print(f"Error: No --fs given and no 00_freq_unit.json found above '{args.data_path}'.")
+        return
+    files, _ = collect_trials(base_path, args.dataset)
+    table = run_sweep(files, fs, args.distances, args.prominences,
+                      workers=args.workers, event_index_dir=args.event_index)
+    summary = summarize_sweep(table)
+    print(summary.to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+        summary.to_csv(str(Path(args.output).with_suffix("")) + "_summary.csv", index=False)
+        print(f"Saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
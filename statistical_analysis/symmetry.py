@@ -1,7 +1,9 @@
 import numpy as np
 from scipy.signal import find_peaks
 
-def calculate_gait_symmetry(acc_l, acc_r, fs):
+def calculate_gait_symmetry(acc_l, acc_r, fs, peaks_l=None, peaks_r=None):
+    # peaks_l / peaks_r: heel-strike indices from a gait-event index (gait_events.py);
+    # detected here when not given
     # 1. Force 1D and remove Gravity/Offset
     # Subtracting the median centers the 'quiet' parts of the signal at 0.0
     acc_l_clean = np.asarray(acc_l).flatten() - np.median(acc_l)
@@ -10,9 +12,16 @@ def calculate_gait_symmetry(acc_l, acc_r, fs):
     # 2. Relaxed Peak Detection
     # Since we are at zero, a prominence of 0.15 is very safe for heel strikes
     dist = int(fs * 0.35) # Minimum 0.35s between steps
-    peaks_l, _ = find_peaks(acc_l_clean, distance=dist, prominence=0.15)
-    peaks_r, _ = find_peaks(acc_r_clean, distance=dist, prominence=0.15)
+    if peaks_l is None:
+        peaks_l, _ = find_peaks(acc_l_clean, distance=dist, prominence=0.15)
+    if peaks_r is None:
+        peaks_r, _ = find_peaks(acc_r_clean, distance=dist, prominence=0.15)
 
+    return symmetry_index(acc_l_clean, acc_r_clean, peaks_l, peaks_r)
+
+
+def symmetry_index(acc_l_clean, acc_r_clean, peaks_l, peaks_r):
+    # SI from median-centered signals and their heel-strike indices
     # 3. Diagnostic check (helps you find why files skip)
     if len(peaks_l) < 3 or len(peaks_r) < 3:
         return np.nan
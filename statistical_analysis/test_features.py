@@ -0,0 +1,43 @@
+"""Serial and process-pool feature runs must give identical values."""
+
+import numpy as np
+import pandas as pd
+
+from features import run_features
+
+
+def _write_trials(tmp_path, n=4, fs=100.0):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(20 * fs)) / fs
+    files = []
+    for k in range(n):
+        step = 1.0 + 0.05 * k
+        df = pd.DataFrame({
+            "L_FOOT_ACC_Y": np.sin(2 * np.pi * t / step) + 0.1 * rng.normal(size=len(t)),
+            "R_FOOT_ACC_Y": np.sin(2 * np.pi * t / step + 0.3) + 0.1 * rng.normal(size=len(t)),
+        })
+        path = tmp_path / f"trial_{k}.csv"
+        df.to_csv(path, index=False)
+        files.append(path)
+    (tmp_path / "broken.csv").write_text("L_FOOT_ACC_Y\n1.0\n")
+    return files + [tmp_path / "broken.csv"]
+
+
+def _by_file(results):
+    return {i: (values, error is not None) for i, values, error in results}
+
+
+def test_serial_and_pool_agree(tmp_path):
+    files = _write_trials(tmp_path)
+    serial = _by_file(run_features(files, 100.0))
+    pooled = _by_file(run_features(files, 100.0, workers=2))
+    assert serial.keys() == pooled.keys()
+    for i in serial:
+        values, failed = serial[i]
+        assert failed == pooled[i][1], files[i].name
+        if values is not None:
+            assert values.keys() == pooled[i][0].keys()
+            for name, v in values.items():
+                # bit-for-bit, NaN included
+                assert np.array_equal(v, pooled[i][0][name], equal_nan=True), (files[i].name, name)
+    assert serial[len(files) - 1] == (None, True)
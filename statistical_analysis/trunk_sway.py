@@ -1,4 +1,22 @@
 import numpy as np
+from scipy.linalg import solve_discrete_are
+from scipy.signal import lfilter, ss2tf
+
+
+def observation_phi(acc):
+    """
+    Vectorized calculate_observation_phi for a whole trial.
+    acc: [N x 3] (X, Y, Z); returns [N] tilt observations in degrees.
+    """
+    acc = np.asarray(acc, dtype=float)
+    gx, gz = acc[:, 0] / 9.81, acc[:, 2] / 9.81
+    denom = np.cos(np.arcsin(np.clip(gx, -1.0, 1.0)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        phi = np.degrees(np.arcsin(np.clip(gz / denom, -1.0, 1.0)))
+    # Tilted 90 degrees: same fallback as the scalar version
+    phi[np.abs(denom) < 1e-6] = 0.0
+    return phi
+
 
 class TrunkSwayKalman:
     def __init__(self, fs):
@@ -34,12 +52,25 @@ class TrunkSwayKalman:
         except:
             return 0.0
 
-    def estimate(self, acc, gyro):
+    def estimate(self, acc, gyro, method="fast"):
         """
         Runs the Kalman filter over the entire trial.
         acc: [N x 3] (X, Y, Z)
         gyro: [N x 3] (X, Y, Z)
+        method: "fast"      exact recursion, observations computed in one vectorized pass
+                "steady"    steady-state gain as a closed-form linear filter (approximate
+                            during the first samples, while the exact gain converges)
+                "reference" original per-sample matrix loop
         """
+        if method == "fast":
+            return self._estimate_fast(acc, gyro)
+        if method == "steady":
+            return self._estimate_steady(acc, gyro)
+        if method == "reference":
+            return self._estimate_reference(acc, gyro)
+        raise ValueError(f"Unknown method '{method}' (fast, steady, reference)")
+
+    def _estimate_reference(self, acc, gyro):
         angles = []
         for i in range(len(acc)):
             # --- Observation Step ---
@@ -70,11 +101,151 @@ class TrunkSwayKalman:
             
         return np.array(angles)
 
-def get_sway_metrics(acc, gyro, fs):
+    def kalman_gains(self, n):
+        """
+        Gain sequence [n x 2] (tilt, drift) of n filter steps starting from self.P.
+        P never depends on the data, so the gains are computed before the state
+        recursion (and can be shared by every trial of the same rate). Updates self.P.
+        """
+        T = self.T
+        q00, q01, q10, q11 = (float(v) for v in np.ravel(self.Q))
+        R = float(self.R)
+        p00, p01, p10, p11 = (float(v) for v in np.ravel(self.P))
+        k_tilt, k_drift = [], []
+        for _ in range(n):
+            # Prediction: P = A P A^T + Q, with A = [[1, -T], [0, 1]]
+            a00 = p00 - T * (p10 + p01) + T * T * p11 + q00
+            a01 = p01 - T * p11 + q01
+            a10 = p10 - T * p11 + q10
+            a11 = p11 + q11
+            # Gain and update: P = (I - K H) P, with H = [1, 0]
+            S = a00 + R
+            k0, k1 = a00 / S, a10 / S
+            p00, p01 = (1.0 - k0) * a00, (1.0 - k0) * a01
+            p10, p11 = a10 - k1 * a00, a11 - k1 * a01
+            k_tilt.append(k0)
+            k_drift.append(k1)
+        self.P = np.array([[p00, p01], [p10, p11]])
+        return np.column_stack([k_tilt, k_drift]) if n else np.empty((0, 2))
+
+    def _estimate_fast(self, acc, gyro):
+        phi = observation_phi(acc).tolist()
+        omega = np.asarray(gyro, dtype=float)[:, 0].tolist()
+        gains = self.kalman_gains(len(phi))
+        T = self.T
+        theta, drift = float(self.X[0]), float(self.X[1])
+        angles = [0.0] * len(phi)
+        for i, (phi_g, w, k0, k1) in enumerate(zip(phi, omega, gains[:, 0].tolist(), gains[:, 1].tolist())):
+            theta += T * (w - drift)
+            innovation = phi_g - theta
+            theta += k0 * innovation
+            drift += k1 * innovation
+            angles[i] = theta
+        self.X = np.array([theta, drift])
+        return np.array(angles)
+
+    def steady_state_gain(self):
+        """
+        Limit of the Kalman gain (tilt, drift) and the matching predicted covariance.
+        """
+        A = np.array([[1.0, -self.T], [0.0, 1.0]])
+        H = np.array([[1.0, 0.0]])
+        P_pred = solve_discrete_are(A.T, H.T, self.Q, np.array([[self.R]]))
+        K = (P_pred @ H.T / (H @ P_pred @ H.T + self.R)).ravel()
+        return K, P_pred
+
+    def _estimate_steady(self, acc, gyro):
+        """
+        With a constant gain the filter is linear time-invariant:
+          x[k] = M x[k-1] + G u[k],  M = (I - K H) A,  G = [(I - K H) B, K],  u = [gyro_x, phi]
+        so tilt and drift are sums of IIR filters (scipy lfilter) of the inputs. The
+        initial state enters as an impulse at k = 0.
+        """
+        K, P_pred = self.steady_state_gain()
+        A = np.array([[1.0, -self.T], [0.0, 1.0]])
+        B = np.array([self.T, 0.0])
+        H = np.array([[1.0, 0.0]])
+        IKH = np.eye(2) - np.outer(K, H)
+        M = IKH @ A
+        # State-space with s[k] = x[k-1]: s[k+1] = M s[k] + G u[k], x[k] = M s[k] + G u[k]
+        G = np.column_stack([IKH @ B, K, M])  # inputs: gyro_x, phi, x0 impulse (2)
+        D = np.column_stack([IKH @ B, K, M])
+
+        phi = observation_phi(acc)
+        n = len(phi)
+        impulse = np.zeros(n)
+        if n:
+            impulse[0] = 1.0
+        inputs = [
+            np.asarray(gyro, dtype=float)[:, 0],
+            phi,
+            impulse * float(self.X[0]),
+            impulse * float(self.X[1]),
+        ]
+        state = np.zeros((2, n))
+        for j, u in enumerate(inputs):
+            num, den = ss2tf(M, G, M, D, input=j)
+            for row in range(2):
+                state[row] += lfilter(num[row], den, u)
+        if n:
+            self.X = state[:, -1].copy()
+            self.P = IKH @ P_pred
+        return state[0]
+
+
+def get_sway_metrics(acc, gyro, fs, method="fast"):
     """
     Modular wrapper used by analysis.py
     """
     kf = TrunkSwayKalman(fs)
-    angles = kf.estimate(acc, gyro)
+    angles = kf.estimate(acc, gyro, method=method)
     # Calculate Root Mean Square (RMS) of the sway angles
-    return np.sqrt(np.mean(np.square(angles)))
\ No newline at end of file
+    return np.sqrt(np.mean(np.square(angles)))
+
+
+def estimate_batch(trials, fs, method="fast"):
+    """
+    Sway angles for many trials recorded at the same rate.
+    trials: iterable of (acc [N x 3], gyro [N x 3]); returns a list of [N] angle arrays.
+    With method="fast" the gain sequence is computed once and the state recursion
+    runs over all trials together, one vectorized step per sample.
+    """
+    trials = list(trials)
+    if method != "fast":
+        return [TrunkSwayKalman(fs).estimate(acc, gyro, method=method) for acc, gyro in trials]
+    if not trials:
+        return []
+
+    lengths = [len(acc) for acc, _ in trials]
+    n_max = max(lengths)
+    kf = TrunkSwayKalman(fs)
+    gains = kf.kalman_gains(n_max)
+
+    # Pad to a common length; padding only affects samples after each trial ends
+    phi = np.zeros((n_max, len(trials)))
+    omega = np.zeros((n_max, len(trials)))
+    for j, (acc, gyro) in enumerate(trials):
+        phi[:lengths[j], j] = observation_phi(acc)
+        omega[:lengths[j], j] = np.asarray(gyro, dtype=float)[:, 0]
+
+    T = kf.T
+    theta = np.zeros(len(trials))
+    drift = np.zeros(len(trials))
+    angles = np.empty((n_max, len(trials)))
+    for i in range(n_max):
+        theta += T * (omega[i] - drift)
+        innovation = phi[i] - theta
+        theta += gains[i, 0] * innovation
+        drift += gains[i, 1] * innovation
+        angles[i] = theta
+    return [angles[:n, j].copy() for j, n in enumerate(lengths)]
+
+
+def get_sway_metrics_batch(trials, fs, method="fast"):
+    """
+    RMS sway angle for each of many (acc, gyro) trials; returns an array.
+    """
+    return np.array([
+        np.sqrt(np.mean(np.square(angles)))
+        for angles in estimate_batch(trials, fs, method=method)
+    ])
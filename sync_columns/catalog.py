@@ -0,0 +1,465 @@
+"""
+Trial catalog: a SQLite index of every table in every pipeline stage.
+
+One row per trial file under WHT_DATASETS_DIR, with the stage and dataset it
+belongs to, its pid / session / activity, format, row count, sampling rate,
+channel list and SHA-256. Scripts can then ask for "all YARETA gait trials with
+L/R foot ACC" without walking the Box-synced tree:
+
+  from sync_columns.catalog import Catalog
+  cat = Catalog()
+  cat.paths(dataset="YARETA", stage="02_coords_synced", activity="%Gait%",
+            channels=["L_FOOT_ACC_Y", "R_FOOT_ACC_Y"])
+
+Paths are stored relative to the catalog root (WHT_DATASETS_DIR), so one catalog
+file works on every machine the Box folder is synced to. A scan only re-reads
+files whose size or mtime changed; stages call record_outputs() for the files
+they just wrote, so the catalog follows a pipeline run without a rescan.
+
+pid / session / activity come from the restructured name (p-.._s-.._a-..) or
+from the dataset's path parser in TRIAL_PARSERS (register_trial_parser).
+
+Usage:
+  python catalog.py scan                              # whole tree (incremental)
+  python catalog.py scan --stage 02_coords_synced --dataset YARETA
+  python catalog.py query --dataset YARETA --activity %Gait% --channels L_FOOT_ACC_Y R_FOOT_ACC_Y
+  python catalog.py stats
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+try:
+    from sync_columns.config import (
+        BLUE, GREEN, YELLOW, RED, RESET, WHT_DATASETS_DIR, CATALOG_PATH, DATASET_FS, TARGET_FS,
+    )
+    from sync_columns.manifest import HASH_BLOCK_SIZE
+    from sync_columns.table_io import find_table_files, format_of, count_rows, read_table_columns
+except ImportError:
+    from config import BLUE, GREEN, YELLOW, RED, RESET, WHT_DATASETS_DIR, CATALOG_PATH, DATASET_FS, TARGET_FS
+    from manifest import HASH_BLOCK_SIZE
+    from table_io import find_table_files, format_of, count_rows, read_table_columns
+
+CATALOG_VERSION = 1
+STAGE_RE = re.compile(r"^\d\d_")                # 00_raw, 01_columns_synced, ...
+HARMONIZED_STAGES = ("04_freq_unit_synced", "05_restruc")   # tables at TARGET_FS
+EXPORT_STAGES = ("06_windows",)                  # window shards, not trials
+FREQ_UNIT_FILE = "00_freq_unit.json"             # written by sync_freq/freq_unit_sync.py
+RESTRUC_NAME_RE = re.compile(r"^p-(?P<pid>.+?)_s-(?P<session>.+?)_a-(?P<activity>.+)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS trials (
+    path      TEXT PRIMARY KEY,     -- relative to the catalog root
+    stage     TEXT NOT NULL,
+    dataset   TEXT NOT NULL,
+    pid       TEXT,
+    session   TEXT,
+    activity  TEXT,
+    format    TEXT,
+    rows      INTEGER,
+    fs        REAL,
+    size      INTEGER,
+    mtime_ns  INTEGER,
+    sha256    TEXT,
+    scanned   REAL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    path    TEXT NOT NULL REFERENCES trials(path) ON DELETE CASCADE,
+    channel TEXT NOT NULL,
+    PRIMARY KEY (path, channel)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS trials_lookup ON trials (dataset, stage, activity);
+CREATE INDEX IF NOT EXISTS channels_by_name ON channels (channel, path);
+"""
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Trial metadata from paths
+# ══════════════════════════════════════════════════════════════════════════════
+
+TRIAL_PARSERS = {}
+
+
+def register_trial_parser(dataset):
+    """Decorator: func(parts) -> {"pid", "session", "activity"} for one dataset.
+
+    parts are the path components below <stage>/<dataset>/, file name last (without extension).
+    """
+    def wrap(func):
+        TRIAL_PARSERS[dataset] = func
+        return func
+    return wrap
+
+
+@register_trial_parser("YARETA")
+def _yareta(parts):
+    # P01_S01/SYNC_DATA/P01_S01_SlowGait_01.csv (coord stage adds _isb)
+    m = re.match(r"^P(\d+)_S(\d+)_(.+?)_\d+(?:_isb)?$", parts[-1])
+    if not m:
+        return {}
+    return {"pid": m.group(1), "session": m.group(2), "activity": m.group(3)}
+
+
+@register_trial_parser("HUGADB")
+def _hugadb(parts):
+    # HuGaDB_v2_various_01_00.csv
+    m = re.match(r"^HuGaDB_v\d+_(.+)_(\d+)_(\d+)$", parts[-1])
+    if not m:
+        return {}
+    return {"pid": m.group(2), "session": m.group(3), "activity": m.group(1)}
+
+
+@register_trial_parser("RealWorldHAR")
+def _realworldhar(parts):
+    # PROBAND 13/walking.csv
+    m = re.match(r"^proband\s*(\d+)$", parts[0], re.IGNORECASE) if len(parts) > 1 else None
+    return {"pid": m.group(1) if m else None, "activity": parts[-1]}
+
+
+@register_trial_parser("NEWBEE")
+def _newbee(parts):
+    # <course>/id01/xsens.csv
+    out = {"session": parts[0] if len(parts) > 2 else None}
+    for p in parts[:-1]:
+        m = re.match(r"^id(\d+)$", p, re.IGNORECASE)
+        if m:
+            out["pid"] = m.group(1)
+    return out
+
+
+def parse_trial(dataset, parts):
+    """pid / session / activity for a file at <stage>/<dataset>/<parts...>."""
+    stem = parts[-1]
+    m = RESTRUC_NAME_RE.match(stem)
+    if m:
+        return m.groupdict()
+    info = {"pid": None, "session": None, "activity": None}
+    parser = TRIAL_PARSERS.get(dataset)
+    if parser is not None:
+        info.update(parser(parts))
+    return info
+
+
+def split_catalog_path(rel):
+    """(stage, dataset, parts below the dataset dir with the extension dropped) or None.
+
+    Files outside a NN_stage/<dataset>/ directory, export shards (EXPORT_STAGES) and
+    anything under a 00_* helper directory (mappings, manifests, caches, reports, ...)
+    are not trials.
+    """
+    parts = Path(rel).parts
+    if len(parts) < 3 or not STAGE_RE.match(parts[0]) or parts[0] in EXPORT_STAGES:
+        return None
+    if any(p.startswith("00_") for p in parts[1:]):
+        return None
+    name = parts[-1]
+    stem = name[:-len(".chan")] if name.endswith(".chan") else os.path.splitext(name)[0]
+    return parts[0], parts[1], list(parts[2:-1]) + [stem]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# File fingerprints
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _files_of(path):
+    """The files making up a table (a channel store is a directory)."""
+    if os.path.isdir(path):
+        return sorted(e.path for e in os.scandir(path) if e.is_file())
+    return [path]
+
+
+def table_stat(path):
+    """(size, mtime_ns) of a table; for a channel store the sum and the latest mtime."""
+    size = mtime = 0
+    for f in _files_of(path):
+        st = os.stat(f)
+        size += st.st_size
+        mtime = max(mtime, st.st_mtime_ns)
+    return size, mtime
+
+
+def table_digest(path):
+    """(SHA-256, row count) in one pass over the bytes (CSV rows counted as in count_rows)."""
+    h = hashlib.sha256()
+    is_csv = format_of(path) == "csv"
+    lines, last = 0, b"\n"
+    for f in _files_of(path):
+        with open(f, "rb") as fh:
+            for block in iter(lambda: fh.read(HASH_BLOCK_SIZE), b""):
+                h.update(block)
+                if is_csv:
+                    lines += block.count(b"\n")
+                    last = block[-1:]
+    if not is_csv:
+        return h.hexdigest(), count_rows(path)
+    if last != b"\n":
+        lines += 1
+    return h.hexdigest(), max(lines - 1, 0)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Catalog
+# ══════════════════════════════════════════════════════════════════════════════
+
+class Catalog:
+    """
+    SQLite trial index rooted at `root` (stage directories are its children).
+    Opening a catalog that does not exist raises FileNotFoundError unless create
+    (used by `catalog.py scan`), so no directories appear on machines without the data.
+    """
+
+    def __init__(self, path=CATALOG_PATH, root=None, create=False):
+        if not create and not os.path.isfile(path):
+            raise FileNotFoundError(f"Catalog not found: {path} (run `python catalog.py scan` first)")
+        self.path = path
+        self.root = os.path.abspath(root or os.path.dirname(path) or WHT_DATASETS_DIR)
+        if create:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('version', ?)", (str(CATALOG_VERSION),))
+        self.conn.commit()
+        self._fs_cache = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # ── Writing ──────────────────────────────────────────────────────────
+
+    def _rel(self, path):
+        rel = os.path.relpath(os.path.abspath(path), self.root)
+        return None if rel.startswith("..") else Path(rel).as_posix()
+
+    def _stage_fs(self, stage, dataset):
+        """Rate of a stage's tables: its 00_freq_unit.json, else TARGET_FS / DATASET_FS."""
+        key = (stage, dataset)
+        if key not in self._fs_cache:
+            fs = None
+            stage_file = os.path.join(self.root, stage, dataset, FREQ_UNIT_FILE)
+            if os.path.isfile(stage_file):
+                with open(stage_file) as f:
+                    fs = float(json.load(f)["fs"])
+            elif stage in HARMONIZED_STAGES:
+                fs = TARGET_FS
+            else:
+                fs = DATASET_FS.get(dataset)
+            self._fs_cache[key] = fs
+        return self._fs_cache[key]
+
+    def update(self, path, force=False):
+        """
+        Add or refresh one table. Unchanged files (same size and mtime) are not
+        re-read unless force. Returns "added", "updated", "unchanged" or None
+        (not a trial under the catalog root).
+        """
+        rel = self._rel(path)
+        where = split_catalog_path(rel) if rel else None
+        if where is None:
+            return None
+        stage, dataset, parts = where
+        size, mtime = table_stat(path)
+        row = self.conn.execute("SELECT size, mtime_ns FROM trials WHERE path = ?", (rel,)).fetchone()
+        if row is not None and not force and (row["size"], row["mtime_ns"]) == (size, mtime):
+            return "unchanged"
+
+        sha, rows = table_digest(path)
+        channels = [str(c).strip() for c in read_table_columns(path)]
+        info = parse_trial(dataset, parts)
+        self.conn.execute("DELETE FROM trials WHERE path = ?", (rel,))
+        self.conn.execute(
+            "INSERT INTO trials (path, stage, dataset, pid, session, activity, format, rows, fs,"
+            " size, mtime_ns, sha256, scanned) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (rel, stage, dataset, info["pid"], info["session"], info["activity"], format_of(path),
+             rows, self._stage_fs(stage, dataset), size, mtime, sha, time.time()),
+        )
+        self.conn.executemany("INSERT OR IGNORE INTO channels VALUES (?, ?)",
+                              [(rel, c) for c in channels])
+        return "added" if row is None else "updated"
+
+    def scan(self, stages=None, datasets=None, force=False, verbose=True):
+        """
+        Walk <root>/<stage>/<dataset>/ and bring the catalog up to date: new and
+        changed tables are read, vanished ones removed. Returns counts per outcome.
+        """
+        stages = stages or sorted(d for d in os.listdir(self.root)
+                                  if STAGE_RE.match(d) and d not in EXPORT_STAGES
+                                  and os.path.isdir(os.path.join(self.root, d)))
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+        t0 = time.perf_counter()
+        for stage in stages:
+            stage_dir = os.path.join(self.root, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            names = datasets or sorted(d for d in os.listdir(stage_dir)
+                                       if not d.startswith("00_") and os.path.isdir(os.path.join(stage_dir, d)))
+            for dataset in names:
+                ds_dir = os.path.join(stage_dir, dataset)
+                seen = set()
+                for path in find_table_files(ds_dir) if os.path.isdir(ds_dir) else []:
+                    try:
+                        outcome = self.update(path, force=force)
+                    except Exception as e:
+                        counts["failed"] += 1
+                        if verbose:
+                            print(f"  {YELLOW}[WARN]{RESET} {path}: {e}")
+                        seen.add(self._rel(path))  # still there: keep its row (e.g. mid Box sync)
+                        continue
+                    if outcome is not None:
+                        counts[outcome] += 1
+                        seen.add(self._rel(path))
+                known = {r[0] for r in self.conn.execute(
+                    "SELECT path FROM trials WHERE stage = ? AND dataset = ?", (stage, dataset))}
+                gone = sorted(known - seen)
+                self.conn.executemany("DELETE FROM trials WHERE path = ?", [(p,) for p in gone])
+                counts["removed"] += len(gone)
+                self.conn.commit()
+                if verbose:
+                    print(f"  {stage}/{dataset}: {len(seen)} trials")
+        if verbose:
+            summary = ", ".join(f"{n} {k}" for k, n in counts.items() if n)
+            print(f"{GREEN}Catalog up to date{RESET} ({summary or 'empty'}) in {time.perf_counter() - t0:.1f} s")
+        return counts
+
+    # ── Queries ──────────────────────────────────────────────────────────
+
+    def find(self, dataset=None, stage=None, pid=None, session=None, activity=None,
+             channels=(), fmt=None, path=None):
+        """
+        Trials matching every given filter, as dicts (path made absolute, plus a
+        "channels" list). dataset / pid / session / activity are SQL LIKE patterns
+        (case-insensitive for ASCII, "%" wildcard); channels must all be present;
+        path is an exact path relative to the catalog root.
+        """
+        where, args = [], []
+        for col, val in (("dataset", dataset), ("pid", pid), ("session", session), ("activity", activity)):
+            if val is not None:
+                where.append(f"t.{col} LIKE ?")
+                args.append(val)
+        for col, val in (("stage", stage), ("format", fmt), ("path", path)):
+            if val is not None:
+                where.append(f"t.{col} = ?")
+                args.append(val)
+        channels = list(dict.fromkeys(channels))
+        if channels:
+            where.append(
+                "t.path IN (SELECT path FROM channels WHERE channel IN ({}) "
+                "GROUP BY path HAVING COUNT(*) = ?)".format(", ".join("?" * len(channels)))
+            )
+            args += channels + [len(channels)]
+        sql = ("SELECT t.*, (SELECT group_concat(channel, ',') FROM channels c WHERE c.path = t.path)"
+               " AS channel_list FROM trials t")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY t.path"
+        out = []
+        for row in self.conn.execute(sql, args):
+            trial = dict(row)
+            trial["channels"] = sorted((trial.pop("channel_list") or "").split(",")) if row["channel_list"] else []
+            trial["path"] = os.path.join(self.root, *trial["path"].split("/"))
+            out.append(trial)
+        return out
+
+    def get(self, path):
+        """Catalog entry of one table (as returned by find), or None if it is not indexed."""
+        rel = self._rel(path)
+        if rel is None:
+            return None
+        found = self.find(path=rel)
+        return found[0] if found else None
+
+    def paths(self, **filters):
+        """Absolute paths of the trials matching find(**filters)."""
+        return [t["path"] for t in self.find(**filters)]
+
+    def stats(self):
+        """[(stage, dataset, trials, rows)] over the whole catalog."""
+        return [tuple(r) for r in self.conn.execute(
+            "SELECT stage, dataset, COUNT(*), SUM(rows) FROM trials GROUP BY stage, dataset ORDER BY stage, dataset")]
+
+
+def record_outputs(paths, catalog_path=CATALOG_PATH):
+    """
+    Add freshly written stage outputs to an existing catalog. Paths outside the catalog
+    root are ignored, and a catalog error only prints a warning: indexing never fails a stage.
+    """
+    paths = list(paths)
+    if not paths or not os.path.isfile(catalog_path):
+        return  # nothing written, or no catalog yet (`catalog.py scan` creates it)
+    try:
+        with Catalog(catalog_path) as cat:
+            n = sum(cat.update(p) is not None for p in paths if os.path.exists(p))
+            cat.conn.commit()
+        if n:
+            print(f"  Catalog: {n} trials recorded in {catalog_path}")
+    except Exception as e:
+        print(f"  {YELLOW}[WARN] Catalog not updated: {e}{RESET}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog", default=CATALOG_PATH, help="SQLite file (default: CATALOG_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan = sub.add_parser("scan", help="Index new and changed tables, drop vanished ones")
+    scan.add_argument("--stage", nargs="+", default=None, help="Stage directories (default: all NN_*)")
+    scan.add_argument("--dataset", nargs="+", default=None, help="Datasets (default: all)")
+    scan.add_argument("--force", action="store_true", help="Re-read every table")
+
+    query = sub.add_parser("query", help="List trials matching filters")
+    query.add_argument("--dataset")
+    query.add_argument("--stage")
+    query.add_argument("--pid")
+    query.add_argument("--session")
+    query.add_argument("--activity", help="LIKE pattern, e.g. %%Gait%%")
+    query.add_argument("--channels", nargs="+", default=(), help="Channels that must all be present")
+    query.add_argument("--long", action="store_true", help="Also print rows, fs and pid/session/activity")
+
+    sub.add_parser("stats", help="Trials and rows per stage and dataset")
+    args = parser.parse_args()
+
+    try:
+        cat = Catalog(args.catalog, create=args.command == "scan")
+    except FileNotFoundError as e:
+        print(f"{RED}[ERROR] {e}{RESET}")
+        sys.exit(1)
+    with cat:
+        if args.command == "scan":
+            print(f"{BLUE}CATALOG SCAN: {cat.root}{RESET}")
+            cat.scan(stages=args.stage, datasets=args.dataset, force=args.force)
+        elif args.command == "query":
+            t0 = time.perf_counter()
+            trials = cat.find(dataset=args.dataset, stage=args.stage, pid=args.pid,
+                              session=args.session, activity=args.activity, channels=args.channels)
+            for t in trials:
+                if args.long:
+                    print(f"{t['path']}\t{t['rows']}\t{t['fs']}\t{t['pid']}\t{t['session']}\t{t['activity']}")
+                else:
+                    print(t["path"])
+            print(f"{len(trials)} trials ({(time.perf_counter() - t0) * 1000:.1f} ms)", file=sys.stderr)
+        else:
+            for stage, dataset, n, rows in cat.stats():
+                print(f"  {stage:<22} {dataset:<14} {n:>6} trials {rows or 0:>12} rows")
+
+
+if __name__ == "__main__":
+    main()
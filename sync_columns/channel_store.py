@@ -0,0 +1,180 @@
+"""
+Memory-mapped binary channel store for harmonized SEGMENT_SENSOR_AXIS data.
+
+Each trial is packed into a directory `<stem>.chan/`:
+  header.json  {"version": 1, "n_samples": N, "channels": [...], "dtype": "float32", ...}
+  data.npy     (n_channels, n_samples) float32, channel-major
+
+Channel-major layout keeps every channel contiguous on disk, so a consumer that
+needs two channels (e.g. L_FOOT_ACC_Y, R_FOOT_ACC_Y) maps the file with
+numpy.memmap and touches only those two rows instead of parsing 40+ text columns.
+
+Usage:
+  python channel_store.py pack <src_dir> <dst_dir>      # pack every table under src_dir
+  python channel_store.py info <trial.chan>
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+try:
+    from sync_columns.config import BLUE, GREEN, YELLOW, RED, RESET, SENSOR_DTYPE
+    from sync_columns.table_io import find_table_files, is_sensor_column, read_table
+except ImportError:
+    from config import BLUE, GREEN, YELLOW, RED, RESET, SENSOR_DTYPE
+    from table_io import find_table_files, is_sensor_column, read_table
+
+STORE_EXT = ".chan"
+STORE_VERSION = 1
+HEADER_NAME = "header.json"
+DATA_NAME = "data.npy"
+
+
+def is_channel_store(path):
+    """True if path is a packed trial directory."""
+    return str(path).endswith(STORE_EXT) and os.path.isfile(os.path.join(path, HEADER_NAME))
+
+
+def write_trial(df, store_path, dtype=SENSOR_DTYPE):
+    """Pack the SEGMENT_SENSOR_AXIS columns of df into store_path (a `.chan` directory).
+
+    Non-sensor columns (activity, EMG, ...) are not stored; their names are kept in the header.
+    The store is written to a temporary directory and renamed into place.
+    """
+    channels = [c for c in df.columns if is_sensor_column(c)]
+    dropped = [str(c) for c in df.columns if c not in channels]
+    data = np.empty((len(channels), len(df)), dtype=dtype)
+    for i, c in enumerate(channels):
+        data[i] = df[c].to_numpy(dtype)
+
+    store_path = str(store_path)
+    tmp = store_path + ".tmp"
+    if os.path.isdir(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, DATA_NAME), data)
+    with open(os.path.join(tmp, HEADER_NAME), "w") as f:
+        json.dump({
+            "version": STORE_VERSION,
+            "n_samples": int(len(df)),
+            "channels": channels,
+            "dtype": np.dtype(dtype).name,
+            "dropped_columns": dropped,
+        }, f, indent=1)
+    if os.path.isdir(store_path):
+        shutil.rmtree(store_path)
+    os.replace(tmp, store_path)
+    return store_path
+
+
+class ChannelTrial:
+    """Read-only view of a packed trial; channel data is memory-mapped, not loaded."""
+
+    def __init__(self, store_path):
+        self.path = str(store_path)
+        with open(os.path.join(self.path, HEADER_NAME)) as f:
+            self.header = json.load(f)
+        if self.header.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported channel store version in {self.path}")
+        self.channels = list(self.header["channels"])
+        self.n_samples = int(self.header["n_samples"])
+        self._index = {c: i for i, c in enumerate(self.channels)}
+        self._data = None
+
+    @property
+    def data(self):
+        """(n_channels, n_samples) memmap of the whole trial."""
+        if self._data is None:
+            self._data = np.load(os.path.join(self.path, DATA_NAME), mmap_mode="r")
+        return self._data
+
+    def __contains__(self, channel):
+        return channel in self._index
+
+    def __len__(self):
+        return self.n_samples
+
+    def channel(self, name):
+        """Zero-copy 1-D view of one channel."""
+        try:
+            return self.data[self._index[name]]
+        except KeyError:
+            raise KeyError(f"Channel '{name}' not in {self.path}") from None
+
+    def read(self, names):
+        """Dict {name: 1-D view} for the requested channels."""
+        return {n: self.channel(n) for n in names}
+
+    def to_frame(self, names=None):
+        """DataFrame of the requested channels (copies only those channels)."""
+        names = self.channels if names is None else list(names)
+        return pd.DataFrame({n: np.asarray(self.channel(n)) for n in names})
+
+
+def open_trial(store_path):
+    """Open a packed trial for reading."""
+    return ChannelTrial(store_path)
+
+
+def store_path_for(table_path, src_root, dst_root):
+    """Mirror src_root/<rel>/<stem>.csv to dst_root/<rel>/<stem>.chan."""
+    rel = os.path.relpath(table_path, src_root)
+    return os.path.join(dst_root, os.path.splitext(rel)[0] + STORE_EXT)
+
+
+def _pack_one(src, dst):
+    try:
+        write_trial(read_table(src), dst)
+        return src, None
+    except Exception as e:
+        return src, str(e)
+
+
+def pack_tree(src_root, dst_root, workers=1):
+    """Pack every table under src_root into a mirrored tree of channel stores."""
+    tables = [p for p in find_table_files(src_root) if not is_channel_store(p)]
+    jobs = [(p, store_path_for(p, src_root, dst_root)) for p in tables]
+    print(f"{BLUE}PACKING: {len(jobs)} tables from {src_root} → {dst_root}{RESET}")
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_pack_one, *zip(*jobs))) if jobs else []
+    else:
+        results = [_pack_one(src, dst) for src, dst in jobs]
+    failures = [(src, err) for src, err in results if err]
+    for src, err in failures:
+        print(f"{RED}[FAIL] {src}: {err}{RESET}")
+    print(f"{GREEN}Packed {len(jobs) - len(failures)} / {len(jobs)} trials{RESET}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped channel store for harmonized trials.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_pack = sub.add_parser("pack", help="Pack every table under SRC into channel stores under DST")
+    p_pack.add_argument("src")
+    p_pack.add_argument("dst")
+    p_pack.add_argument("--workers", type=int, default=1, metavar="N")
+    p_info = sub.add_parser("info", help="Show the header of a packed trial")
+    p_info.add_argument("store")
+    args = parser.parse_args()
+
+    if args.cmd == "pack":
+        pack_tree(args.src, args.dst, workers=args.workers)
+    elif args.cmd == "info":
+        trial = open_trial(args.store)
+        print(f"{trial.path}: {trial.n_samples} samples × {len(trial.channels)} channels")
+        print(f"  {trial.channels}")
+        if trial.header.get("dropped_columns"):
+            print(f"  {YELLOW}not stored: {trial.header['dropped_columns']}{RESET}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,13 @@ WHT_DATASETS_DIR = "/Users/nny/Library/CloudStorage/Box-Box/WHT Datasets"
 RAW_DIR = join(WHT_DATASETS_DIR, "00_raw")
 SYNCED_DIR = join(WHT_DATASETS_DIR, "01_columns_synced")
 MAPPING_DIR = join(SYNCED_DIR, "00_mappings")
+MANIFEST_DIR = join(SYNCED_DIR, "00_manifests")  # per-dataset build manifests for incremental re-runs
+COORDS_SYNCED_DIR = join(WHT_DATASETS_DIR, "02_coords_synced")
+RAW_CACHE_DIR = join(COORDS_SYNCED_DIR, "00_raw_cache")  # projected raw blocks (.npz) reused by re-runs
+FREQ_UNIT_SYNCED_DIR = join(WHT_DATASETS_DIR, "04_freq_unit_synced")
+RESTRUC_DIR = join(WHT_DATASETS_DIR, "05_restruc")
+WINDOWS_DIR = join(WHT_DATASETS_DIR, "06_windows")  # sharded ML windows (ml_export/window_export.py)
+CATALOG_PATH = join(WHT_DATASETS_DIR, "00_catalog.sqlite")  # trial index over every stage (catalog.py)
 RAW_DIR_MARKER = "00_raw"  # used to extract dataset name from path
 
 # Canonical sensor types for inertial measurement units (IMU)
@@ -39,6 +46,55 @@ SENSOR_SEGMENTS = {
 
 AXES = ['X', 'Y', 'Z']
 
+# Xsens MVN segment name for each canonical segment (NEWBEE exports)
+XSENS_SEGMENTS = {
+    "PELVIS": "Pelvis",
+    "TRUNK": "T8",
+    "HEAD": "Head",
+    "R_SHOULDER": "RightShoulder",
+    "L_SHOULDER": "LeftShoulder",
+    "R_ARM": "RightUpperArm",
+    "L_ARM": "LeftUpperArm",
+    "R_FOREARM": "RightForeArm",
+    "L_FOREARM": "LeftForeArm",
+    "R_HAND": "RightHand",
+    "L_HAND": "LeftHand",
+    "R_THIGH": "RightUpperLeg",
+    "L_THIGH": "LeftUpperLeg",
+    "R_SHANK": "RightLowerLeg",
+    "L_SHANK": "LeftLowerLeg",
+    "R_FOOT": "RightFoot",
+    "L_FOOT": "LeftFoot",
+}
+
+# --- LLM column mapping (get_mapping.py) ---
+LLM_MODEL = "gpt-4o-mini"
+LLM_CACHE_PATH = join(MAPPING_DIR, "llm_column_cache.json")  # normalized raw column → standard name
+LLM_BATCH_SIZE = 60        # columns per request when mapping several datasets at once
+LLM_MAX_CONCURRENCY = 4    # concurrent requests in flight
+
+# --- Output table format shared by every pipeline stage (see table_io.py) ---
+# "csv" (plain text) or "parquet" (columnar; needs pyarrow)
+OUTPUT_FORMAT = "csv"
+PARQUET_COMPRESSION = "zstd"
+SENSOR_DTYPE = "float32"  # dtype for SEGMENT_SENSOR_AXIS columns in Parquet output
+
+# --- Frequency / unit harmonization (sync_freq/freq_unit_sync.py) ---
+TARGET_FS = 100.0  # common sampling rate (Hz) of every table in 04_freq_unit_synced
+# Native rate (Hz) of each dataset's synced tables
+DATASET_FS = {
+    "NEWBEE": 60.0,        # Xsens export
+    "YARETA": 256.0,       # SYNC_DATA IMU rate, as used by statistical_analysis
+    "CAMARGO": 200.0,
+    "HUGADB": 56.35,
+    "RealWorldHAR": 50.0,
+}
+# Units known from the dataset documentation; channels not listed are detected from the data
+DATASET_UNITS = {
+    "NEWBEE": {"ACC": "m/s^2", "GYR": "rad/s"},   # sensorFreeAcceleration, angularVelocity
+    "RealWorldHAR": {"GYR": "rad/s"},             # Android gyroscope
+}
+
 # Dataset-specific subdirs under RAW_DIR
 DATASET_ROOTS = {
     "YARETA": join(RAW_DIR, "YARETA", "Human gait and other movements - markers inertial sensors pressure insoles force plates", "researchdata"),
@@ -15,12 +15,15 @@ import os
 import sys
 import re
 import json
+import asyncio
 import argparse
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 
 import pandas as pd
 from tqdm import tqdm
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
 # Ensure parent (course/) is on path for package imports
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -28,15 +31,39 @@ try:
     from sync_columns.config import (
         BLUE, GREEN, YELLOW, RED, RESET, SENSOR_TYPES, SENSOR_SEGMENTS,
         MAPPING_DIR, RAW_DIR, RAW_DIR_MARKER, SYNCED_DIR,
+        LLM_MODEL, LLM_CACHE_PATH, LLM_BATCH_SIZE, LLM_MAX_CONCURRENCY, XSENS_SEGMENTS,
     )
+    from sync_columns.table_io import is_sensor_column
 except ImportError:
     from config import (
         BLUE, GREEN, YELLOW, RED, RESET, SENSOR_TYPES, SENSOR_SEGMENTS,
         MAPPING_DIR, RAW_DIR, RAW_DIR_MARKER, SYNCED_DIR,
+        LLM_MODEL, LLM_CACHE_PATH, LLM_BATCH_SIZE, LLM_MAX_CONCURRENCY, XSENS_SEGMENTS,
     )
+    from table_io import is_sensor_column
 
 # --- OpenAI client ---
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY")) # you need to add this as your environment variable
+# Created on first use so importing this module needs no API key. Pass client=... to
+# the mapping functions to inject another client (e.g. one pointed at a local stand-in
+# server via base_url, or OPENAI_BASE_URL in the environment).
+_client = None
+_async_client = None
+
+
+def get_client():
+    """Shared synchronous OpenAI client (reads OPENAI_API_KEY / OPENAI_BASE_URL)."""
+    global _client
+    if _client is None:
+        _client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY")) # you need to add this as your environment variable
+    return _client
+
+
+def get_async_client():
+    """Shared asyncio OpenAI client used by the batched mapper."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    return _async_client
 
 TARGET_SCHEMA_DESC = """
 Target format: SEGMENT_SENSOR_AXIS
@@ -69,14 +96,170 @@ def filter_sensor_columns(all_columns):
     return filtered
 
 
-def get_mapping_via_llm(column_names):
+# --- Rule-based fast path ---
+# Fully regular naming conventions are resolved offline; only the leftovers go to the LLM.
+# Keyword tables follow prelim_code_ea/regex_metadata_harmonizer.py, restricted to the
+# segments in SENSOR_SEGMENTS.
+RULE_SENSORS = {
+    "acc": "ACC", "accel": "ACC", "accelerometer": "ACC", "acceleration": "ACC",
+    "gyr": "GYR", "gyro": "GYR", "gyroscope": "GYR",
+    "mag": "MAG", "magnetometer": "MAG", "magnometer": "MAG",
+}
+RULE_SIDES = {"l": "L", "left": "L", "r": "R", "right": "R"}
+RULE_LIMBS = {
+    "foot": "FOOT",
+    "shin": "SHANK", "shank": "SHANK", "lowerleg": "SHANK",
+    "thigh": "THIGH", "upperleg": "THIGH",
+    "arm": "ARM", "upperarm": "ARM",
+    "forearm": "FOREARM", "lowerarm": "FOREARM",
+    "hand": "HAND", "wrist": "HAND",
+    "shoulder": "SHOULDER",
+}
+RULE_MIDLINE = {
+    "pelvis": "PELVIS", "sacrum": "PELVIS",
+    "trunk": "TRUNK", "sternum": "TRUNK", "chest": "TRUNK",
+    "head": "HEAD",
+}
+# Xsens MVN quantities that are inertial sensor channels
+XSENS_SENSORS = {
+    "sensorFreeAcceleration": "ACC",
+    "angularVelocity": "GYR",
+    "sensorMagneticField": "MAG",
+}
+XSENS_TO_SEGMENT = {xsens: seg for seg, xsens in XSENS_SEGMENTS.items()}
+# YARETA two-letter placement codes (P6_LF_acc_x)
+YARETA_SEGMENTS = {
+    "LF": "L_FOOT", "RF": "R_FOOT", "LS": "L_SHANK", "RS": "R_SHANK",
+    "LT": "L_THIGH", "RT": "R_THIGH", "SA": "PELVIS", "TR": "TRUNK",
+}
+
+_SENSOR_ALT = "|".join(sorted(RULE_SENSORS, key=len, reverse=True))
+RULE_PATTERNS = [
+    # HuGaDB: accelerometer_right_foot_x
+    ("HuGaDB", re.compile(rf"^({_SENSOR_ALT})_(left|right|l|r)_([a-z]+)_([xyz])$", re.IGNORECASE)),
+    # Xsens MVN: sensorFreeAcceleration_RightFoot_x
+    ("Xsens", re.compile(r"^({})_([A-Za-z0-9]+)_([xyz])$".format("|".join(XSENS_SENSORS)))),
+    # YARETA: P6_LF_acc_x
+    ("YARETA", re.compile(rf"^(?:P\d+_)?({'|'.join(YARETA_SEGMENTS)})_({_SENSOR_ALT})_([xyz])$", re.IGNORECASE)),
+    # sensor_segment_axis with a midline segment, all lowercase as in HuGaDB: acc_pelvis_x.
+    # Case-sensitive so Xsens segment kinematics (acceleration_Pelvis_x) are not taken for sensors.
+    ("keyword", re.compile(rf"^({_SENSOR_ALT})_([a-z]+)_([xyz])$")),
+]
+
+
+def _rule_segment(side, part):
+    part = part.lower()
+    if side is None:
+        return RULE_MIDLINE.get(part)
+    limb = RULE_LIMBS.get(part)
+    return f"{RULE_SIDES[side.lower()]}_{limb}" if limb else None
+
+
+@lru_cache(maxsize=None)
+def resolve_column(raw):
     """
-    Use GPT to map raw column names to standardized SEGMENT_SENSOR_AXIS format.
-    Returns (mapping, reasoning): mapping is {raw: standard}, reasoning is {raw: thought_process}.
+    Offline mapping of one raw column to SEGMENT_SENSOR_AXIS.
+    Returns (standard, convention) or None when no rule applies with certainty.
     """
-    print(f"{BLUE}[LLM] Consulting GPT for sensor metadata harmonization...{RESET}")
-    
-    prompt = f"""
+    if is_sensor_column(raw):
+        return raw, "already harmonized"
+    for convention, pattern in RULE_PATTERNS:
+        m = pattern.match(raw)
+        if not m:
+            continue
+        if convention == "HuGaDB":
+            sensor, side, part, axis = m.groups()
+            segment = _rule_segment(side, part)
+            sensor = RULE_SENSORS[sensor.lower()]
+        elif convention == "Xsens":
+            quantity, xsens_seg, axis = m.groups()
+            segment = XSENS_TO_SEGMENT.get(xsens_seg)
+            sensor = XSENS_SENSORS[quantity]
+        elif convention == "YARETA":
+            code, sensor, axis = m.groups()
+            segment = YARETA_SEGMENTS[code.upper()]
+            sensor = RULE_SENSORS[sensor.lower()]
+        else:
+            sensor, part, axis = m.groups()
+            segment = _rule_segment(None, part)
+            sensor = RULE_SENSORS[sensor.lower()]
+        if segment in SENSOR_SEGMENTS:
+            return f"{segment}_{sensor}_{axis.upper()}", convention
+    return None
+
+
+def resolve_columns_by_rules(column_names):
+    """
+    Split columns into rule-resolved ones and leftovers.
+    Returns (mapping, reasoning, leftovers); mapping/reasoning are keyed by raw name.
+    A column whose rule target is also claimed by another column is ambiguous and
+    goes to the leftovers (already harmonized columns keep their name).
+    """
+    hits = {raw: resolve_column(raw) for raw in column_names}
+    taken = Counter(hit[0] for hit in hits.values() if hit is not None)
+    mapping, reasoning, leftovers = {}, {}, []
+    for raw in column_names:
+        hit = hits[raw]
+        if hit is None or (taken[hit[0]] > 1 and hit[0] != raw):
+            leftovers.append(raw)
+        else:
+            mapping[raw] = hit[0]
+            reasoning[raw] = f"Rule-based ({hit[1]} naming convention)."
+    return mapping, reasoning, leftovers
+
+
+def normalize_column_name(name):
+    """Cache key for a raw column: lowercase, separators collapsed (' Acc-X ' → 'acc_x')."""
+    return re.sub(r"[^0-9a-z]+", "_", str(name).strip().lower()).strip("_")
+
+
+class ColumnMappingCache:
+    """Persistent {normalized raw column: {standard, reasoning}} store for LLM answers."""
+
+    def __init__(self, path=LLM_CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.isfile(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                print(f"{YELLOW}[CACHE] Ignoring unreadable cache: {path}{RESET}")
+
+    def get(self, raw):
+        return self.entries.get(normalize_column_name(raw))
+
+    def put(self, raw, standard, reasoning=""):
+        self.entries[normalize_column_name(raw)] = {
+            "raw": raw, "standard": standard, "reasoning": reasoning, "model": LLM_MODEL,
+        }
+        self.dirty = True
+
+    def split(self, column_names):
+        """Return (cached {raw: entry}, unseen [raw]) for the given columns."""
+        cached, unseen = {}, []
+        for raw in column_names:
+            hit = self.get(raw)
+            if hit is None:
+                unseen.append(raw)
+            else:
+                cached[raw] = hit
+        return cached, unseen
+
+    def save(self):
+        if not self.dirty or not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def _build_prompt(column_names):
+    return f"""
 You are an expert in wearable sensor metadata for human movement. Map each raw column name to the canonical format SEGMENT_SENSOR_AXIS.
 
 {TARGET_SCHEMA_DESC}
@@ -93,10 +276,62 @@ RULES:
 Raw column names to map:
 {json.dumps(column_names)}
 """
+
+
+def _parse_llm_response(full_response):
+    """Parse the LLM JSON answer into (mapping, reasoning) dicts keyed by raw column."""
+    parsed = json.loads(full_response)
+    # Handle both new format {raw: {standard, reasoning}} and legacy {standard: raw}
+    mapping = {}
+    reasoning = {}
+    for key, val in parsed.items():
+        if isinstance(val, dict):
+            mapping[key] = val.get("standard", val)
+            reasoning[key] = val.get("reasoning", "")
+        else:
+            # Legacy: val is the raw name, key is standard
+            mapping[val] = key
+            reasoning[val] = ""
+    return mapping, reasoning
+
+
+def _merge_cached(column_names, cached, mapping, reasoning):
+    """Combine cache hits and fresh answers, in the order of column_names."""
+    out_map, out_reason = {}, {}
+    for raw in column_names:
+        if raw in cached:
+            out_map[raw] = cached[raw]["standard"]
+            out_reason[raw] = cached[raw].get("reasoning", "")
+        elif raw in mapping:
+            out_map[raw] = mapping[raw]
+            out_reason[raw] = reasoning.get(raw, "")
+    # Keep anything the LLM returned under an unexpected key (legacy format)
+    for raw, std in mapping.items():
+        if raw not in out_map:
+            out_map[raw] = std
+            out_reason[raw] = reasoning.get(raw, "")
+    return out_map, out_reason
+
+
+def get_mapping_via_llm(column_names, client=None, cache=None, use_cache=True):
+    """
+    Use GPT to map raw column names to standardized SEGMENT_SENSOR_AXIS format.
+    Returns (mapping, reasoning): mapping is {raw: standard}, reasoning is {raw: thought_process}.
+    Columns already in the on-disk cache (LLM_CACHE_PATH) are not sent again.
+    """
+    if use_cache and cache is None:
+        cache = ColumnMappingCache()
+    cached, unseen = cache.split(column_names) if use_cache else ({}, list(column_names))
+    if cached:
+        print(f"{GREEN}[CACHE] {len(cached)} of {len(column_names)} columns already mapped.{RESET}")
+    if not unseen:
+        return _merge_cached(column_names, cached, {}, {})
+
+    print(f"{BLUE}[LLM] Consulting GPT for sensor metadata harmonization...{RESET}")
     
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
+    response = (client or get_client()).chat.completions.create(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": _build_prompt(unseen)}],
         temperature=0,
         response_format={"type": "json_object"},
         stream=True,
@@ -114,19 +349,107 @@ Raw column names to map:
         pbar.n = 100
         pbar.refresh()
     
-    parsed = json.loads(full_response)
-    # Handle both new format {raw: {standard, reasoning}} and legacy {standard: raw}
-    mapping = {}
-    reasoning = {}
-    for key, val in parsed.items():
-        if isinstance(val, dict):
-            mapping[key] = val.get("standard", val)
-            reasoning[key] = val.get("reasoning", "")
-        else:
-            # Legacy: val is the raw name, key is standard
-            mapping[val] = key
-            reasoning[val] = ""
-    return mapping, reasoning
+    mapping, reasoning = _parse_llm_response(full_response)
+    if use_cache:
+        for raw, std in mapping.items():
+            cache.put(raw, std, reasoning.get(raw, ""))
+        cache.save()
+    return _merge_cached(column_names, cached, mapping, reasoning)
+
+
+def map_columns(column_names, client=None, use_cache=True, use_rules=True):
+    """
+    Rule-based fast path first; only columns no rule resolves are sent to get_mapping_via_llm.
+    Returns (mapping, reasoning) in the order of column_names.
+    """
+    if not use_rules:
+        return get_mapping_via_llm(column_names, client=client, use_cache=use_cache)
+    mapping, reasoning, leftovers = resolve_columns_by_rules(column_names)
+    print(f"{GREEN}[RULES] Resolved {len(mapping)} of {len(column_names)} columns offline.{RESET}")
+    if leftovers:
+        llm_map, llm_reason = get_mapping_via_llm(leftovers, client=client, use_cache=use_cache)
+        mapping.update(llm_map)
+        reasoning.update(llm_reason)
+    return _merge_cached(column_names, {}, mapping, reasoning)
+
+
+async def _map_batch_async(aclient, batch, semaphore):
+    """One non-streamed request for a batch of columns; returns (mapping, reasoning)."""
+    async with semaphore:
+        response = await aclient.chat.completions.create(
+            model=LLM_MODEL,
+            messages=[{"role": "user", "content": _build_prompt(batch)}],
+            temperature=0,
+            response_format={"type": "json_object"},
+        )
+    return _parse_llm_response(response.choices[0].message.content)
+
+
+async def map_columns_batched_async(
+    columns_by_dataset,
+    client=None,
+    cache=None,
+    batch_size=LLM_BATCH_SIZE,
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    use_rules=True,
+    use_cache=True,
+):
+    """
+    Map columns for many datasets at once. Columns the rule-based fast path cannot
+    resolve and that are not cached are de-duplicated (by normalized name) across
+    datasets, split into batches of at most batch_size and sent concurrently
+    (at most max_concurrency requests in flight). With use_cache=False the on-disk
+    cache is neither read nor written.
+    Returns ({dataset: (mapping, reasoning)}, {dataset: [raw columns of failed batches]});
+    columns of a failed batch are missing from the mapping, so callers must not apply
+    it as complete.
+    """
+    if not use_cache:
+        cache = ColumnMappingCache(path=None)  # this run's answers only
+    cache = cache or ColumnMappingCache()
+    ruled = {}
+    for dataset, cols in columns_by_dataset.items():
+        ruled[dataset] = resolve_columns_by_rules(cols) if use_rules else ({}, {}, list(cols))
+    pending = {}
+    for _, _, leftovers in ruled.values():
+        for raw in cache.split(leftovers)[1]:
+            pending.setdefault(normalize_column_name(raw), raw)
+    unseen = list(pending.values())
+    failed_keys = set()
+
+    if unseen:
+        batches = [unseen[i:i + batch_size] for i in range(0, len(unseen), batch_size)]
+        print(f"{BLUE}[LLM] Mapping {len(unseen)} unseen columns in {len(batches)} batch(es)...{RESET}")
+        semaphore = asyncio.Semaphore(max_concurrency)
+        aclient = client or get_async_client()
+        results = await asyncio.gather(
+            *(_map_batch_async(aclient, b, semaphore) for b in batches),
+            return_exceptions=True,
+        )
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                print(f"{RED}[LLM] Batch of {len(batch)} columns failed: {result}{RESET}")
+                failed_keys.update(normalize_column_name(raw) for raw in batch)
+                continue
+            mapping, reasoning = result
+            for raw, std in mapping.items():
+                cache.put(raw, std, reasoning.get(raw, ""))
+        cache.save()
+
+    out, failed = {}, {}
+    for dataset, cols in columns_by_dataset.items():
+        rule_map, rule_reason, leftovers = ruled[dataset]
+        cached, _ = cache.split(leftovers)
+        out[dataset] = _merge_cached(cols, cached, rule_map, rule_reason)
+        lost = [raw for raw in leftovers if raw not in cached and normalize_column_name(raw) in failed_keys]
+        if lost:
+            failed[dataset] = lost
+    return out, failed
+
+
+def map_columns_batched(columns_by_dataset, **kwargs):
+    """Synchronous wrapper around map_columns_batched_async."""
+    return asyncio.run(map_columns_batched_async(columns_by_dataset, **kwargs))
 
 
 def _infer_segment_mapping(rename_map):
@@ -273,10 +596,14 @@ def clean_llm_json(raw_text):
         return None
 
 
-def harmonize_csv(input_path, output_path=None, inplace=False, index_col=None):
+def harmonize_csv(input_path, output_path=None, inplace=False, index_col=None,
+                  client=None, use_cache=True, use_rules=True, premapped=None, failed=()):
     """
     Harmonize sensor column names in a CSV file.
     Writes to output_path, or input_path with _harmonized suffix if not specified.
+    premapped: optional (mapping, reasoning) already obtained (e.g. from map_columns_batched).
+    failed: sensor columns whose LLM request failed; the partial mapping is only
+    reviewed and written if the user explicitly accepts losing them.
     """
     print(f"\n{BLUE}{'='*60}{RESET}")
     print(f"{BLUE}HARMONIZING: {input_path}{RESET}")
@@ -292,7 +619,22 @@ def harmonize_csv(input_path, output_path=None, inplace=False, index_col=None):
         print(f"{YELLOW}[WARN] No sensor columns found. Nothing to harmonize.{RESET}")
         return df
     
-    mapping, reasoning = get_mapping_via_llm(sensor_columns)
+    if failed:
+        print(f"{RED}[ERROR] {len(failed)} sensor columns could not be mapped (LLM request failed):{RESET}")
+        for raw in failed:
+            print(f"  {raw}")
+        try:
+            reply = input(f"\n{YELLOW}Continue with a partial mapping that drops them? [y/n]: {RESET}").strip().lower()
+        except EOFError:
+            reply = "n"
+        if reply not in ("y", "yes"):
+            print(f"{YELLOW}[SKIP] Nothing written for {input_path}; re-run to retry the failed columns.{RESET}")
+            return None
+
+    if premapped is not None:
+        mapping, reasoning = premapped
+    else:
+        mapping, reasoning = map_columns(sensor_columns, client=client, use_cache=use_cache, use_rules=use_rules)
     
     # Build rename dict: only rename columns we have mapping for (exclude UNKNOWN)
     rename_map = {raw: std for raw, std in mapping.items() if not str(std).startswith("UNKNOWN")}
@@ -353,14 +695,37 @@ def harmonize_csv(input_path, output_path=None, inplace=False, index_col=None):
     return df_harmonized
 
 
-def harmonize_columns(column_names):
+def harmonize_columns(column_names, client=None, use_cache=True, use_rules=True):
     """
     Harmonize a list of column names (no CSV). Returns (mapping, reasoning) dicts.
     """
     sensor_cols = filter_sensor_columns(column_names)
     if not sensor_cols:
         return {}, {}
-    return get_mapping_via_llm(sensor_cols)
+    return map_columns(sensor_cols, client=client, use_cache=use_cache, use_rules=use_rules)
+
+
+def harmonize_csvs(input_paths, index_col=None, client=None, use_cache=True, use_rules=True,
+                   batch_size=LLM_BATCH_SIZE, max_concurrency=LLM_MAX_CONCURRENCY):
+    """
+    Harmonize several CSVs (typically one sample file per dataset) with one batched,
+    concurrent round of LLM requests, then review and save each mapping as harmonize_csv does.
+    """
+    read_kw = {} if index_col is None else {"index_col": index_col}
+    sensor_columns = {}
+    for path in input_paths:
+        cols = list(pd.read_csv(path, nrows=0, **read_kw).columns)
+        sensor_columns[path] = filter_sensor_columns(cols)
+    mapped, failed = map_columns_batched(
+        {p: cols for p, cols in sensor_columns.items() if cols},
+        client=client, batch_size=batch_size, max_concurrency=max_concurrency,
+        use_rules=use_rules, use_cache=use_cache,
+    )
+    return {
+        path: harmonize_csv(path, index_col=index_col, premapped=mapped.get(path, ({}, {})),
+                            failed=failed.get(path, ()))
+        for path in input_paths
+    }
 
 
 def main():
@@ -370,7 +735,8 @@ def main():
     parser.add_argument(
         "input",
         type=str,
-        help="Path to CSV file or '--columns' for list mode",
+        nargs="+",
+        help="Path to CSV file(s) or '--columns' for list mode; several CSVs are mapped in one batched round",
     )
     parser.add_argument(
         "-o", "--output",
@@ -395,22 +761,58 @@ def main():
         metavar="N",
         help="Use column N (0-based) as row index when reading CSV (avoids 'Unnamed: 0' for index columns)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the column cache and send every sensor column to the LLM",
+    )
+    parser.add_argument(
+        "--no-rules",
+        action="store_true",
+        help="Skip the offline rule-based resolver and send every sensor column to the LLM",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=LLM_BATCH_SIZE,
+        metavar="N",
+        help=f"Columns per LLM request when mapping several CSVs (default: {LLM_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=LLM_MAX_CONCURRENCY,
+        metavar="N",
+        help=f"Concurrent LLM requests when mapping several CSVs (default: {LLM_MAX_CONCURRENCY})",
+    )
     args = parser.parse_args()
     
     if args.columns:
-        cols = [c.strip() for c in args.input.split(",")]
-        mapping, reasoning = harmonize_columns(cols)
+        cols = [c.strip() for c in ",".join(args.input).split(",")]
+        mapping, reasoning = harmonize_columns(cols, use_cache=not args.no_cache, use_rules=not args.no_rules)
         for raw, std in mapping.items():
             print(f"{raw} → {std}")
             if reasoning.get(raw):
                 print(f"  [reasoning] {reasoning[raw]}")
         return
     
-    if not os.path.isfile(args.input):
-        print(f"{RED}[ERROR] File not found: {args.input}{RESET}")
+    missing = [p for p in args.input if not os.path.isfile(p)]
+    if missing:
+        print(f"{RED}[ERROR] File not found: {', '.join(missing)}{RESET}")
         sys.exit(1)
     
-    harmonize_csv(args.input, output_path=args.output, inplace=args.inplace, index_col=args.index_col)
+    if len(args.input) > 1:
+        if args.output or args.inplace:
+            print(f"{RED}[ERROR] -o/--inplace only apply to a single input CSV{RESET}")
+            sys.exit(1)
+        harmonize_csvs(
+            args.input, index_col=args.index_col, use_cache=not args.no_cache, use_rules=not args.no_rules,
+            batch_size=args.batch_size, max_concurrency=args.max_concurrency,
+        )
+        return
+    
+    harmonize_csv(args.input[0], output_path=args.output, inplace=args.inplace,
+                  index_col=args.index_col, use_cache=not args.no_cache, use_rules=not args.no_rules)
 
 
 if __name__ == "__main__":
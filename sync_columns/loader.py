@@ -0,0 +1,241 @@
+"""
+Lazy trial loader: channel arrays by dataset / activity / stage instead of file paths.
+
+  from sync_columns.loader import load
+  for trial in load(dataset="YARETA", stage="02_coords_synced", activity="%Gait%",
+                    channels=["L_FOOT_ACC_Y", "R_FOOT_ACC_Y"]):
+      left, right = trial["L_FOOT_ACC_Y"], trial["R_FOOT_ACC_Y"]   # 1-D numpy arrays
+      trial.fs, trial.pid, trial.activity, trial.path
+
+Trials are looked up in the catalog (catalog.py; run `python catalog.py scan`
+once), or taken from an explicit list with load(paths=[...]). Only the requested
+channels are read: CSV columns are parsed selectively by pyarrow, Parquet columns are
+read selectively and channel stores are memory-mapped. The next `prefetch`
+trials are read on background threads while the current one is processed.
+
+Channels are SEGMENT_SENSOR_AXIS names; glob patterns ("L_FOOT_ACC_*", "*_GYR_*")
+select whichever matching channels each trial has.
+"""
+
+import os
+import sys
+import fnmatch
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+try:
+    from sync_columns.config import CATALOG_PATH, SENSOR_SEGMENTS, SENSOR_TYPES, AXES
+    from sync_columns.table_io import format_of, is_sensor_column, read_table, read_table_columns
+except ImportError:
+    from config import CATALOG_PATH, SENSOR_SEGMENTS, SENSOR_TYPES, AXES
+    from table_io import format_of, is_sensor_column, read_table, read_table_columns
+
+DEFAULT_PREFETCH = 2
+TRIAL_FIELDS = ("path", "dataset", "stage", "pid", "session", "activity", "fs")
+
+# Every harmonized channel name, in config order
+SENSOR_CHANNELS = [f"{seg}_{typ}_{ax}" for seg in SENSOR_SEGMENTS for typ in SENSOR_TYPES for ax in AXES]
+
+
+def is_channel_pattern(name):
+    return any(ch in name for ch in "*?[")
+
+
+def check_channels(channels):
+    """Validate requested names against SEGMENT_SENSOR_AXIS; patterns must match at least one."""
+    for name in channels:
+        if is_channel_pattern(name):
+            if not fnmatch.filter(SENSOR_CHANNELS, name):
+                raise ValueError(f"Channel pattern '{name}' matches no SEGMENT_SENSOR_AXIS name")
+        elif not is_sensor_column(name):
+            raise ValueError(f"'{name}' is not a SEGMENT_SENSOR_AXIS channel (e.g. R_FOOT_ACC_X)")
+
+
+def resolve_channels(requested, available):
+    """
+    Channels to read from a trial with `available` columns: exact names in request
+    order (all required), patterns expanded in file order. None means every sensor channel.
+    """
+    available = [c for c in available if is_sensor_column(c)]
+    if requested is None:
+        return available
+    out = []
+    for name in requested:
+        if is_channel_pattern(name):
+            out.extend(c for c in available if fnmatch.fnmatchcase(c, name))
+        else:
+            out.append(name)
+    return list(dict.fromkeys(out))
+
+
+class Trial:
+    """One trial's channels as a (n_channels, n_samples) array plus its catalog metadata."""
+
+    def __init__(self, meta, channels=(), data=None, error=None):
+        for field in TRIAL_FIELDS:
+            setattr(self, field, meta.get(field))
+        self.channels = list(channels)
+        self.data = data
+        self.error = error
+        self._index = {c: i for i, c in enumerate(self.channels)}
+
+    def __getitem__(self, channel):
+        """1-D view of one channel."""
+        try:
+            return self.data[self._index[channel]]
+        except KeyError:
+            raise KeyError(f"Channel '{channel}' not loaded for {self.path}") from None
+
+    def __contains__(self, channel):
+        return channel in self._index
+
+    def __len__(self):
+        return 0 if self.data is None else self.data.shape[1]
+
+    def frame(self):
+        """The loaded channels as a DataFrame (one column per channel)."""
+        return pd.DataFrame(self.data.T, columns=self.channels)
+
+    def __repr__(self):
+        what = f"error={self.error!r}" if self.error else f"{len(self.channels)} channels x {len(self)} samples"
+        return f"Trial({self.path!r}, {what})"
+
+
+def read_trial(meta, channels=None, dtype=np.float64):
+    """Read the requested channels of one trial into a Trial."""
+    path = meta["path"]
+    header = [str(c) for c in read_table_columns(path)]
+    raw_names = {c.strip(): c for c in header}  # CSV headers may carry stray spaces
+    names = resolve_channels(channels, list(raw_names))
+    missing = [c for c in names if c not in raw_names]
+    if missing:
+        raise KeyError(f"{os.path.basename(path)} has no channel(s) {missing}")
+    if not names:
+        return Trial(meta, [], np.empty((0, 0), dtype=dtype))
+
+    columns = [raw_names[c] for c in names]
+    df = _read_csv_columns(path, columns) if format_of(path) == "csv" else None
+    if df is None:
+        df = read_table(path, columns=columns)
+    data = np.empty((len(names), len(df)), dtype=dtype)
+    for i, c in enumerate(names):
+        data[i] = df[raw_names[c]].to_numpy(dtype)
+    return Trial(meta, names, data)
+
+
+def _read_csv_columns(path, columns):
+    """
+    Numeric CSV columns via pyarrow's reader, which parses only those columns and
+    releases the GIL (so prefetch threads overlap with compute). None if pyarrow is
+    missing or cannot parse the file; read_table is used then.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pcsv
+        convert = pcsv.ConvertOptions(include_columns=columns,
+                                      column_types={c: pa.float64() for c in columns})
+        return pcsv.read_csv(path, convert_options=convert).to_pandas()
+    except (ImportError, ValueError):
+        return None
+
+
+class TrialSet:
+    """
+    Lazy, re-iterable collection of trials. Nothing is read until iteration;
+    len() and .meta come from the catalog alone.
+
+    errors="raise" stops at the first unreadable trial; errors="keep" yields it
+    with .error set and .data None, so one bad file does not end a long loop.
+    """
+
+    def __init__(self, meta, channels=None, prefetch=DEFAULT_PREFETCH, dtype=np.float64, errors="raise"):
+        if errors not in ("raise", "keep"):
+            raise ValueError("errors must be 'raise' or 'keep'")
+        self.meta = list(meta)
+        self.channels = None if channels is None else list(channels)
+        self.prefetch = max(int(prefetch), 0)
+        self.dtype = dtype
+        self.errors = errors
+
+    @property
+    def paths(self):
+        return [m["path"] for m in self.meta]
+
+    def __len__(self):
+        return len(self.meta)
+
+    def _read(self, meta):
+        try:
+            return read_trial(meta, self.channels, self.dtype)
+        except Exception as e:
+            if self.errors == "raise":
+                raise
+            return Trial(meta, error=f"{type(e).__name__}: {e}")
+
+    def __iter__(self):
+        if self.prefetch == 0:
+            for m in self.meta:
+                yield self._read(m)
+            return
+        pool = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix="trial-prefetch")
+        try:
+            todo = iter(self.meta)
+            pending = deque(pool.submit(self._read, m) for m in itertools.islice(todo, self.prefetch + 1))
+            while pending:
+                trial = pending.popleft().result()
+                nxt = next(todo, None)
+                if nxt is not None:
+                    pending.append(pool.submit(self._read, nxt))
+                yield trial
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def load(dataset=None, activity=None, channels=None, stage=None, pid=None, session=None,
+         paths=None, catalog=None, prefetch=DEFAULT_PREFETCH, dtype=np.float64, errors="raise"):
+    """
+    Lazy TrialSet of the trials matching the filters.
+
+    With paths, those files are loaded as given (metadata from the catalog when it
+    knows them, otherwise just the path). Otherwise the catalog (a Catalog or the
+    path of its SQLite file; default CATALOG_PATH) is queried: dataset / activity /
+    pid / session are LIKE patterns, stage an exact directory name (e.g.
+    "04_freq_unit_synced"), and trials lacking any exactly named channel are left out.
+    """
+    if channels is not None:
+        channels = [channels] if isinstance(channels, str) else list(channels)
+        check_channels(channels)
+    try:
+        from sync_columns.catalog import Catalog
+    except ImportError:
+        from catalog import Catalog
+
+    own = not isinstance(catalog, Catalog)
+    if paths is not None:
+        paths = [str(p) for p in paths]
+        cat_path = CATALOG_PATH if catalog is None else catalog
+        if own and not os.path.isfile(cat_path):
+            meta = [{"path": p} for p in paths]
+        else:
+            cat = Catalog(cat_path) if own else catalog
+            try:
+                meta = [(cat.get(p) or {}) | {"path": p} for p in paths]
+            finally:
+                if own:
+                    cat.close()
+    else:
+        cat = Catalog(catalog or CATALOG_PATH) if own else catalog
+        exact = [c for c in channels or () if not is_channel_pattern(c)]
+        try:
+            meta = cat.find(dataset=dataset, stage=stage, pid=pid, session=session,
+                            activity=activity, channels=exact)
+        finally:
+            if own:
+                cat.close()
+    return TrialSet(meta, channels, prefetch=prefetch, dtype=dtype, errors=errors)
@@ -6,12 +6,19 @@ Usage:
   python main.py YARETA --dry-run
   python main.py HUGADB --index-col 0
   python main.py HUGADB --sensor-only   # Drop EMG, activity, etc.; keep only sensor columns
+  python main.py NEWBEE --workers 32    # Convert files in parallel on a process pool
+  python main.py CAMARGO --stream       # Rewrite header, stream body in chunks (flat memory)
+  python main.py HUGADB --force         # Rebuild every file, ignoring the build manifest
+  python main.py NEWBEE --format parquet  # Write Parquet (float32 sensors, zstd) instead of CSV
 """
 
 import os
 import sys
+import csv
 import json
+import shutil
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import pandas as pd
@@ -21,12 +28,22 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 try:
     from sync_columns.config import (
         BLUE, GREEN, YELLOW, RED, RESET,
-        RAW_DIR, SYNCED_DIR, MAPPING_DIR, DATASET_ROOTS,
+        RAW_DIR, SYNCED_DIR, MAPPING_DIR, MANIFEST_DIR, DATASET_ROOTS,
+    )
+    from sync_columns.catalog import record_outputs
+    from sync_columns.manifest import BuildManifest, file_fingerprint, settings_hash
+    from sync_columns.table_io import (
+        TABLE_FORMATS, ParquetChunkWriter, resolve_format, table_ext, write_table,
     )
 except ImportError:
     from config import (
         BLUE, GREEN, YELLOW, RED, RESET,
-        RAW_DIR, SYNCED_DIR, MAPPING_DIR, DATASET_ROOTS,
+        RAW_DIR, SYNCED_DIR, MAPPING_DIR, MANIFEST_DIR, DATASET_ROOTS,
+    )
+    from catalog import record_outputs
+    from manifest import BuildManifest, file_fingerprint, settings_hash
+    from table_io import (
+        TABLE_FORMATS, ParquetChunkWriter, resolve_format, table_ext, write_table,
     )
 
 
@@ -48,14 +65,25 @@ def find_csv_files(root_dir):
     return sorted(csv_files)
 
 
+DEFAULT_CHUNKSIZE = 100_000  # rows per chunk in --stream mode
+
+
 def apply_mapping_to_csv(
     input_path,
     mapping,
     output_path,
     index_col=None,
     sensor_only=False,
+    stream=False,
+    chunksize=DEFAULT_CHUNKSIZE,
+    fmt=None,
 ):
     """Read CSV, rename columns using mapping, optionally drop non-sensor columns, save to output_path."""
+    if stream:
+        return stream_mapping_to_csv(
+            input_path, mapping, output_path,
+            index_col=index_col, sensor_only=sensor_only, chunksize=chunksize, fmt=fmt,
+        )
     read_kw = {} if index_col is None else {"index_col": index_col}
     df = pd.read_csv(input_path, **read_kw)
     # Only rename columns that exist in the dataframe and in the mapping
@@ -65,18 +93,104 @@ def apply_mapping_to_csv(
         # Keep only sensor columns (those we mapped); drop EMG, activity, Unnamed: 0, etc.
         sensor_cols = [c for c in df_renamed.columns if c in rename_map.values()]
         df_renamed = df_renamed[sensor_cols]
+    write_table(df_renamed, output_path, fmt=fmt)
+    return len(rename_map)
+
+
+def stream_mapping_to_csv(
+    input_path,
+    mapping,
+    output_path,
+    index_col=None,
+    sensor_only=False,
+    chunksize=DEFAULT_CHUNKSIZE,
+    fmt=None,
+):
+    """Rename columns without loading the whole CSV: rewrite the header row and stream the body.
+
+    Without column projection (no --sensor-only / --index-col) the body bytes are copied
+    through unchanged. Otherwise the body is read in chunks of `chunksize` rows as text,
+    so values are written back exactly as they appear in the input.
+    For Parquet output the chunks are parsed as numbers and appended row group by row group.
+    """
+    fmt = resolve_format(fmt)
+    if fmt == "channels":
+        raise ValueError("--stream writes csv or parquet; pack channel stores from those with channel_store.py")
+    # Header names as pandas sees them ("Unnamed: 0", "x.1", ...), so mapping keys match
+    all_cols = list(pd.read_csv(input_path, nrows=0).columns)
+    rename_map = {c: mapping[c] for i, c in enumerate(all_cols) if c in mapping and i != index_col}
+    keep = [
+        i for i, c in enumerate(all_cols)
+        if i != index_col and (not sensor_only or c in rename_map)
+    ]
+    header = [rename_map.get(all_cols[i], all_cols[i]) for i in keep]
     os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    df_renamed.to_csv(output_path, index=False)
+
+    if fmt == "parquet":
+        reader = pd.read_csv(input_path, usecols=keep, chunksize=chunksize)
+        with ParquetChunkWriter(output_path) as writer:
+            for chunk in reader:
+                writer.write(chunk.rename(columns=rename_map))
+            if writer.rows_written == 0:
+                writer.write(pd.DataFrame(columns=header))
+        return len(rename_map)
+
+    if len(keep) == len(all_cols):
+        with open(input_path, "rb") as src, open(output_path, "w", newline="") as dst:
+            first = src.readline()
+            newline = "\r\n" if first.endswith(b"\r\n") else "\n"
+            csv.writer(dst, lineterminator=newline).writerow(header)
+            dst.flush()
+            shutil.copyfileobj(src, dst.buffer, length=16 * 1024 * 1024)
+        return len(rename_map)
+
+    reader = pd.read_csv(
+        input_path,
+        usecols=keep,
+        dtype=str,
+        keep_default_na=False,
+        na_filter=False,
+        chunksize=chunksize,
+    )
+    with open(output_path, "w", newline="") as dst:
+        csv.writer(dst, lineterminator=os.linesep).writerow(header)
+        for chunk in reader:
+            chunk.to_csv(dst, header=False, index=False)
     return len(rename_map)
 
 
+def _convert_one(inp, out, mapping, convert_kw):
+    """Worker entry point: convert one file and return (inp, n_mapped, fingerprint, error).
+
+    The input fingerprint is taken before conversion so the manifest never records
+    contents newer than what was actually converted.
+    """
+    try:
+        fingerprint = file_fingerprint(inp)
+        n = apply_mapping_to_csv(inp, mapping, out, **convert_kw)
+        return inp, n, fingerprint, None
+    except Exception as e:
+        return inp, 0, None, str(e)
+
+
 def convert_dataset(
     dataset_name,
     index_col=None,
     dry_run=False,
     sensor_only=False,
+    workers=1,
+    stream=False,
+    chunksize=DEFAULT_CHUNKSIZE,
+    force=False,
+    fmt=None,
 ):
-    """Convert columns of ALL CSV files in the dataset using saved mapping."""
+    """Convert columns of ALL CSV files in the dataset using saved mapping.
+
+    With workers > 1 files are sent to a process pool; each output file is
+    written by the same apply_mapping_to_csv call as in the serial path.
+    Outputs whose input, mapping and flags are unchanged since the last run
+    (per {MANIFEST_DIR}/{DATASET}_manifest.json) are skipped unless force=True.
+    """
     dataset_key = dataset_name.upper()
     mapping_path = os.path.join(MAPPING_DIR, f"{dataset_key}_mapping.json")
 
@@ -107,28 +221,91 @@ def convert_dataset(
         print(f"  {YELLOW}[SENSOR ONLY] Dropping non-sensor columns (EMG, activity, etc.){RESET}")
     if dry_run:
         print(f"  {YELLOW}[DRY RUN] No files will be written{RESET}")
+    elif workers > 1:
+        print(f"  Workers: {workers}")
+    if stream:
+        print(f"  [STREAM] Header rewrite + body in chunks of {chunksize} rows")
+    fmt = resolve_format(fmt)
+    print(f"  Format: {fmt}")
     print()
 
+    convert_kw = {
+        "index_col": index_col,
+        "sensor_only": sensor_only,
+        "stream": stream,
+        "chunksize": chunksize,
+        "fmt": fmt,
+    }
+
+    # Flags that change the bytes written; chunksize does not
+    settings = settings_hash(mapping, {
+        "index_col": index_col,
+        "sensor_only": sensor_only,
+        "stream": stream,
+        "format": fmt,
+    })
+    manifest = BuildManifest(os.path.join(MANIFEST_DIR, f"{dataset_key}_manifest.json"), SYNCED_DIR)
+
+    jobs = []
+    n_up_to_date = 0
+    for inp in csv_files:
+        rel = os.path.relpath(inp, root)
+        out = os.path.join(SYNCED_DIR, dataset_key, os.path.dirname(rel), Path(inp).stem + table_ext(fmt))
+        if not force and manifest.is_up_to_date(out, inp, settings):
+            n_up_to_date += 1
+            continue
+        jobs.append((inp, out))
+    out_for = dict(jobs)
+
     n_original = len(csv_files)
     n_converted = 0
     total_mapped = 0
-    for inp in tqdm(csv_files, desc=f"{BLUE}Converting{RESET}", colour="blue"):
-        rel = os.path.relpath(inp, root)
-        out = os.path.join(SYNCED_DIR, dataset_key, os.path.dirname(rel), Path(inp).stem + ".csv")
+    failures = []
 
-        if dry_run:
-            tqdm.write(f"  {rel} → {out}")
+    if dry_run:
+        for inp, out in jobs:
+            print(f"  {os.path.relpath(inp, root)} → {out}")
             n_converted += 1
-            continue
+    elif workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_convert_one, inp, out, mapping, convert_kw)
+                for inp, out in jobs
+            ]
+            with tqdm(total=len(futures), desc=f"{BLUE}Converting{RESET}", colour="blue") as pbar:
+                for fut in as_completed(futures):
+                    inp, n, fingerprint, err = fut.result()
+                    if err is None:
+                        total_mapped += n
+                        n_converted += 1
+                        manifest.record(out_for[inp], inp, fingerprint, settings)
+                    else:
+                        failures.append((inp, err))
+                        tqdm.write(f"{RED}[FAIL] {inp}: {err}{RESET}")
+                    pbar.update(1)
+    else:
+        for inp, out in tqdm(jobs, desc=f"{BLUE}Converting{RESET}", colour="blue"):
+            _, n, fingerprint, err = _convert_one(inp, out, mapping, convert_kw)
+            if err is None:
+                total_mapped += n
+                n_converted += 1
+                manifest.record(out, inp, fingerprint, settings)
+            else:
+                failures.append((inp, err))
+                tqdm.write(f"{RED}[FAIL] {inp}: {err}{RESET}")
 
-        try:
-            n = apply_mapping_to_csv(inp, mapping, out, index_col=index_col, sensor_only=sensor_only)
-            total_mapped += n
-            n_converted += 1
-        except Exception as e:
-            tqdm.write(f"{RED}[FAIL] {inp}: {e}{RESET}")
+    if not dry_run:
+        manifest.save()
+        failed = {inp for inp, _ in failures}
+        record_outputs(out for inp, out in jobs if inp not in failed)
 
     print(f"\n{BLUE}SUMMARY{RESET}: original ({n_original}) files, converted ({n_converted}) files")
+    if n_up_to_date:
+        print(f"{GREEN}  Up to date, skipped ({n_up_to_date}) files{RESET}")
+    if failures:
+        print(f"{RED}  Failed ({len(failures)}) files:{RESET}")
+        for inp, err in sorted(failures):
+            print(f"    {os.path.relpath(inp, root)}: {err}")
 
 
 def main():
@@ -157,6 +334,36 @@ def main():
         action="store_true",
         help="Drop non-sensor columns (EMG, activity, Unnamed: 0, etc.); keep only mapped sensor columns",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Convert files on a pool of N processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Rewrite only the header and stream the body in chunks (flat memory for multi-GB files)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        metavar="ROWS",
+        help=f"Rows per chunk in --stream mode (default: {DEFAULT_CHUNKSIZE})",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every file even if the build manifest says it is up to date",
+    )
+    parser.add_argument(
+        "--format",
+        choices=TABLE_FORMATS,
+        default=None,
+        help="Output table format (default: OUTPUT_FORMAT in config.py)",
+    )
     args = parser.parse_args()
 
     convert_dataset(
@@ -164,6 +371,11 @@ def main():
         index_col=args.index_col,
         dry_run=args.dry_run,
         sensor_only=args.sensor_only,
+        workers=args.workers,
+        stream=args.stream,
+        chunksize=args.chunksize,
+        force=args.force,
+        fmt=args.format,
     )
 
 
@@ -0,0 +1,115 @@
+"""
+Build manifest for incremental pipeline stages.
+
+Records, for every output file, the fingerprint of the input it was built from
+(size, mtime, SHA-256) plus a hash of the settings used (mapping, CLI flags).
+A re-run can then skip outputs that are already up to date.
+
+Manifest layout (JSON):
+  {
+    "version": 1,
+    "outputs": {
+      "<output path relative to manifest root>": {
+        "input": "/abs/path/to/input.csv",
+        "size": 12345, "mtime_ns": 1700000000000000000, "sha256": "...",
+        "settings": "<sha256 of mapping + flags>"
+      }
+    }
+  }
+"""
+
+import os
+import json
+import hashlib
+
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def file_sha256(path):
+    """SHA-256 of a file's contents, read in blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_fingerprint(path):
+    """Return {size, mtime_ns, sha256} for an input file."""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": file_sha256(path)}
+
+
+def settings_hash(*parts):
+    """Stable hash of JSON-serializable settings (mapping dict, flags dict, ...)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """Per-stage record of which outputs were built from which inputs and settings."""
+
+    def __init__(self, path, root):
+        self.path = path
+        self.root = root
+        self.outputs = {}
+        self.dirty = False
+        if os.path.isfile(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.outputs = data.get("outputs", {})
+            except (OSError, ValueError):
+                self.outputs = {}
+
+    def _key(self, output_path):
+        return os.path.relpath(output_path, self.root)
+
+    def is_up_to_date(self, output_path, input_path, settings):
+        """True if output exists and was built from the same input contents and settings.
+
+        A matching size + mtime is trusted without re-hashing; if only the mtime changed
+        (e.g. a Box re-sync touched the file) the input is re-hashed and the entry refreshed.
+        """
+        entry = self.outputs.get(self._key(output_path))
+        if entry is None or not os.path.exists(output_path):
+            return False
+        if entry.get("input") != os.path.abspath(input_path) or entry.get("settings") != settings:
+            return False
+        try:
+            st = os.stat(input_path)
+        except OSError:
+            return False
+        if st.st_size != entry.get("size"):
+            return False
+        if st.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        if file_sha256(input_path) != entry.get("sha256"):
+            return False
+        entry["mtime_ns"] = st.st_mtime_ns
+        self.dirty = True
+        return True
+
+    def record(self, output_path, input_path, fingerprint, settings):
+        """Record a freshly built output."""
+        self.outputs[self._key(output_path)] = {
+            "input": os.path.abspath(input_path),
+            "size": fingerprint["size"],
+            "mtime_ns": fingerprint["mtime_ns"],
+            "sha256": fingerprint["sha256"],
+            "settings": settings,
+        }
+        self.dirty = True
+
+    def save(self):
+        """Write the manifest atomically (tmp file + rename)."""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "outputs": self.outputs}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+        self.dirty = False
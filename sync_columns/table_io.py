@@ -0,0 +1,223 @@
+"""
+Pluggable table format for pipeline outputs.
+
+Every stage reads and writes tables through read_table / write_table, so the
+on-disk format is selected in one place (OUTPUT_FORMAT in config.py, or a
+stage's --format flag):
+
+  csv       plain text, to_csv(index=False) (default, what every stage wrote before)
+  parquet   columnar, SEGMENT_SENSOR_AXIS columns stored as float32, zstd codec
+  channels  memory-mapped float32 channel store (`<stem>.chan/`, see channel_store.py);
+            keeps only SEGMENT_SENSOR_AXIS columns
+
+Readers dispatch on the file extension, so a stage can consume either format
+regardless of what it writes. Parquet needs pyarrow (pip install pyarrow).
+"""
+
+import os
+import re
+
+import pandas as pd
+
+try:
+    from sync_columns.config import (
+        OUTPUT_FORMAT, PARQUET_COMPRESSION, SENSOR_DTYPE,
+        SENSOR_SEGMENTS, SENSOR_TYPES, AXES,
+    )
+except ImportError:
+    from config import (
+        OUTPUT_FORMAT, PARQUET_COMPRESSION, SENSOR_DTYPE,
+        SENSOR_SEGMENTS, SENSOR_TYPES, AXES,
+    )
+
+TABLE_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "channels": ".chan",
+}
+TABLE_FORMATS = tuple(TABLE_EXTENSIONS)
+COUNT_BLOCK_SIZE = 8 * 1024 * 1024
+
+SENSOR_COLUMN_RE = re.compile(
+    r"^(?:{segs})_(?:{types})_(?:{axes})$".format(
+        segs="|".join(sorted(SENSOR_SEGMENTS, key=len, reverse=True)),
+        types="|".join(SENSOR_TYPES),
+        axes="|".join(AXES),
+    )
+)
+
+
+def is_sensor_column(name):
+    """True for harmonized SEGMENT_SENSOR_AXIS names (e.g. R_FOOT_ACC_X)."""
+    return bool(SENSOR_COLUMN_RE.match(str(name)))
+
+
+def resolve_format(fmt=None):
+    """Return a valid format name, defaulting to OUTPUT_FORMAT."""
+    fmt = (fmt or OUTPUT_FORMAT).lower()
+    if fmt not in TABLE_EXTENSIONS:
+        raise ValueError(f"Unknown table format '{fmt}' (choose from {', '.join(TABLE_FORMATS)})")
+    return fmt
+
+
+def table_ext(fmt=None):
+    """File extension (with dot) for a format."""
+    return TABLE_EXTENSIONS[resolve_format(fmt)]
+
+
+def format_of(path):
+    """Infer the table format from a file's extension."""
+    ext = os.path.splitext(str(path))[1].lower()
+    for fmt, fext in TABLE_EXTENSIONS.items():
+        if ext == fext:
+            return fmt
+    raise ValueError(f"Not a table file: {path}")
+
+
+def is_table_file(name):
+    """True if name has a table extension (.csv, .parquet, .chan)."""
+    return os.path.splitext(str(name))[1].lower() in TABLE_EXTENSIONS.values()
+
+
+def with_table_ext(path, fmt=None):
+    """Replace path's extension with the one for fmt."""
+    return os.path.splitext(str(path))[0] + table_ext(fmt)
+
+
+def find_table_files(root_dir):
+    """Recursively find all table files (.csv, .parquet) and channel stores (.chan/) under root_dir."""
+    out = []
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        stores = [d for d in dirnames if d.endswith(TABLE_EXTENSIONS["channels"])]
+        out.extend(os.path.join(dirpath, d) for d in stores)
+        dirnames[:] = [d for d in dirnames if d not in stores]
+        for f in filenames:
+            if is_table_file(f):
+                out.append(os.path.join(dirpath, f))
+    return sorted(out)
+
+
+def _channel_store():
+    """channel_store imports this module, so it is imported lazily here."""
+    try:
+        from sync_columns import channel_store
+    except ImportError:
+        import channel_store
+    return channel_store
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet format needs pyarrow: pip install pyarrow") from e
+
+
+def read_table(path, columns=None, **read_kw):
+    """Read a table; `columns` projects to a subset (only those columns are parsed)."""
+    fmt = format_of(path)
+    if fmt == "channels":
+        return _channel_store().open_trial(path).to_frame(columns)
+    if fmt == "parquet":
+        _require_pyarrow()
+        return pd.read_parquet(path, columns=columns)
+    if columns is not None:
+        read_kw["usecols"] = columns
+    return pd.read_csv(path, **read_kw)
+
+
+def read_table_columns(path):
+    """Column names of a table without reading its body."""
+    fmt = format_of(path)
+    if fmt == "channels":
+        return _channel_store().open_trial(path).channels
+    if fmt == "parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def count_rows(path):
+    """Number of data rows in a table without parsing it.
+
+    CSV rows are counted as newlines in the raw bytes (minus the header), so a file
+    with blank lines or quoted line breaks is over-counted; callers use this as a
+    fast pre-check, not as the final word.
+    """
+    fmt = format_of(path)
+    if fmt == "channels":
+        return _channel_store().open_trial(path).n_samples
+    if fmt == "parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    lines, last = 0, b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(COUNT_BLOCK_SIZE), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1  # no trailing newline after the last row
+    return max(lines - 1, 0)
+
+
+def to_sensor_dtype(df):
+    """Cast SEGMENT_SENSOR_AXIS columns to SENSOR_DTYPE (float32); other columns untouched."""
+    cast = {
+        c: SENSOR_DTYPE for c in df.columns
+        if is_sensor_column(c) and pd.api.types.is_numeric_dtype(df[c])
+    }
+    return df.astype(cast) if cast else df
+
+
+def write_table(df, path, fmt=None):
+    """Write df to path in the given format (default OUTPUT_FORMAT). Returns the path."""
+    fmt = resolve_format(fmt)
+    os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+    if fmt == "channels":
+        _channel_store().write_trial(df, path)
+    elif fmt == "parquet":
+        _require_pyarrow()
+        to_sensor_dtype(df).to_parquet(path, engine="pyarrow", compression=PARQUET_COMPRESSION, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+class ParquetChunkWriter:
+    """Append DataFrame chunks to one Parquet file (used by streaming stages).
+
+    The schema is fixed by the first chunk; later chunks are cast to it.
+    """
+
+    def __init__(self, path):
+        _require_pyarrow()
+        self.path = path
+        self.rows_written = 0
+        self._writer = None
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(to_sensor_dtype(df), preserve_index=False)
+        if self._writer is None:
+            os.makedirs(os.path.dirname(str(self.path)) or ".", exist_ok=True)
+            self._writer = pq.ParquetWriter(self.path, table.schema, compression=PARQUET_COMPRESSION)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self.rows_written += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
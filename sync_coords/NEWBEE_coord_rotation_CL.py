@@ -20,11 +20,26 @@ Usage:
   python transform_orientation.py                # process all subjects
   python transform_orientation.py --dry-run      # show what would be done
   python transform_orientation.py --subject id01 # single subject
+  python transform_orientation.py --format parquet  # write Parquet instead of CSV
+  python transform_orientation.py --no-raw-cache    # re-parse raw exports, ignore .npz sidecars
+  python transform_orientation.py --workers 8       # 8 processes, largest files first
+
+Every run prints per-file wall time and throughput and writes a JSON run report
+(default: 02_coords_synced/00_reports/NEWBEE_coord_rotation.json) listing each
+file's status and skip reason.
+
+Only the sensorOrientation / sensorFreeAcceleration columns of each raw Xsens
+export are parsed; that projection is cached as an .npz sidecar under
+RAW_CACHE_DIR and reused while the raw file's size and mtime are unchanged.
 """
 
 import argparse
+import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
 
 import numpy as np
@@ -33,43 +48,60 @@ from scipy.spatial.transform import Rotation as R
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 try:
-    from sync_columns.config import RAW_DIR, SYNCED_DIR, COORDS_SYNCED_DIR, SENSOR_TYPES
+    from sync_columns.config import (
+        RAW_DIR, SYNCED_DIR, COORDS_SYNCED_DIR, RAW_CACHE_DIR, SENSOR_TYPES, SENSOR_DTYPE, XSENS_SEGMENTS,
+    )
+    from sync_columns.table_io import (
+        TABLE_FORMATS, count_rows, is_table_file, read_table, read_table_columns, resolve_format,
+        with_table_ext, write_table,
+    )
+    from sync_columns.catalog import record_outputs
 except ImportError:
-    from config import RAW_DIR, SYNCED_DIR, COORDS_SYNCED_DIR, SENSOR_TYPES
+    from config import (
+        RAW_DIR, SYNCED_DIR, COORDS_SYNCED_DIR, RAW_CACHE_DIR, SENSOR_TYPES, SENSOR_DTYPE, XSENS_SEGMENTS,
+    )
+    from table_io import (
+        TABLE_FORMATS, count_rows, is_table_file, read_table, read_table_columns, resolve_format,
+        with_table_ext, write_table,
+    )
+    from catalog import record_outputs
 
 NEWBEE_RAW_XSENS = os.path.join(
     RAW_DIR, "NEWBEE", "multi_modal_gait_database", "data_set_only_xsens"
 )
 NEWBEE_SYNCED = os.path.join(SYNCED_DIR, "NEWBEE")
 NEWBEE_COORDS = os.path.join(COORDS_SYNCED_DIR, "NEWBEE")
+NEWBEE_RAW_CACHE = os.path.join(RAW_CACHE_DIR, "NEWBEE")
+NEWBEE_REPORT = os.path.join(COORDS_SYNCED_DIR, "00_reports", "NEWBEE_coord_rotation.json")
+
+# Skip reasons in the run report, keyed by how process_one_file's message starts
+SKIP_REASONS = {
+    "no matching raw file": "no_raw_file",
+    "row count mismatch": "row_mismatch",
+    "bad determinant": "bad_determinant",
+}
 
-# Mapping from synced segment name to Xsens raw segment name
+# Mapping from synced segment name to Xsens raw segment name (shoulders carry no sensor)
 SEGMENT_TO_XSENS = {
-    "PELVIS": "Pelvis",
-    "TRUNK": "T8",
-    "HEAD": "Head",
-    "R_ARM": "RightUpperArm",
-    "L_ARM": "LeftUpperArm",
-    "R_FOREARM": "RightForeArm",
-    "L_FOREARM": "LeftForeArm",
-    "R_HAND": "RightHand",
-    "L_HAND": "LeftHand",
-    "R_THIGH": "RightUpperLeg",
-    "L_THIGH": "LeftUpperLeg",
-    "R_SHANK": "RightLowerLeg",
-    "L_SHANK": "LeftLowerLeg",
-    "R_FOOT": "RightFoot",
-    "L_FOOT": "LeftFoot",
+    seg: xsens for seg, xsens in XSENS_SEGMENTS.items() if seg not in ("R_SHOULDER", "L_SHOULDER")
 }
 
 FOOT_SEGMENTS = {"R_FOOT", "L_FOOT"}
 
+# Samples per chunk in the batched path (keeps the (segments, chunk) temporaries cache-sized)
+ROTATION_CHUNK_ROWS = 8192
+
 
 def quat_cols(xsens_seg):
     """Return the 4 sensorOrientation column names for a given Xsens segment."""
     return [f"sensorOrientation_{xsens_seg}_{q}" for q in ("q1", "qi", "qj", "qk")]
 
 
+def free_acc_cols(xsens_seg):
+    """Return the 3 sensorFreeAcceleration column names for a given Xsens segment."""
+    return [f"sensorFreeAcceleration_{xsens_seg}_{a}" for a in ("x", "y", "z")]
+
+
 def load_quaternions(raw_df, xsens_seg):
     """Extract sensorOrientation quaternions as scipy Rotation array.
     Xsens convention: q1=w, qi=x, qj=y, qk=z.  scipy wants [x,y,z,w]."""
@@ -81,7 +113,7 @@ def load_quaternions(raw_df, xsens_seg):
 def find_static_window(raw_df, xsens_seg, window_sec=1.0, fs=60.0):
     """Find the lowest-motion window in sensorFreeAcceleration.
     Returns (start_idx, end_idx) of the quietest window."""
-    acc_cols = [f"sensorFreeAcceleration_{xsens_seg}_{a}" for a in ("x", "y", "z")]
+    acc_cols = free_acc_cols(xsens_seg)
     if not all(c in raw_df.columns for c in acc_cols):
         return 0, min(int(fs * window_sec), len(raw_df))
     acc = raw_df[acc_cols].values
@@ -208,20 +240,85 @@ def find_matching_raw_csv(synced_csv_path):
     in data_set_only_xsens with matching course/subject structure."""
     rel = os.path.relpath(synced_csv_path, NEWBEE_SYNCED)
     parts = Path(rel).parts  # e.g. ('courseA', 'id01', 'xsens.csv')
-    raw_path = os.path.join(NEWBEE_RAW_XSENS, *parts)
+    raw_path = os.path.splitext(os.path.join(NEWBEE_RAW_XSENS, *parts))[0] + ".csv"
     if os.path.isfile(raw_path):
         return raw_path
     return None
 
 
-def transform_synced_df(synced_df, raw_df):
+def raw_projection(columns):
+    """The raw columns this stage uses (quaternions + free acceleration of every
+    mapped segment), in file order."""
+    wanted = set()
+    for xsens_seg in SEGMENT_TO_XSENS.values():
+        wanted.update(quat_cols(xsens_seg))
+        wanted.update(free_acc_cols(xsens_seg))
+    return [c for c in columns if c in wanted]
+
+
+def raw_cache_path(raw_path):
+    """Sidecar .npz for a raw export, mirroring its place under NEWBEE_RAW_XSENS."""
+    rel = os.path.relpath(raw_path, NEWBEE_RAW_XSENS)
+    return os.path.join(NEWBEE_RAW_CACHE, os.path.splitext(rel)[0] + ".npz")
+
+
+def read_raw_cache(raw_path):
+    """Projected raw DataFrame from the sidecar, or None if missing or stale
+    (the raw file's size or mtime changed)."""
+    cache = raw_cache_path(raw_path)
+    if not os.path.isfile(cache):
+        return None
+    st = os.stat(raw_path)
+    try:
+        with np.load(cache, allow_pickle=False) as z:
+            if int(z["size"]) != st.st_size or int(z["mtime_ns"]) != st.st_mtime_ns:
+                return None
+            return pd.DataFrame(z["data"], columns=[str(c) for c in z["columns"]])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_raw_cache(raw_path, raw_df):
+    """Store the projected raw block as float64 (N, columns) next to its fingerprint."""
+    cache = raw_cache_path(raw_path)
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    st = os.stat(raw_path)
+    tmp = cache + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, data=raw_df.to_numpy(dtype=np.float64), columns=np.array(raw_df.columns, dtype=str),
+                 size=st.st_size, mtime_ns=st.st_mtime_ns)
+    os.replace(tmp, cache)
+
+
+def load_raw_projected(raw_path, use_cache=True):
+    """Read only the quaternion / free-acceleration columns of a raw Xsens export
+    (the full export also carries positions, velocities, joint angles, ...)."""
+    if use_cache:
+        raw_df = read_raw_cache(raw_path)
+        if raw_df is not None:
+            return raw_df
+    cols = raw_projection(read_table_columns(raw_path))
+    raw_df = pd.read_csv(raw_path, usecols=cols)[cols]
+    if use_cache:
+        write_raw_cache(raw_path, raw_df)
+    return raw_df
+
+
+def transform_synced_df(synced_df, raw_df, batched=True, dtype=SENSOR_DTYPE):
     """
     Apply coordinate alignment to synced dataframe in memory using raw_df (with quaternions).
     Returns (success, coords_df, message). coords_df is a copy of synced_df with rotations applied.
+    batched: rotate all segments at once (rotated columns stored as dtype); otherwise
+    the original per-segment loop (float64).
     """
     if len(synced_df) != len(raw_df):
         return False, None, f"row count mismatch: synced={len(synced_df)}, raw={len(raw_df)}"
+    if batched:
+        return _transform_batched(synced_df, raw_df, dtype)
+    return _transform_per_segment(synced_df, raw_df)
+
 
+def _transform_per_segment(synced_df, raw_df):
     coords_df = synced_df.copy()
     heading_fwd = derive_forward_from_pelvis(raw_df)
 
@@ -234,7 +331,7 @@ def transform_synced_df(synced_df, raw_df):
 
         gyr_cols = [f"{seg}_GYR_{ax}" for ax in ("X", "Y", "Z")]
         if all(c in coords_df.columns for c in gyr_cols):
-            gyr_global = coords_df[gyr_cols].values
+            gyr_global = np.array(coords_df[gyr_cols].values)  # writable copy (pandas copy-on-write)
             gyr_sensor = rots.inv().apply(gyr_global)
             coords_df[gyr_cols] = gyr_sensor
 
@@ -249,45 +346,160 @@ def transform_synced_df(synced_df, raw_df):
         for sensor_type in SENSOR_TYPES:
             cols = [f"{seg}_{sensor_type}_{ax}" for ax in ("X", "Y", "Z")]
             if all(c in coords_df.columns for c in cols):
-                data = coords_df[cols].values
+                data = np.array(coords_df[cols].values)
                 coords_df[cols] = R_corr.apply(data)
 
     return True, coords_df, "ok"
 
 
-def process_one_file(synced_path, dry_run=False):
+def rotate_by_inverse(quats, vecs):
+    """Rotate vectors by the inverse of unit quaternions, i.e. R(q)^T v, without
+    building rotation matrices. Component-major: quats is (4, ...) [x, y, z, w],
+    vecs is (3, ...); returns (3, ...)."""
+    ux, uy, uz, w = -quats[0], -quats[1], -quats[2], quats[3]
+    vx, vy, vz = vecs
+    tx = 2.0 * (uy * vz - uz * vy)
+    ty = 2.0 * (uz * vx - ux * vz)
+    tz = 2.0 * (ux * vy - uy * vx)
+    return np.stack([
+        vx + w * tx + (uy * tz - uz * ty),
+        vy + w * ty + (uz * tx - ux * tz),
+        vz + w * tz + (ux * ty - uy * tx),
+    ])
+
+
+def apply_corrections(corrections, vecs):
+    """Apply one static matrix per segment: corrections (S, 3, 3), vecs (3, S, n) -> (3, S, n)."""
+    c = corrections[..., None]
+    return np.stack([c[:, i, 0] * vecs[0] + c[:, i, 1] * vecs[1] + c[:, i, 2] * vecs[2] for i in range(3)])
+
+
+def _segment_corrections(raw_df, segments, quats, heading_fwd):
+    """Static body-frame correction matrix (S, 3, 3) for each (seg, xsens_seg);
+    quats is the stacked (4, S, N) [x, y, z, w] array."""
+    corrections = np.empty((len(segments), 3, 3))
+    for i, (seg, xsens_seg) in enumerate(segments):
+        start, end = find_static_window(raw_df, xsens_seg)
+        R_mean = mean_quaternion(R.from_quat(quats[:, i, start:end].T))
+        corrections[i] = compute_correction_with_heading(R_mean, seg, heading_fwd).as_matrix()
+    return corrections
+
+
+def _transform_batched(synced_df, raw_df, dtype):
+    """
+    All segments at once, component-major: quaternions are stacked to (4, S, N)
+    and every channel group to (3, S, N). GYR is rotated global -> sensor by the
+    inverse quaternions, then each group gets its static corrections C_s, all as
+    elementwise array arithmetic over segments and samples. Results are written
+    chunk by chunk into one preallocated channel-major block of dtype.
+    """
+    heading_fwd = derive_forward_from_pelvis(raw_df)
+    segments = [(seg, xsens_seg) for seg, xsens_seg in SEGMENT_TO_XSENS.items()
+                if all(c in raw_df.columns for c in quat_cols(xsens_seg))]
+    if not segments:
+        return True, synced_df.copy(), "ok"
+
+    n = len(synced_df)
+    # [w, x, y, z] columns -> scipy's [x, y, z, w], stacked to (4, S, N) unit quaternions
+    quats = raw_df[[c for _, x in segments for c in quat_cols(x)]].to_numpy(dtype=np.float64).T
+    quats = quats.reshape(len(segments), 4, n).transpose(1, 0, 2)[[1, 2, 3, 0]]
+    quats /= np.sqrt(np.einsum("qsn,qsn->sn", quats, quats))
+    corrections = _segment_corrections(raw_df, segments, quats, heading_fwd)
+    for (seg, _), C in zip(segments, corrections):
+        det = np.linalg.det(C)
+        if abs(det - 1.0) > 0.01:
+            return False, None, f"bad determinant for {seg}: {det:.4f}"
+
+    # Channels to rotate, grouped per sensor type: (type, segment indices, columns)
+    groups = []
+    for sensor_type in SENSOR_TYPES:
+        idx, cols = [], []
+        for i, (seg, _) in enumerate(segments):
+            c = [f"{seg}_{sensor_type}_{ax}" for ax in ("X", "Y", "Z")]
+            if all(col in synced_df.columns for col in c):
+                idx.append(i)
+                cols.extend(c)
+        if idx:
+            groups.append((sensor_type, idx, cols))
+
+    rotated_cols = [c for _, _, cols in groups for c in cols]
+    block = np.empty((len(rotated_cols), n), dtype=dtype)
+    offset = 0
+    for sensor_type, idx, cols in groups:
+        width = len(cols)
+        # (3S, N) channel rows -> (3, S, N)
+        data = synced_df[cols].to_numpy(dtype=np.float64).T.reshape(len(idx), 3, n).transpose(1, 0, 2)
+        out = block[offset:offset + width].reshape(len(idx), 3, n).transpose(1, 0, 2)
+        for lo in range(0, n, ROTATION_CHUNK_ROWS):
+            hi = min(lo + ROTATION_CHUNK_ROWS, n)
+            chunk = data[:, :, lo:hi]
+            if sensor_type == "GYR":
+                chunk = rotate_by_inverse(quats[:, idx, lo:hi], chunk)
+            out[:, :, lo:hi] = apply_corrections(corrections[idx], chunk)
+        offset += width
+
+    # block.T is a zero-copy (N, channels) view; untouched columns are carried over as-is
+    rotated = pd.DataFrame(block.T, columns=rotated_cols, index=synced_df.index, copy=False)
+    kept = [c for c in synced_df.columns if c not in set(rotated_cols)]
+    coords_df = pd.concat([rotated, synced_df[kept]], axis=1)[list(synced_df.columns)]
+    return True, coords_df, "ok"
+
+
+def process_one_file(synced_path, dry_run=False, fmt=None, use_cache=True, stats=None):
     """Process a single synced CSV: rotate GYR to sensor frame,
-    then apply body-frame correction to all channels."""
+    then apply body-frame correction to all channels.
+    Row counts are compared before either file is parsed; count_rows over-counts
+    blank lines and quoted line breaks, so on a mismatch both files are parsed and
+    their lengths compared before the trial is rejected.
+    If a dict is passed as stats, the trial's row count is stored in stats["rows"]."""
     raw_path = find_matching_raw_csv(synced_path)
     if not raw_path:
         return False, "no matching raw file"
 
-    synced_df = pd.read_csv(synced_path)
-    raw_df = pd.read_csv(raw_path)
-
-    if len(synced_df) != len(raw_df):
-        return False, f"row count mismatch: synced={len(synced_df)}, raw={len(raw_df)}"
+    raw_df = read_raw_cache(raw_path) if use_cache else None
+    n_raw = len(raw_df) if raw_df is not None else count_rows(raw_path)
+    n_synced = count_rows(synced_path)
+    synced_df = None
+    if n_synced != n_raw:
+        synced_df = read_table(synced_path)
+        if raw_df is None:
+            raw_df = load_raw_projected(raw_path, use_cache=use_cache)
+        n_synced, n_raw = len(synced_df), len(raw_df)
+    if stats is not None:
+        stats["rows"] = n_synced
+    if n_synced != n_raw:
+        return False, f"row count mismatch: synced={n_synced}, raw={n_raw}"
 
     if dry_run:
         return True, "would process"
 
-    success, coords_df, msg = transform_synced_df(synced_df, raw_df)
+    if synced_df is None:
+        synced_df = read_table(synced_path)
+    if raw_df is None:
+        raw_df = load_raw_projected(raw_path, use_cache=use_cache)
+
+    # CSV output keeps float64 text; binary formats store float32 anyway
+    dtype = np.float64 if resolve_format(fmt) == "csv" else SENSOR_DTYPE
+    success, coords_df, msg = transform_synced_df(synced_df, raw_df, dtype=dtype)
     if not success:
         return False, msg
 
-    rel = os.path.relpath(synced_path, NEWBEE_SYNCED)
-    out_path = os.path.join(NEWBEE_COORDS, rel)
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    coords_df.to_csv(out_path, index=False)
+    write_table(coords_df, coords_output_path(synced_path, fmt), fmt=fmt)
     return True, "ok"
 
 
+def coords_output_path(synced_path, fmt=None):
+    """Where the rotated table of a synced trial is written (same layout under NEWBEE_COORDS)."""
+    rel = os.path.relpath(synced_path, NEWBEE_SYNCED)
+    return with_table_ext(os.path.join(NEWBEE_COORDS, rel), fmt)
+
+
 def collect_synced_csvs(subject_filter=None):
     """Find all synced NEWBEE CSV files, optionally filtered by subject ID."""
     csvs = []
     for dp, _, files in os.walk(NEWBEE_SYNCED):
         for f in sorted(files):
-            if not f.lower().endswith(".csv"):
+            if not is_table_file(f):
                 continue
             path = os.path.join(dp, f)
             if subject_filter:
@@ -297,6 +509,99 @@ def collect_synced_csvs(subject_filter=None):
     return csvs
 
 
+def skip_reason(msg):
+    """Report category for a failure message from process_one_file."""
+    for prefix, reason in SKIP_REASONS.items():
+        if msg.startswith(prefix):
+            return reason
+    return "error"
+
+
+def input_bytes(synced_path):
+    """Bytes a trial has to read: the synced table plus its raw export (scheduling weight)."""
+    paths = [synced_path, find_matching_raw_csv(synced_path)]
+    total = 0
+    for p in filter(None, paths):
+        if os.path.isdir(p):
+            total += sum(e.stat().st_size for e in os.scandir(p) if e.is_file())
+        else:
+            total += os.path.getsize(p)
+    return total
+
+
+def _run_one(path, dry_run, fmt, use_cache):
+    """process_one_file with timing; never raises, so one bad trial cannot stop a pool run."""
+    stats = {}
+    t0 = time.perf_counter()
+    try:
+        success, msg = process_one_file(path, dry_run=dry_run, fmt=fmt, use_cache=use_cache, stats=stats)
+    except Exception as e:
+        success, msg = False, f"{type(e).__name__}: {e}"
+    return path, success, msg, time.perf_counter() - t0, stats.get("rows")
+
+
+def run_all(paths, dry_run=False, fmt=None, use_cache=True, workers=1):
+    """Rotate every trial in paths, largest first, and return the run report dict."""
+    sizes = {p: input_bytes(p) for p in paths}
+    jobs = sorted(paths, key=sizes.get, reverse=True)
+    started = datetime.now().isoformat(timespec="seconds")
+    t0 = time.perf_counter()
+    entries = []
+
+    def report(result):
+        path, success, msg, seconds, rows = result
+        rel = os.path.relpath(path, NEWBEE_SYNCED)
+        entry = {"path": rel, "status": "ok" if success else "skipped", "message": msg,
+                 "seconds": round(seconds, 3), "rows": rows, "bytes": sizes[path]}
+        if not success:
+            entry["reason"] = skip_reason(msg)
+        entries.append(entry)
+        speed = f"{rows / seconds:,.0f} rows/s, {sizes[path] / seconds / 1e6:.1f} MB/s" if success and rows and seconds > 0 else "-"
+        status = "ok  " if success else "SKIP"
+        print(f"  [{len(entries)}/{len(jobs)}] {status} {rel}  {seconds:.2f} s ({speed})"
+              + ("" if success else f": {msg}"))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_one, p, dry_run, fmt, use_cache) for p in jobs]
+            for fut in as_completed(futures):
+                report(fut.result())
+    else:
+        for p in jobs:
+            report(_run_one(p, dry_run, fmt, use_cache))
+
+    wall = time.perf_counter() - t0
+    done = [e for e in entries if e["status"] == "ok"]
+    skipped = {}
+    for e in entries:
+        if e["status"] != "ok":
+            skipped[e["reason"]] = skipped.get(e["reason"], 0) + 1
+    rows = sum(e["rows"] or 0 for e in done)
+    return {
+        "started": started,
+        "wall_seconds": round(wall, 3),
+        "workers": workers,
+        "format": resolve_format(fmt),
+        "dry_run": dry_run,
+        "n_files": len(jobs),
+        "processed": len(done),
+        "skipped": skipped,
+        "rows": rows,
+        "rows_per_second": round(rows / wall, 1) if wall > 0 else None,
+        "bytes_per_second": round(sum(e["bytes"] for e in done) / wall, 1) if wall > 0 else None,
+        "files": sorted(entries, key=lambda e: e["path"]),
+    }
+
+
+def write_report(report, path):
+    """Write the run report atomically (tmp file + rename)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(report, f, indent=1)
+    os.replace(tmp, path)
+
+
 def main():
     parser = argparse.ArgumentParser(description=__doc__,
                                      formatter_class=argparse.RawDescriptionHelpFormatter)
@@ -304,6 +609,14 @@ def main():
                         help="Show what would be done without writing")
     parser.add_argument("--subject", type=str, default=None,
                         help="Process only this subject ID (e.g. id01)")
+    parser.add_argument("--format", choices=TABLE_FORMATS, default=None,
+                        help="Output table format (default: OUTPUT_FORMAT in config.py)")
+    parser.add_argument("--no-raw-cache", action="store_true",
+                        help="Parse raw exports again instead of reusing the .npz sidecars")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Rotate files on a pool of N processes, largest first (default: 1, serial)")
+    parser.add_argument("--report", type=str, default=NEWBEE_REPORT, metavar="PATH",
+                        help="Where to write the JSON run report (not written with --dry-run)")
     args = parser.parse_args()
 
     csvs = collect_synced_csvs(args.subject)
@@ -311,17 +624,19 @@ def main():
     if not csvs:
         return
 
-    ok, fail = 0, 0
-    for path in csvs:
-        rel = os.path.relpath(path, NEWBEE_SYNCED)
-        success, msg = process_one_file(path, dry_run=args.dry_run)
-        if success:
-            ok += 1
-        else:
-            fail += 1
-            print(f"  SKIP {rel}: {msg}")
-
-    print(f"\nDone: {ok} processed, {fail} skipped")
+    report = run_all(csvs, dry_run=args.dry_run, fmt=args.format,
+                     use_cache=not args.no_raw_cache, workers=args.workers)
+
+    reasons = ", ".join(f"{k}: {v}" for k, v in sorted(report["skipped"].items()))
+    n_skipped = sum(report["skipped"].values())
+    print(f"\nDone: {report['processed']} processed, {n_skipped} skipped"
+          + (f" ({reasons})" if reasons else "")
+          + f" in {report['wall_seconds']:.1f} s, {report['rows_per_second'] or 0:,.0f} rows/s")
+    if not args.dry_run:
+        write_report(report, args.report)
+        print(f"Report: {args.report}")
+        record_outputs(coords_output_path(os.path.join(NEWBEE_SYNCED, e["path"]), args.format)
+                       for e in report["files"] if e["status"] == "ok")
 
 
 if __name__ == "__main__":
@@ -1,156 +1,53 @@
 """
-batch_synced_coord_CL.py
-------------------------
-Runs the synced_coord_CL pipeline on every CSV found (recursively) under
-INPUT_ROOT, preserves the sub-folder structure under OUTPUT_ROOT, and saves:
-  - <original_name>_isb.csv   — rotated data
+YARETA_synced_coord_SVS.py
+--------------------------
+Runs the YARETA coordinate-sync pipeline (sync_coords/engine.py) on every CSV
+found (recursively) under --input-root, preserves the sub-folder structure under
+--output-root, and saves:
+  - <original_name>_isb.csv   — rotated data (.parquet if OUTPUT_FORMAT = "parquet")
+  - <original_name>_isb_report.json — static window / unit / gravity check per sensor
   - <original_name>_validation.png  — bar-chart + time-series (cell 5b)
   - <original_name>_frames_3d.png   — 3-D coordinate frames (cell 5c)
 
-Edit the two paths at the top before running.
+The figures are only needed for QA and take most of the per-file time, so
+plotting is a separate stage:
+
+  python YARETA_synced_coord_SVS.py --input-root IN --output-root OUT               # rotate + plot all
+  python YARETA_synced_coord_SVS.py --input-root IN --output-root OUT --no-plots    # rotate only
+  python YARETA_synced_coord_SVS.py --input-root IN --output-root OUT --plots-sample 5
+  python YARETA_synced_coord_SVS.py --input-root IN --output-root OUT --plots-only  # plot existing outputs
+
+--plots-only re-renders from the written table and its _isb_report.json; nothing
+is recomputed. matplotlib is imported only when a figure is rendered.
 """
 
-# ── EDIT THESE TWO PATHS ──────────────────────────────────────────────────────
+# Defaults for --input-root / --output-root
 INPUT_ROOT  = "/Users/sofiavelasquez/Library/CloudStorage/Box-Box/WHT Datasets/01_columns_synced/YARETA/P10_S01/SYNC_DATA"
 OUTPUT_ROOT = "/Users/sofiavelasquez/Library/CloudStorage/Box-Box/WHT Datasets/02_coords_synced/YARETA/P10_S01/SYNC_DATA_ISB"
-# ─────────────────────────────────────────────────────────────────────────────
 
+import argparse
+import json
 import os
 import sys
 import traceback
+from pathlib import Path
 import numpy as np
 import pandas as pd
-import matplotlib
-matplotlib.use("Agg")          # non-interactive backend (no display needed)
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D   # noqa: F401 – needed for 3-D projection
-from matplotlib.lines import Line2D
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from sync_columns.table_io import TABLE_FORMATS, is_table_file, read_table, table_ext, write_table
+from sync_coords.engine import (
+    COL_PATTERNS, DATASETS, R_ft2isb, assemble_output, build_sensors_from_prefixes, is_foot,
+    rotate_sensors, rotation_for,
+)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-# Helper functions  (identical to notebook)
+# Helpers and rotations are shared with the other datasets (sync_coords/engine.py)
 # ══════════════════════════════════════════════════════════════════════════════
 
-G0 = 9.80665
-
-COL_PATTERNS = dict(
-    acc=("{p}_ACC_X", "{p}_ACC_Y", "{p}_ACC_Z"),
-    gyr=("{p}_GYR_X", "{p}_GYR_Y", "{p}_GYR_Z"),
-)
-
-
-def build_sensors_from_prefixes(df, prefixes, patterns):
-    cols = set(df.columns)
-    sensors = {}
-    for p in prefixes:
-        acc_cols = tuple(s.format(p=p) for s in patterns["acc"])
-        if not all(c in cols for c in acc_cols):
-            continue
-        gyr_cols = tuple(s.format(p=p) for s in patterns.get("gyr", ()))
-        gyr_ok = len(gyr_cols) == 3 and all(c in cols for c in gyr_cols)
-        sensors[p] = {"acc": acc_cols, "gyr": gyr_cols if gyr_ok else None}
-    return sensors
-
-
-def find_static_window(acc, gyr=None, win=300, step=50):
-    acc = np.asarray(acc, float)
-    N = len(acc)
-    if N <= win:
-        return 0, N
-
-    def acc_stability(a):
-        return float(np.mean(np.std(a, axis=0)))
-
-    if gyr is not None:
-        gyr = np.asarray(gyr, float)
-        gyr_mag = np.linalg.norm(gyr, axis=1)
-        def score(s, e):
-            return float(np.mean(gyr_mag[s:e]) + 0.5 * acc_stability(acc[s:e]))
-    else:
-        def score(s, e):
-            return float(acc_stability(acc[s:e]))
-
-    best = (np.inf, 0, win)
-    for s in range(0, N - win + 1, step):
-        e = s + win
-        sc = score(s, e)
-        if sc < best[0]:
-            best = (sc, s, e)
-    return best[1], best[2]
-
-
-def detect_accel_units_and_scale(acc_static):
-    acc_static = np.asarray(acc_static, float)
-    mag = np.linalg.norm(acc_static, axis=1)
-    med = float(np.median(mag))
-    if 0.3 <= med <= 2.5:
-        return {"unit_label": "g", "scale_to_g": 1.0, "median_mag": med}
-    if 6.0 <= med <= 14.0:
-        return {"unit_label": "m/s^2", "scale_to_g": 1.0 / G0, "median_mag": med}
-    counts_per_g = med
-    return {"unit_label": "raw", "scale_to_g": 1.0 / counts_per_g,
-            "median_mag": med, "counts_per_g_est": counts_per_g}
-
-
-def normalize(v, eps=1e-12):
-    v = np.asarray(v, float)
-    n = np.linalg.norm(v)
-    if n < eps:
-        raise ValueError("Cannot normalize near-zero vector")
-    return v / n
-
-
-def rot_between(a, b):
-    a = normalize(a); b = normalize(b)
-    v = np.cross(a, b)
-    c = float(np.clip(np.dot(a, b), -1.0, 1.0))
-    s = np.linalg.norm(v)
-    if s < 1e-12:
-        if c > 0:
-            return np.eye(3)
-        tmp = np.array([1, 0, 0]) if abs(a[0]) < 0.9 else np.array([0, 1, 0])
-        axis = normalize(np.cross(a, tmp))
-        K = np.array([[0, -axis[2], axis[1]],
-                      [axis[2], 0, -axis[0]],
-                      [-axis[1], axis[0], 0]])
-        return np.eye(3) + 2 * (K @ K)
-    K = np.array([[0, -v[2], v[1]],
-                  [v[2], 0, -v[0]],
-                  [-v[1], v[0], 0]])
-    return np.eye(3) + K + (K @ K) * ((1 - c) / (s ** 2))
-
-
-def rotate_series(R, V):
-    return (R @ np.asarray(V, float).T).T
-
-
-def angle_deg(u, v):
-    u = normalize(u); v = normalize(v)
-    c = float(np.clip(np.dot(u, v), -1.0, 1.0))
-    return float(np.degrees(np.arccos(c)))
-
-
-def is_foot(sensor_name):
-    return "FOOT" in sensor_name.upper()
-
-
-# Fixed analytic rotation matrices (from HuGaDB documentation)
-R_body = np.array([[ 0,  0, -1],
-                   [ 1,  0,  0],
-                   [ 0, -1,  0]], dtype=float)
-
-R_foot = np.array([[ 0,  0, -1],
-                   [ 1,  0,  0],
-                   [ 0, -1,  0]], dtype=float)
-
-# foot-target → ISB
-R_ft2isb = np.array([[0, -1, 0],
-                     [1,  0, 0],
-                     [0,  0, 1]], dtype=float)
-
-STATIC_WIN  = 300
-STATIC_STEP = 50
-ISB_DOWN    = np.array([0., -1., 0.])
+CFG = DATASETS["YARETA"]
+R_body, R_foot = CFG["default"], CFG["foot"]
 
 AXIS_COLORS = ["#e74c3c", "#27ae60", "#3498db"]
 AXIS_NAMES  = ["X", "Y", "Z"]
@@ -160,78 +57,67 @@ AXIS_NAMES  = ["X", "Y", "Z"]
 # Core processing
 # ══════════════════════════════════════════════════════════════════════════════
 
-def process_file(csv_path, out_dir, dataset_name):
+def output_paths(out_dir, dataset_name, fmt=None):
+    """Where process_file writes the rotated table and its QA report."""
+    return (os.path.join(out_dir, f"{dataset_name}_isb{table_ext(fmt)}"),
+            os.path.join(out_dir, f"{dataset_name}_isb_report.json"))
+
+
+def process_file(csv_path, out_dir, dataset_name, fmt=None, plots=True):
     """
-    Process one CSV file.  Saves:
-      <out_dir>/<dataset_name>_isb.csv
+    Process one CSV (or Parquet) file.  Saves:
+      <out_dir>/<dataset_name>_isb.csv   (or .parquet, see OUTPUT_FORMAT)
+      <out_dir>/<dataset_name>_isb_report.json
+    and, with plots=True:
       <out_dir>/<dataset_name>_validation.png
       <out_dir>/<dataset_name>_frames_3d.png
+    Returns False if the file has no IMU columns.
     """
-    df = pd.read_csv(csv_path)
+    df = read_table(csv_path)
     df.columns = df.columns.str.strip()
 
     prefixes = sorted({c.replace("_ACC_X", "") for c in df.columns if c.endswith("_ACC_X")})
     SENSORS = build_sensors_from_prefixes(df, prefixes, COL_PATTERNS)
     if not SENSORS:
         print(f"  [SKIP] No IMU columns detected in {csv_path}")
-        return
-
-    df_out   = df.copy()
-    report   = []
-    rotations = {}
-
-    for _s, _m in SENSORS.items():
-        for _col in _m["acc"]:
-            df_out[_col] = df_out[_col].astype("float64")
-        if _m.get("gyr") is not None:
-            for _col in _m["gyr"]:
-                df_out[_col] = df_out[_col].astype("float64")
-
-    for s, m in SENSORS.items():
-        acc_cols = m["acc"]
-        gyr_cols = m["gyr"]
-
-        acc_raw = df.loc[:, acc_cols].to_numpy(float)
-        gyr_raw = df.loc[:, gyr_cols].to_numpy(float) if gyr_cols is not None else None
-
-        ws, we = find_static_window(acc_raw, gyr=gyr_raw,
-                                    win=min(STATIC_WIN, len(df)), step=STATIC_STEP)
-        info  = detect_accel_units_and_scale(acc_raw[ws:we])
-        scale = float(info["scale_to_g"])
-        acc_g = acc_raw * scale
-
-        R = R_foot if is_foot(s) else R_body
-        rotations[s] = R
-
-        acc_isb = rotate_series(R, acc_g)
-        df_out.loc[:, acc_cols[0]] = acc_isb[:, 0]
-        df_out.loc[:, acc_cols[1]] = acc_isb[:, 1]
-        df_out.loc[:, acc_cols[2]] = acc_isb[:, 2]
-
-        if gyr_raw is not None:
-            gyr_isb = rotate_series(R, gyr_raw)
-            df_out.loc[:, gyr_cols[0]] = gyr_isb[:, 0]
-            df_out.loc[:, gyr_cols[1]] = gyr_isb[:, 1]
-            df_out.loc[:, gyr_cols[2]] = gyr_isb[:, 2]
-
-        g_after   = np.mean(acc_isb[ws:we], axis=0)
-        ang_after = angle_deg(g_after, ISB_DOWN)
-
-        report.append({
-            "sensor":                   s,
-            "static_start":             ws,
-            "static_end":               we,
-            "detected_unit":            info["unit_label"],
-            "scale_to_g":               scale,
-            "gravity_angle_after_deg":  ang_after,
-        })
+        return False
 
-    report_df = pd.DataFrame(report).sort_values("sensor")
+    block, columns, report, rotations = rotate_sensors(df, SENSORS, CFG)
+    df_out = assemble_output(df, block, columns)
 
-    # ── Save CSV ──────────────────────────────────────────────────────────────
+    # ── Save table + QA report ────────────────────────────────────────────────
     os.makedirs(out_dir, exist_ok=True)
-    csv_out = os.path.join(out_dir, f"{dataset_name}_isb.csv")
-    df_out.to_csv(csv_out, index=False)
+    table_out, report_out = output_paths(out_dir, dataset_name, fmt)
+    write_table(df_out, table_out, fmt=fmt)
+    with open(report_out, "w") as f:
+        json.dump({"input": os.path.abspath(csv_path), "sensors": report}, f, indent=1)
+
+    if plots:
+        render_plots(df, df_out, report, SENSORS, rotations, out_dir, dataset_name)
+
+    print(f"  [OK]  {dataset_name}  →  {out_dir}")
+    return True
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Plotting stage (QA only)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _pyplot():
+    """Import matplotlib on first use so the rotation stage does not need it."""
+    import matplotlib
+    matplotlib.use("Agg")          # non-interactive backend (no display needed)
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D   # noqa: F401 – needed for 3-D projection
+    return plt
+
+
+def render_plots(df, df_out, report, SENSORS, rotations, out_dir, dataset_name):
+    """Validation bar chart / time series and 3-D frames for one rotated file."""
+    plt = _pyplot()
+    from matplotlib.lines import Line2D
+
+    report_df = pd.DataFrame(report).sort_values("sensor")
 
     # ── Plot 1: Validation (bar chart + time series) — cell 5b ───────────────
     sensors_list = report_df["sensor"].tolist()
@@ -248,8 +134,8 @@ def process_file(csv_path, out_dir, dataset_name):
         ws2  = int(row["static_start"]); we2 = int(row["static_end"])
         scl  = float(row["scale_to_g"])
         acols = SENSORS[s]["acc"]
-        mean_before[i] = (df.loc[ws2:we2 - 1, acols].to_numpy(float) * scl).mean(axis=0)
-        mean_after[i]  = df_out.loc[ws2:we2 - 1, acols].to_numpy(float).mean(axis=0)
+        mean_before[i] = (df[list(acols)].iloc[ws2:we2].to_numpy(float) * scl).mean(axis=0)
+        mean_after[i]  = df_out[list(acols)].iloc[ws2:we2].to_numpy(float).mean(axis=0)
 
     x = np.arange(len(sensors_list))
     w = 0.25
@@ -281,8 +167,8 @@ def process_file(csv_path, out_dir, dataset_name):
     scl2 = float(row2["scale_to_g"])
     acols2 = SENSORS[example_sensor]["acc"]
     idx = np.arange(ws2, we2)
-    before_y = df.loc[ws2:we2 - 1, acols2[1]].to_numpy(float) * scl2
-    after_y  = df_out.loc[ws2:we2 - 1, acols2[1]].to_numpy(float)
+    before_y = df[acols2[1]].iloc[ws2:we2].to_numpy(float) * scl2
+    after_y  = df_out[acols2[1]].iloc[ws2:we2].to_numpy(float)
     ax3.plot(idx, before_y, alpha=0.8, label="Before (sensor frame, g)", color="C0")
     ax3.plot(idx, after_y,  alpha=0.8, label="After (ISB)",              color="C1")
     ax3.axhline(-1, color="green", linestyle="--", linewidth=0.8, alpha=0.8)
@@ -358,7 +244,28 @@ def process_file(csv_path, out_dir, dataset_name):
                 bbox_inches="tight")
     plt.close(fig2)
 
-    print(f"  [OK]  {dataset_name}  →  {out_dir}")
+
+def plot_existing(csv_path, out_dir, dataset_name, fmt=None):
+    """Render the QA figures later, from the input file and what process_file wrote."""
+    table_out, report_out = output_paths(out_dir, dataset_name, fmt)
+    with open(report_out) as f:
+        report = json.load(f)["sensors"]
+    df = read_table(csv_path)
+    df.columns = df.columns.str.strip()
+    df_out = read_table(table_out)
+    SENSORS = build_sensors_from_prefixes(df, [r["sensor"] for r in report], COL_PATTERNS)
+    rotations = {s: rotation_for(CFG, s) for s in SENSORS}
+    render_plots(df, df_out, report, SENSORS, rotations, out_dir, dataset_name)
+    print(f"  [PLOT] {dataset_name}  →  {out_dir}")
+
+
+def plot_sample(paths, k):
+    """k paths spread evenly over the sorted list (all of them if k is None)."""
+    if k is None or k >= len(paths):
+        return set(paths)
+    if k <= 0:
+        return set()
+    return {paths[int(i)] for i in np.linspace(0, len(paths) - 1, k).round()}
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -366,30 +273,56 @@ def process_file(csv_path, out_dir, dataset_name):
 # ══════════════════════════════════════════════════════════════════════════════
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input-root", default=INPUT_ROOT, help="Synced YARETA tables (searched recursively)")
+    parser.add_argument("--output-root", default=OUTPUT_ROOT, help="Mirror of --input-root for the ISB outputs")
+    parser.add_argument("--format", choices=TABLE_FORMATS, default=None,
+                        help="Output table format (default: OUTPUT_FORMAT in config.py)")
+    plots = parser.add_mutually_exclusive_group()
+    plots.add_argument("--no-plots", action="store_true", help="Write rotated tables only, no figures")
+    plots.add_argument("--plots-sample", type=int, default=None, metavar="K",
+                       help="Render figures for K files spread over the run instead of all")
+    parser.add_argument("--plots-only", action="store_true",
+                        help="Skip rotation; render figures for outputs written by an earlier run")
+    args = parser.parse_args()
+    if args.plots_only and args.no_plots:
+        parser.error("--plots-only and --no-plots cannot be combined (one skips rotation, the other figures)")
+    input_root, output_root = args.input_root, args.output_root
+
     csv_files = []
-    for dirpath, _, filenames in os.walk(INPUT_ROOT):
+    for dirpath, _, filenames in os.walk(input_root):
         for fname in filenames:
-            if fname.lower().endswith(".csv"):
+            if is_table_file(fname):
                 csv_files.append(os.path.join(dirpath, fname))
 
     if not csv_files:
-        print(f"No CSV files found under: {INPUT_ROOT}")
+        print(f"No CSV files found under: {input_root}")
         sys.exit(1)
 
-    print(f"Found {len(csv_files)} CSV file(s) under {INPUT_ROOT}\n")
+    csv_files.sort()
+    to_plot = set() if args.no_plots else plot_sample(csv_files, args.plots_sample)
+    print(f"Found {len(csv_files)} CSV file(s) under {input_root}")
+    print(f"Figures for {len(to_plot)} file(s)\n")
 
     ok = 0; fail = 0
-    for csv_path in sorted(csv_files):
-        # Relative path from INPUT_ROOT  →  mirrors to OUTPUT_ROOT
-        rel_dir  = os.path.relpath(os.path.dirname(csv_path), INPUT_ROOT)
-        out_dir  = os.path.join(OUTPUT_ROOT, rel_dir)
+    for csv_path in csv_files:
+        if args.plots_only and csv_path not in to_plot:
+            continue
+        # Relative path from input_root  →  mirrors to output_root
+        rel_dir  = os.path.relpath(os.path.dirname(csv_path), input_root)
+        out_dir  = os.path.join(output_root, rel_dir)
 
         # Dataset name = CSV filename without extension (used in plot titles & output names)
         dataset_name = os.path.splitext(os.path.basename(csv_path))[0]
 
-        print(f"Processing: {os.path.relpath(csv_path, INPUT_ROOT)}")
+        print(f"Processing: {os.path.relpath(csv_path, input_root)}")
         try:
-            process_file(csv_path, out_dir, dataset_name)
+            if args.plots_only:
+                plot_existing(csv_path, out_dir, dataset_name, fmt=args.format)
+            else:
+                process_file(csv_path, out_dir, dataset_name, fmt=args.format,
+                             plots=csv_path in to_plot)
             ok += 1
         except Exception:
             print(f"  [ERROR] {csv_path}")
@@ -397,7 +330,7 @@ def main():
             fail += 1
 
     print(f"\nDone — {ok} succeeded, {fail} failed.")
-    print(f"Output saved to: {OUTPUT_ROOT}")
+    print(f"Output saved to: {output_root}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Coordinate-frame harmonization of synced sensor data."""
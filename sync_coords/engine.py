@@ -0,0 +1,413 @@
+"""
+Registry-driven coordinate-sync engine for datasets whose sensors get a fixed
+analytic rotation into ISB (YARETA, CAMARGO, RealWorldHAR).
+
+Each dataset registers its rotation matrices, sampling rate and static-window
+size in DATASETS; everything else (sensor detection, static window, unit
+detection, rotation, output assembly) is shared, so a fix here reaches every
+dataset. NEWBEE is not registered: its rotations come from the Xsens
+quaternions (see NEWBEE_coord_rotation_CL.py).
+
+Usage:
+  python engine.py YARETA                         # 01_columns_synced/YARETA → 02_coords_synced/YARETA
+  python engine.py CAMARGO --workers 8            # files on a pool of 8 processes, largest first
+  python engine.py RealWorldHAR --format parquet
+  python engine.py YARETA --input-root IN --output-root OUT
+
+Each output table gets a <name>_report.json next to it with the static window,
+detected accelerometer unit and post-rotation gravity angle of every sensor.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from sync_columns.config import (
+    BLUE, GREEN, YELLOW, RED, RESET, DATASET_ROOTS, DATASET_FS, SENSOR_SEGMENTS, SYNCED_DIR, COORDS_SYNCED_DIR,
+)
+from sync_columns.catalog import record_outputs
+from sync_columns.table_io import TABLE_FORMATS, find_table_files, read_table, table_ext, write_table
+from sync_coords.static_window import find_static_window
+
+G0 = 9.80665
+
+COL_PATTERNS = dict(
+    acc=("{p}_ACC_X", "{p}_ACC_Y", "{p}_ACC_Z"),
+    gyr=("{p}_GYR_X", "{p}_GYR_Y", "{p}_GYR_Z"),
+)
+
+ISB_DOWN = np.array([0., -1., 0.])
+
+# foot-target → ISB (used to draw foot frames)
+R_ft2isb = np.array([[0, -1, 0],
+                     [1,  0, 0],
+                     [0,  0, 1]], dtype=float)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Shared helpers
+# ══════════════════════════════════════════════════════════════════════════════
+
+def build_sensors_from_prefixes(df, prefixes, patterns=COL_PATTERNS):
+    cols = set(df.columns)
+    sensors = {}
+    for p in prefixes:
+        acc_cols = tuple(s.format(p=p) for s in patterns["acc"])
+        if not all(c in cols for c in acc_cols):
+            continue
+        gyr_cols = tuple(s.format(p=p) for s in patterns.get("gyr", ()))
+        gyr_ok = len(gyr_cols) == 3 and all(c in cols for c in gyr_cols)
+        sensors[p] = {"acc": acc_cols, "gyr": gyr_cols if gyr_ok else None}
+    return sensors
+
+
+def detect_sensors(df):
+    """{prefix: {"acc": cols, "gyr": cols or None}} for every <prefix>_ACC_X/Y/Z triplet in df."""
+    prefixes = sorted({c.replace("_ACC_X", "") for c in df.columns if c.endswith("_ACC_X")})
+    return build_sensors_from_prefixes(df, prefixes, COL_PATTERNS)
+
+
+def detect_accel_units_and_scale(acc_static):
+    acc_static = np.asarray(acc_static, float)
+    mag = np.linalg.norm(acc_static, axis=1)
+    med = float(np.median(mag))
+    if 0.3 <= med <= 2.5:
+        return {"unit_label": "g", "scale_to_g": 1.0, "median_mag": med}
+    if 6.0 <= med <= 14.0:
+        return {"unit_label": "m/s^2", "scale_to_g": 1.0 / G0, "median_mag": med}
+    counts_per_g = med
+    return {"unit_label": "raw", "scale_to_g": 1.0 / counts_per_g,
+            "median_mag": med, "counts_per_g_est": counts_per_g}
+
+
+def normalize(v, eps=1e-12):
+    v = np.asarray(v, float)
+    n = np.linalg.norm(v)
+    if n < eps:
+        raise ValueError("Cannot normalize near-zero vector")
+    return v / n
+
+
+def rot_between(a, b):
+    """Rotation matrix R such that R @ a ≈ b (Rodrigues)."""
+    a = normalize(a); b = normalize(b)
+    v = np.cross(a, b)
+    c = float(np.clip(np.dot(a, b), -1.0, 1.0))
+    s = np.linalg.norm(v)
+    if s < 1e-12:
+        if c > 0:
+            return np.eye(3)
+        tmp = np.array([1, 0, 0]) if abs(a[0]) < 0.9 else np.array([0, 1, 0])
+        axis = normalize(np.cross(a, tmp))
+        K = np.array([[0, -axis[2], axis[1]],
+                      [axis[2], 0, -axis[0]],
+                      [-axis[1], axis[0], 0]])
+        return np.eye(3) + 2 * (K @ K)
+    K = np.array([[0, -v[2], v[1]],
+                  [v[2], 0, -v[0]],
+                  [-v[1], v[0], 0]])
+    return np.eye(3) + K + (K @ K) * ((1 - c) / (s ** 2))
+
+
+def rotate_series(R, V):
+    return (R @ np.asarray(V, float).T).T
+
+
+def angle_deg(u, v):
+    u = normalize(u); v = normalize(v)
+    c = float(np.clip(np.dot(u, v), -1.0, 1.0))
+    return float(np.degrees(np.arccos(c)))
+
+
+def rot_y(theta):
+    """Rotation matrix about Y axis (right-hand rule). Used to fix heading (forward) in horizontal plane."""
+    c, s = np.cos(theta), np.sin(theta)
+    return np.array([[c, 0, s], [0, 1, 0], [-s, 0, c]])
+
+
+def is_foot(sensor_name):
+    return "FOOT" in sensor_name.upper()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Dataset registry
+# ══════════════════════════════════════════════════════════════════════════════
+
+# name -> {"fs", "default", "foot", "rotations", "static_win", "static_step", "rotate_gyro", "suffix"}
+#   default    rotation for any sensor not listed in rotations
+#   foot       rotation for *_FOOT sensors not listed in rotations (None: use default)
+#   rotations  per-segment overrides {"L_SHANK": R, ...}
+#   static_win / static_step   static-window search, in samples
+#   suffix     appended to the output file stem (YARETA writes <stem>_isb)
+DATASETS = {}
+
+
+def register_dataset(name, fs, default, foot=None, rotations=None,
+                     static_win=300, static_step=50, rotate_gyro=True, suffix=""):
+    """
+    Register (or replace) the coordinate-sync settings of a dataset. Rotation keys
+    must be SENSOR_SEGMENTS names; any other key would never match a harmonized column.
+    """
+    unknown = sorted(set(rotations or {}) - set(SENSOR_SEGMENTS))
+    if unknown:
+        raise KeyError(f"{name}: rotation keys {unknown} are not SENSOR_SEGMENTS names")
+    DATASETS[name] = {
+        "fs": fs,
+        "default": np.asarray(default, float),
+        "foot": None if foot is None else np.asarray(foot, float),
+        "rotations": {k: np.asarray(v, float) for k, v in (rotations or {}).items()},
+        "static_win": static_win,
+        "static_step": static_step,
+        "rotate_gyro": rotate_gyro,
+        "suffix": suffix,
+    }
+    return DATASETS[name]
+
+
+def get_dataset(name):
+    """Registry entry for name (case-insensitive)."""
+    for key, cfg in DATASETS.items():
+        if key.upper() == name.upper():
+            return key, cfg
+    known = ", ".join(DATASETS)
+    if name.upper() == "NEWBEE":
+        raise KeyError("NEWBEE rotations come from the Xsens quaternions; run NEWBEE_coord_rotation_CL.py")
+    raise KeyError(f"No coordinate-sync settings for '{name}' (registered: {known})")
+
+
+def rotation_for(cfg, sensor):
+    """Sensor → ISB rotation: per-segment override, then foot, then the default."""
+    if sensor in cfg["rotations"]:
+        return cfg["rotations"][sensor]
+    if cfg["foot"] is not None and is_foot(sensor):
+        return cfg["foot"]
+    return cfg["default"]
+
+
+# Fixed analytic rotation matrices (from HuGaDB documentation)
+R_body = np.array([[ 0,  0, -1],
+                   [ 1,  0,  0],
+                   [ 0, -1,  0]], dtype=float)
+
+R_foot = np.array([[ 0,  0, -1],
+                   [ 1,  0,  0],
+                   [ 0, -1,  0]], dtype=float)
+
+register_dataset("YARETA", fs=DATASET_FS["YARETA"], default=R_body, foot=R_foot, suffix="_isb")
+register_dataset("CAMARGO", fs=DATASET_FS["CAMARGO"], default=R_body, foot=R_foot)
+
+# RealWorldHAR (from the dataset's phone-placement pictures); v_isb = R @ v_sensor.
+# Body sensors: X=right, Y=up (toward screen top), Z=outward from screen
+#   ISB X = -sensor Z, ISB Y = -sensor Y, ISB Z = sensor X
+R_RWHAR_BODY = np.array([[0,  0, -1],
+                         [0, -1,  0],
+                         [1,  0,  0]], dtype=float)
+# Forearm / head: target X = -sensor Y, Y = sensor X, Z = sensor Z
+R_RWHAR_FOREARM = np.array([[0, -1, 0],
+                            [1,  0, 0],
+                            [0,  0, 1]], dtype=float)
+# Shank / upper arm / trunk: Y and Z flipped
+R_RWHAR_FLIP_YZ = np.array([[1,  0,  0],
+                            [0, -1,  0],
+                            [0,  0, -1]], dtype=float)
+# Pelvis: target X = sensor Y, Y = -sensor X, Z = sensor Z
+R_RWHAR_PELVIS = np.array([[ 0, 1, 0],
+                           [-1, 0, 0],
+                           [ 0, 0, 1]], dtype=float)
+
+register_dataset("RealWorldHAR", fs=DATASET_FS["RealWorldHAR"], default=R_RWHAR_BODY, rotations={
+    "HEAD": R_RWHAR_FOREARM,
+    "L_FOREARM": R_RWHAR_FOREARM,
+    "L_SHANK": R_RWHAR_FLIP_YZ,
+    "L_ARM": R_RWHAR_FLIP_YZ,
+    "PELVIS": R_RWHAR_PELVIS,
+    "TRUNK": R_RWHAR_FLIP_YZ,
+})
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Core processing
+# ══════════════════════════════════════════════════════════════════════════════
+
+def rotate_sensors(df, sensors, cfg):
+    """
+    Rotate every sensor into ISB in one pass. Returns (block, columns, report, rotations):
+    block is the (n, len(columns)) float64 array of rotated ACC (in g) and GYR channels,
+    sensor by sensor, ACC before GYR.
+
+    Static windows and unit scales are found per sensor; the rotation itself is one
+    einsum over the stacked (n, triplets, 3) data and the (triplets, 3, 3) matrices.
+    """
+    win = min(cfg["static_win"], len(df))
+    columns, mats, scales, report, rotations = [], [], [], [], {}
+    for s, m in sensors.items():
+        acc_cols = m["acc"]
+        gyr_cols = m["gyr"] if cfg["rotate_gyro"] else None
+
+        acc_raw = df.loc[:, acc_cols].to_numpy(float)
+        gyr_raw = df.loc[:, m["gyr"]].to_numpy(float) if m["gyr"] is not None else None
+
+        ws, we = find_static_window(acc_raw, gyr=gyr_raw, win=win, step=cfg["static_step"])
+        info  = detect_accel_units_and_scale(acc_raw[ws:we])
+        scale = float(info["scale_to_g"])
+
+        R = rotation_for(cfg, s)
+        rotations[s] = R
+        columns.extend(acc_cols)
+        mats.append(R)
+        scales.append(scale)
+        if gyr_cols is not None:
+            columns.extend(gyr_cols)
+            mats.append(R)
+            scales.append(1.0)
+
+        g_after   = R @ (acc_raw[ws:we].mean(axis=0) * scale)
+        ang_after = angle_deg(g_after, ISB_DOWN)
+
+        report.append({
+            "sensor":                   s,
+            "static_start":             int(ws),
+            "static_end":               int(we),
+            "static_seconds":           (we - ws) / cfg["fs"],
+            "detected_unit":            info["unit_label"],
+            "scale_to_g":               scale,
+            "gravity_angle_after_deg":  ang_after,
+        })
+
+    n = len(df)
+    data = df[columns].to_numpy(float).reshape(n, len(mats), 3)
+    if any(sc != 1.0 for sc in scales):
+        data = data * np.asarray(scales)[None, :, None]
+    block = np.einsum("kij,nkj->nki", np.stack(mats), data, optimize=True).reshape(n, len(columns))
+    return block, columns, report, rotations
+
+
+def assemble_output(df, block, columns):
+    """df with `columns` replaced by the rotated block; column order and other columns unchanged."""
+    rotated = pd.DataFrame(block, columns=columns, index=df.index, copy=False)
+    kept = [c for c in df.columns if c not in set(columns)]
+    return pd.concat([rotated, df[kept]], axis=1)[list(df.columns)]
+
+
+def sync_frame(df, cfg):
+    """Rotate a loaded table. Returns (df_out, report, sensors, rotations), or None without IMU columns."""
+    sensors = detect_sensors(df)
+    if not sensors:
+        return None
+    block, columns, report, rotations = rotate_sensors(df, sensors, cfg)
+    return assemble_output(df, block, columns), report, sensors, rotations
+
+
+def output_path_for(in_path, input_root, output_root, cfg, fmt=None):
+    """Mirror input_root/<rel>/<stem>.csv to output_root/<rel>/<stem><suffix><ext>."""
+    rel = os.path.relpath(in_path, input_root)
+    stem = os.path.splitext(rel)[0]
+    return os.path.join(output_root, stem + cfg["suffix"] + table_ext(fmt))
+
+
+def report_path_for(out_path):
+    return os.path.splitext(out_path)[0] + "_report.json"
+
+
+def sync_file(in_path, out_path, cfg, fmt=None):
+    """Rotate one table and write it plus its JSON report. Returns the report, or None if skipped."""
+    df = read_table(in_path)
+    df.columns = df.columns.str.strip()
+    result = sync_frame(df, cfg)
+    if result is None:
+        return None
+    df_out, report, _, _ = result
+    write_table(df_out, out_path, fmt=fmt)
+    with open(report_path_for(out_path), "w") as f:
+        json.dump({"input": os.path.abspath(in_path), "sensors": report}, f, indent=1)
+    return report
+
+
+def _table_bytes(path):
+    """Size of a table file, or of the files in a .chan store (scheduling weight)."""
+    if os.path.isdir(path):
+        return sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+    return os.path.getsize(path)
+
+
+def _sync_one(in_path, out_path, cfg, fmt):
+    """sync_file for a worker process; returns (in_path, status, seconds, message)."""
+    t0 = time.perf_counter()
+    try:
+        report = sync_file(in_path, out_path, cfg, fmt)
+        status, msg = ("ok", "") if report is not None else ("skipped", "no IMU columns")
+    except Exception as e:
+        status, msg = "failed", f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    return in_path, status, time.perf_counter() - t0, msg
+
+
+def sync_dataset(name, input_root=None, output_root=None, workers=1, fmt=None):
+    """Rotate every table of a registered dataset; largest files first when workers > 1."""
+    key, cfg = get_dataset(name)
+    input_root = input_root or os.path.join(SYNCED_DIR, key)
+    output_root = output_root or os.path.join(COORDS_SYNCED_DIR, key)
+    files = find_table_files(input_root)
+    if not files:
+        print(f"{YELLOW}[WARN] No tables found under {input_root}{RESET}")
+        return {}
+    files.sort(key=_table_bytes, reverse=True)
+    jobs = [(p, output_path_for(p, input_root, output_root, cfg, fmt)) for p in files]
+
+    print(f"{BLUE}COORD SYNC: {key} ({len(jobs)} files, fs={cfg['fs']:g} Hz){RESET}")
+    print(f"  {input_root} → {output_root}")
+    if workers > 1:
+        print(f"  Workers: {workers}")
+
+    t0 = time.perf_counter()
+    results = {}
+
+    def done(result):
+        in_path, status, seconds, msg = result
+        results[in_path] = status
+        rel = os.path.relpath(in_path, input_root)
+        color = GREEN if status == "ok" else (YELLOW if status == "skipped" else RED)
+        print(f"  {color}[{status.upper()}]{RESET} {rel}  {seconds:.2f} s" + (f": {msg}" if msg else ""))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_sync_one, inp, out, cfg, fmt) for inp, out in jobs]
+            for fut in as_completed(futures):
+                done(fut.result())
+    else:
+        for inp, out in jobs:
+            done(_sync_one(inp, out, cfg, fmt))
+
+    counts = {s: list(results.values()).count(s) for s in ("ok", "skipped", "failed")}
+    print(f"\n{BLUE}SUMMARY{RESET}: {counts['ok']} rotated, {counts['skipped']} skipped, "
+          f"{counts['failed']} failed in {time.perf_counter() - t0:.1f} s")
+    record_outputs(out for inp, out in jobs if results.get(inp) == "ok")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", choices=[d for d in DATASET_ROOTS if d in DATASETS],
+                        help="Registered dataset")
+    parser.add_argument("--input-root", default=None, help="Default: 01_columns_synced/<dataset>")
+    parser.add_argument("--output-root", default=None, help="Default: 02_coords_synced/<dataset>")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Rotate files on a pool of N processes (default: 1, serial)")
+    parser.add_argument("--format", choices=TABLE_FORMATS, default=None,
+                        help="Output table format (default: OUTPUT_FORMAT in config.py)")
+    args = parser.parse_args()
+    sync_dataset(args.dataset, args.input_root, args.output_root, workers=args.workers, fmt=args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Low-motion ("static") window detection shared by the coordinate-sync scripts.
+
+Every candidate window [s, s + win) with s a multiple of step is scored as
+
+    mean(|gyr|) + 0.5 * mean over axes of std(acc)     (gyro available)
+    mean over axes of std(acc)                          (accelerometer only)
+
+and the first window with the lowest score is returned. Window sums come from
+cumulative sums of x and x^2, so the cost is O(N) per sensor instead of O(N * win).
+Those sums carry rounding error (a flat window may score 1e-9 instead of 0), so
+every window within the error bound of the minimum is re-scored exactly with
+np.std, as the original per-window loop did, and the first exact minimum wins.
+Windows containing NaN are never chosen.
+"""
+
+import numpy as np
+
+
+def _window_sums(x, starts, win):
+    """Per-window sum of x and of x^2 for each column of x (shape (n_windows, n_cols)),
+    plus the number of NaN samples per window."""
+    x = x - np.nanmean(x, axis=0)  # centre first: keeps E[x^2] - E[x]^2 well conditioned
+    nan = np.isnan(x)
+    x = np.where(nan, 0.0, x)
+    zero = np.zeros((1, x.shape[1]))
+    c1 = np.concatenate([zero, np.cumsum(x, axis=0)])
+    c2 = np.concatenate([zero, np.cumsum(x * x, axis=0)])
+    cn = np.concatenate([[0], np.cumsum(nan.any(axis=1))])
+    return c1[starts + win] - c1[starts], c2[starts + win] - c2[starts], cn[starts + win] - cn[starts]
+
+
+def window_scores(acc, gyr=None, win=300, step=50):
+    """Scores of the windows starting at 0, step, 2*step, ...; NaN-containing windows score inf.
+    Returns (starts, scores)."""
+    acc = np.asarray(acc, float)
+    if acc.ndim == 1:
+        acc = acc[:, None]
+    starts = np.arange(0, len(acc) - win + 1, step)
+
+    s1, s2, n_nan = _window_sums(acc, starts, win)
+    mean = s1 / win
+    std = np.sqrt(np.maximum(s2 / win - mean * mean, 0.0))
+    scores = std.mean(axis=1)
+
+    if gyr is not None:
+        gyr = np.asarray(gyr, float)
+        gyr_mag = np.linalg.norm(gyr.reshape(len(gyr), -1), axis=1)
+        g_nan = np.isnan(gyr_mag)
+        cg = np.concatenate([[0.0], np.cumsum(np.where(g_nan, 0.0, gyr_mag))])
+        cgn = np.concatenate([[0], np.cumsum(g_nan)])
+        scores = (cg[starts + win] - cg[starts]) / win + 0.5 * scores
+        n_nan = n_nan + (cgn[starts + win] - cgn[starts])
+
+    scores[n_nan > 0] = np.inf
+    return starts, scores
+
+
+def _exact_score(acc, gyr_mag, s, win):
+    """Score of one window computed directly (the original per-window loop)."""
+    score = float(np.mean(np.std(acc[s:s + win], axis=0)))
+    if gyr_mag is None:
+        return score
+    return float(np.mean(gyr_mag[s:s + win]) + 0.5 * score)
+
+
+def _score_tolerance(acc, gyr_mag, win):
+    """Upper bound on the rounding error of window_scores (cumulative-sum cancellation)."""
+    eps = np.finfo(float).eps
+    n = len(acc)
+    centred = acc - np.nanmean(acc, axis=0)
+    var_err = n * eps * float(np.nanmax(np.nansum(centred * centred, axis=0))) / win
+    tol = np.sqrt(var_err)
+    if gyr_mag is not None:
+        tol = 0.5 * tol + n * eps * float(np.nansum(np.abs(gyr_mag))) / win
+    return tol
+
+
+def find_static_window(acc, gyr=None, win=300, step=50):
+    """Best-effort low-motion window. Uses gyro if present; otherwise accel variance only.
+    Returns (start, end) sample indices."""
+    N = len(acc)
+    if N <= win:
+        return 0, N
+    starts, scores = window_scores(acc, gyr=gyr, win=win, step=step)
+    if not np.isfinite(scores).any():
+        return 0, win
+    acc = np.asarray(acc, float)
+    if acc.ndim == 1:
+        acc = acc[:, None]
+    gyr_mag = None
+    if gyr is not None:
+        gyr = np.asarray(gyr, float)
+        gyr_mag = np.linalg.norm(gyr.reshape(len(gyr), -1), axis=1)
+    best = scores.min()
+    tol = _score_tolerance(acc, gyr_mag, win) + 1e-12 * abs(best)
+    candidates = starts[scores <= best + tol]
+    exact = [_exact_score(acc, gyr_mag, int(s), win) for s in candidates]
+    s = int(candidates[int(np.argmin(exact))])
+    return s, s + win
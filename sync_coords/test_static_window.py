@@ -0,0 +1,70 @@
+"""find_static_window must pick the same window as the original per-window loop."""
+
+import numpy as np
+import pytest
+
+from sync_coords.static_window import find_static_window
+
+
+def loop_static_window(acc, gyr=None, win=300, step=50):
+    """The per-window loop find_static_window replaced (YARETA_synced_coord_SVS.py)."""
+    acc = np.asarray(acc, float)
+    N = len(acc)
+    if N <= win:
+        return 0, N
+
+    def acc_stability(a):
+        return float(np.mean(np.std(a, axis=0)))
+
+    if gyr is not None:
+        gyr_mag = np.linalg.norm(np.asarray(gyr, float), axis=1)
+
+        def score(s, e):
+            return float(np.mean(gyr_mag[s:e]) + 0.5 * acc_stability(acc[s:e]))
+    else:
+        def score(s, e):
+            return float(acc_stability(acc[s:e]))
+
+    best = (np.inf, 0, win)
+    for s in range(0, N - win + 1, step):
+        e = s + win
+        sc = score(s, e)
+        if sc < best[0]:
+            best = (sc, s, e)
+    return best[1], best[2]
+
+
+def test_flat_segment_between_noise():
+    rng = np.random.default_rng(0)
+    acc = np.vstack([rng.normal(size=(700, 3)),
+                     np.tile([0.1, 0.2, 1.0], (1000, 1)),
+                     rng.normal(size=(700, 3))])
+    assert find_static_window(acc) == loop_static_window(acc) == (700, 1000)
+
+
+def _case(rng):
+    n = int(rng.integers(400, 4000))
+    acc = rng.normal(size=(n, 3)) * rng.uniform(0.01, 2.0) + rng.normal(size=3) * 5
+    kind = rng.integers(3)
+    if kind == 0:      # quantized, as raw ADC counts
+        acc = np.round(acc * rng.choice([1, 4, 16])) / 16
+    elif kind == 1:    # one or more perfectly flat stretches
+        for _ in range(int(rng.integers(1, 4))):
+            a = int(rng.integers(0, n - 1))
+            acc[a:a + int(rng.integers(100, 1200))] = acc[a]
+    else:              # both
+        acc = np.round(acc)
+        a = int(rng.integers(0, n - 1))
+        acc[a:a + 800] = acc[a]
+    gyr = None
+    if rng.random() < 0.5:
+        gyr = np.round(rng.normal(size=(n, 3)) * rng.choice([0.0, 0.1, 1.0]), 2)
+    return acc, gyr
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_per_window_loop(seed):
+    rng = np.random.default_rng(seed)
+    acc, gyr = _case(rng)
+    win, step = int(rng.choice([100, 300])), int(rng.choice([10, 50]))
+    assert find_static_window(acc, gyr, win, step) == loop_static_window(acc, gyr, win, step)
@@ -0,0 +1 @@
+"""Sampling-rate and unit harmonization of coordinate-synced sensor data."""
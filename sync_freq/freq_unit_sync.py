@@ -0,0 +1,437 @@
+"""
+Frequency and unit harmonization: 02_coords_synced → 04_freq_unit_synced.
+
+Every trial is resampled to one common rate (TARGET_FS in config.py, or --fs)
+with a polyphase FIR filter (scipy.signal.resample_poly), and its sensor
+channels are brought to common units:
+
+  ACC  g      (m/s^2 or raw counts detected over the static window, as in sync_coords/engine.py)
+  GYR  rad/s  (deg/s detected from the angular-rate magnitude, see detect_gyro_units)
+  MAG  unchanged
+
+Units listed in DATASET_UNITS (config.py) are taken as given instead of detected.
+Long files are streamed: the body is read in --chunksize row chunks and each
+chunk is filtered with enough overlap that the result is identical to filtering
+the whole trial at once. All sensor channels of a chunk are filtered together
+as one (rows, channels) block. Numeric time columns (TIME_COLUMN_RE) are
+interpolated linearly, so they keep even spacing at the new rate; other
+non-sensor columns (activity labels, ...) take the value of the nearest input sample.
+
+Each output root gets a 00_freq_unit.json with the common rate and the units
+detected per file; stage_fs(path) reads it back, so downstream scripts do not
+need to be told the sampling rate.
+
+Usage:
+  python freq_unit_sync.py NEWBEE                      # 02_coords_synced/NEWBEE → 04_freq_unit_synced/NEWBEE
+  python freq_unit_sync.py CAMARGO --fs 100 --workers 8
+  python freq_unit_sync.py HUGADB --input-root IN --output-root OUT --source-fs 56.35
+  python freq_unit_sync.py YARETA --format parquet --chunksize 200000
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fractions import Fraction
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.signal import resample_poly
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from sync_columns.config import (
+    BLUE, GREEN, YELLOW, RED, RESET, AXES, COORDS_SYNCED_DIR, FREQ_UNIT_SYNCED_DIR,
+    DATASET_FS, DATASET_UNITS, TARGET_FS,
+)
+from sync_columns.catalog import record_outputs
+from sync_columns.table_io import (
+    TABLE_FORMATS, ParquetChunkWriter, find_table_files, format_of, is_sensor_column, read_table,
+    read_table_columns, resolve_format, table_ext, write_table,
+)
+from sync_coords.engine import G0, detect_accel_units_and_scale, detect_sensors, find_static_window
+
+DEFAULT_CHUNKSIZE = 100_000      # input rows per chunk
+MAX_RATIO_DENOMINATOR = 1000     # up/down are kept below this (56.35 → 100 Hz: 1063/599)
+GYR_DEG_THRESHOLD = 20.0         # 99th-percentile |gyr| above this (rad/s ≈ 1150 deg/s) means deg/s
+STAGE_FILE = "00_freq_unit.json"
+TIME_COLUMN_RE = re.compile(r"time|^t$|^sec(onds)?$", re.IGNORECASE)  # time / timestamp / time_s / ...
+
+STATIC_WIN = 300
+STATIC_STEP = 50
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Resampling
+# ══════════════════════════════════════════════════════════════════════════════
+
+def resample_ratio(fs_in, fs_out, max_den=MAX_RATIO_DENOMINATOR):
+    """(up, down) with fs_in * up / down ≈ fs_out."""
+    ratio = Fraction(fs_out / fs_in).limit_denominator(max_den)
+    return ratio.numerator, ratio.denominator
+
+
+class PolyphaseStream:
+    """
+    resample_poly over a stream of row chunks.
+
+    Input is buffered and filtered in segments that start on a multiple of `down`
+    and overlap the neighbouring segments by at least the filter half-width, so
+    every output sample sees exactly the input it would see in a single
+    resample_poly call over the whole signal. Optional non-filtered columns
+    (`other`, a DataFrame) follow along and are picked at the nearest input sample,
+    except the numeric `time_columns`, which are interpolated linearly (and
+    extrapolated past the last input sample).
+    """
+
+    def __init__(self, up, down, time_columns=()):
+        self.up, self.down = up, down
+        self.time_columns = list(time_columns)
+        half_len = 10 * max(up, down)  # resample_poly's default filter half-length
+        pad = math.ceil(half_len / up) + 1
+        self.pad = -(-pad // down) * down
+        self._buf = None
+        self._other = None
+        self._start = 0       # global index of _buf[0] (a multiple of down)
+        self._done_in = 0     # input samples whose outputs have been emitted (a multiple of down)
+        self.rows_in = 0
+
+    def feed(self, values, other=None):
+        """Add a chunk; returns (filtered, other_rows) for every output that is now final."""
+        values = np.asarray(values, dtype=np.float64)
+        if self._buf is None:
+            self._buf, self._other = values, other
+        else:
+            self._buf = np.concatenate([self._buf, values])
+            if other is not None:
+                self._other = pd.concat([self._other, other], ignore_index=True)
+        self.rows_in += len(values)
+        ready = (self.rows_in - self.pad) // self.down * self.down
+        if ready <= self._done_in:
+            return self._empty()
+        out = self._emit(ready, ready * self.up // self.down)
+        # Keep `pad` samples of history before the next segment
+        keep = ready - self.pad - self._start
+        if keep > 0:
+            self._buf = self._buf[keep:]
+            if self._other is not None:
+                self._other = self._other.iloc[keep:].reset_index(drop=True)
+            self._start += keep
+        return out
+
+    def finish(self):
+        """Outputs for the rest of the signal (resample_poly length: ceil(n * up / down))."""
+        if self._buf is None:
+            return self._empty()
+        return self._emit(self.rows_in, -(-self.rows_in * self.up // self.down), final=True)
+
+    def _emit(self, end_in, end_out, final=False):
+        """Filter [done_in - pad, end_in + pad) and return outputs [done_in*up/down, end_out)."""
+        up, down = self.up, self.down
+        a = max(self._start, self._done_in - self.pad)
+        b = min(self.rows_in, end_in + self.pad)
+        seg = self._buf[a - self._start:b - self._start]
+        if up == down:
+            y = seg
+        else:
+            y = resample_poly(seg, up, down, axis=0)
+        k0 = self._done_in * up // down
+        lo, hi = k0 - a * up // down, end_out - a * up // down
+        filtered = y[lo:hi]
+
+        other = None
+        if self._other is not None:
+            k = np.arange(k0, end_out)
+            src = np.floor(k * down / up + 0.5).astype(np.int64)
+            if final:
+                src = np.minimum(src, self.rows_in - 1)
+            other = self._other.iloc[src - self._start].reset_index(drop=True)
+            times = [c for c in self.time_columns
+                     if c in other.columns and pd.api.types.is_numeric_dtype(self._other[c])]
+            if times and self.rows_in > 1:
+                lo = np.minimum(k * down // up, self.rows_in - 2)
+                frac = (k * down - lo * up) / up
+                for c in times:
+                    t = self._other[c].to_numpy(np.float64)
+                    t0, t1 = t[lo - self._start], t[lo + 1 - self._start]
+                    other[c] = t0 + frac * (t1 - t0)
+        self._done_in = end_in
+        return filtered, other
+
+    def _empty(self):
+        width = 0 if self._buf is None else self._buf.shape[1]
+        other = None if self._other is None else self._other.iloc[:0]
+        return np.empty((0, width)), other
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Units
+# ══════════════════════════════════════════════════════════════════════════════
+
+def detect_gyro_units(gyr):
+    """
+    deg/s vs rad/s from the angular-rate magnitude: human segment rates stay well
+    below GYR_DEG_THRESHOLD rad/s, so a 99th percentile above it means deg/s.
+    Very quiet trials in deg/s can pass as rad/s; list such datasets in DATASET_UNITS.
+    """
+    norm = np.linalg.norm(np.asarray(gyr, float), axis=1)
+    p99 = float(np.nanpercentile(norm, 99)) if np.isfinite(norm).any() else 0.0
+    if p99 > GYR_DEG_THRESHOLD:
+        return {"unit_label": "deg/s", "scale_to_rad_s": math.pi / 180.0, "p99_norm": p99}
+    return {"unit_label": "rad/s", "scale_to_rad_s": 1.0, "p99_norm": p99}
+
+
+ACC_SCALES = {"g": 1.0, "m/s^2": 1.0 / G0}
+GYR_SCALES = {"rad/s": 1.0, "deg/s": math.pi / 180.0}
+
+
+def detect_units(df, declared=None):
+    """
+    Per sensor {"ACC": info, "GYR": info}; info has "unit_label" and "scale" (multiply
+    to get g or rad/s) and "source" ("declared" or "detected").
+    """
+    declared = declared or {}
+    units = {}
+    for s, m in detect_sensors(df).items():
+        acc = df.loc[:, m["acc"]].to_numpy(float)
+        gyr = df.loc[:, m["gyr"]].to_numpy(float) if m["gyr"] is not None else None
+        entry = {}
+        if "ACC" in declared:
+            entry["ACC"] = {"unit_label": declared["ACC"], "scale": ACC_SCALES[declared["ACC"]], "source": "declared"}
+        else:
+            ws, we = find_static_window(acc, gyr=gyr, win=min(STATIC_WIN, len(df)), step=STATIC_STEP)
+            info = detect_accel_units_and_scale(acc[ws:we])
+            entry["ACC"] = {"unit_label": info["unit_label"], "scale": float(info["scale_to_g"]), "source": "detected"}
+        if gyr is not None:
+            if "GYR" in declared:
+                entry["GYR"] = {"unit_label": declared["GYR"], "scale": GYR_SCALES[declared["GYR"]], "source": "declared"}
+            else:
+                info = detect_gyro_units(gyr)
+                entry["GYR"] = {"unit_label": info["unit_label"], "scale": info["scale_to_rad_s"], "source": "detected"}
+        units[s] = entry
+    return units
+
+
+def column_scales(columns, units):
+    """Scale factor for each sensor column (1.0 for MAG and undetected sensors)."""
+    by_col = {f"{s}_{sensor_type}_{ax}": info["scale"]
+              for s, entry in units.items() for sensor_type, info in entry.items() for ax in AXES}
+    return np.array([by_col.get(c, 1.0) for c in columns])
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Files
+# ══════════════════════════════════════════════════════════════════════════════
+
+def iter_table_chunks(path, chunksize):
+    """Row chunks of a table: CSV is streamed, Parquet / channel stores are sliced."""
+    if format_of(path) == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize)
+        return
+    df = read_table(path)
+    for lo in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[lo:lo + chunksize].reset_index(drop=True)
+
+
+class TableChunkWriter:
+    """Append DataFrame chunks to a CSV or Parquet file; channel stores are written once on close."""
+
+    def __init__(self, path, fmt):
+        self.path, self.fmt = path, resolve_format(fmt)
+        self.rows_written = 0
+        self._parquet = None
+        self._frames = []
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self.fmt == "csv" and os.path.exists(path):
+            os.remove(path)
+
+    def write(self, df):
+        if self.fmt == "parquet":
+            if self._parquet is None:
+                self._parquet = ParquetChunkWriter(self.path)
+            self._parquet.write(df)
+        elif self.fmt == "csv":
+            df.to_csv(self.path, mode="a", header=self.rows_written == 0, index=False)
+        else:
+            self._frames.append(df)
+        self.rows_written += len(df)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        elif self._frames:
+            write_table(pd.concat(self._frames, ignore_index=True), self.path, fmt=self.fmt)
+            self._frames = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def harmonize_file(in_path, out_path, fs_in, fs_out=TARGET_FS, declared=None,
+                   chunksize=DEFAULT_CHUNKSIZE, fmt=None):
+    """
+    Resample one table to fs_out and convert its units. Returns the per-file record
+    for 00_freq_unit.json, or None if the table has no sensor columns.
+    """
+    columns = [c.strip() for c in read_table_columns(in_path)]
+    sensor_cols = [c for c in columns if is_sensor_column(c)]
+    if not sensor_cols:
+        return None
+    other_cols = [c for c in columns if c not in set(sensor_cols)]
+
+    up, down = resample_ratio(fs_in, fs_out)
+    stream = PolyphaseStream(up, down, time_columns=[c for c in other_cols if TIME_COLUMN_RE.search(c)])
+    units, scales = None, None
+
+    def write(writer, filtered, other):
+        if not len(filtered):
+            return
+        out = pd.DataFrame(filtered, columns=sensor_cols)
+        if other_cols:
+            out = pd.concat([out, other], axis=1)
+        writer.write(out[columns])
+
+    with TableChunkWriter(out_path, fmt) as writer:
+        for chunk in iter_table_chunks(in_path, chunksize):
+            chunk.columns = chunk.columns.str.strip()
+            if units is None:
+                units = detect_units(chunk, declared)  # from the first chunk
+                scales = column_scales(sensor_cols, units)
+            values = chunk[sensor_cols].to_numpy(np.float64) * scales
+            other = chunk[other_cols].reset_index(drop=True) if other_cols else None
+            write(writer, *stream.feed(values, other))
+        write(writer, *stream.finish())
+        rows_out = writer.rows_written
+
+    return {
+        "rows_in": stream.rows_in,
+        "rows_out": rows_out,
+        "units": {s: {t: {k: v for k, v in info.items() if k != "scale"} for t, info in e.items()}
+                  for s, e in (units or {}).items()},
+    }
+
+
+def stage_fs(path):
+    """Sampling rate recorded in the nearest 00_freq_unit.json at or above path (None if absent)."""
+    p = Path(path).resolve()
+    for d in [p] + list(p.parents):
+        stage = d / STAGE_FILE
+        if stage.is_file():
+            with open(stage) as f:
+                return float(json.load(f)["fs"])
+    return None
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# Dataset runner
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _table_bytes(path):
+    if os.path.isdir(path):
+        return sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+    return os.path.getsize(path)
+
+
+def _harmonize_one(in_path, out_path, kw):
+    t0 = time.perf_counter()
+    try:
+        record = harmonize_file(in_path, out_path, **kw)
+        status, msg = ("ok", "") if record is not None else ("skipped", "no sensor columns")
+    except Exception as e:
+        record, status, msg = None, "failed", f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    return in_path, record, status, time.perf_counter() - t0, msg
+
+
+def harmonize_dataset(name, input_root=None, output_root=None, fs_out=TARGET_FS, fs_in=None,
+                      workers=1, chunksize=DEFAULT_CHUNKSIZE, fmt=None):
+    """Resample and unit-convert every table of a dataset; writes <output_root>/00_freq_unit.json."""
+    fs_in = fs_in or DATASET_FS.get(name)
+    if fs_in is None:
+        raise KeyError(f"No sampling rate for '{name}' in DATASET_FS; pass --source-fs")
+    input_root = input_root or os.path.join(COORDS_SYNCED_DIR, name)
+    output_root = output_root or os.path.join(FREQ_UNIT_SYNCED_DIR, name)
+    fmt = resolve_format(fmt)
+    files = find_table_files(input_root)
+    if not files:
+        print(f"{YELLOW}[WARN] No tables found under {input_root}{RESET}")
+        return {}
+    files.sort(key=_table_bytes, reverse=True)
+    up, down = resample_ratio(fs_in, fs_out)
+    kw = {"fs_in": fs_in, "fs_out": fs_out, "declared": DATASET_UNITS.get(name),
+          "chunksize": chunksize, "fmt": fmt}
+
+    print(f"{BLUE}FREQ/UNIT SYNC: {name} ({len(files)} files, {fs_in:g} Hz → {fs_out:g} Hz, up={up} down={down}){RESET}")
+    print(f"  {input_root} → {output_root}")
+    if workers > 1:
+        print(f"  Workers: {workers}")
+
+    records = {}
+    t0 = time.perf_counter()
+
+    def done(result):
+        in_path, record, status, seconds, msg = result
+        rel = os.path.relpath(in_path, input_root)
+        if record is not None:
+            records[rel] = record
+        color = GREEN if status == "ok" else (YELLOW if status == "skipped" else RED)
+        print(f"  {color}[{status.upper()}]{RESET} {rel}  {seconds:.2f} s" + (f": {msg}" if msg else ""))
+
+    jobs = [(p, os.path.join(output_root, os.path.splitext(os.path.relpath(p, input_root))[0] + table_ext(fmt)))
+            for p in files]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_harmonize_one, inp, out, kw) for inp, out in jobs]
+            for fut in as_completed(futures):
+                done(fut.result())
+    else:
+        for inp, out in jobs:
+            done(_harmonize_one(inp, out, kw))
+
+    os.makedirs(output_root, exist_ok=True)
+    stage_path = os.path.join(output_root, STAGE_FILE)
+    tmp = stage_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"fs": fs_out, "source_fs": fs_in, "up": up, "down": down,
+                   "files": dict(sorted(records.items()))}, f, indent=1)
+    os.replace(tmp, stage_path)
+    print(f"\n{BLUE}SUMMARY{RESET}: {len(records)} / {len(jobs)} files at {fs_out:g} Hz "
+          f"in {time.perf_counter() - t0:.1f} s → {stage_path}")
+    record_outputs(out for inp, out in jobs if os.path.relpath(inp, input_root) in records)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", help="Dataset name (e.g. NEWBEE, YARETA)")
+    parser.add_argument("--fs", type=float, default=TARGET_FS,
+                        help=f"Common output rate in Hz (default: TARGET_FS = {TARGET_FS:g})")
+    parser.add_argument("--source-fs", type=float, default=None,
+                        help="Input rate in Hz (default: DATASET_FS in config.py)")
+    parser.add_argument("--input-root", default=None, help="Default: 02_coords_synced/<dataset>")
+    parser.add_argument("--output-root", default=None, help="Default: 04_freq_unit_synced/<dataset>")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Process files on a pool of N processes (default: 1, serial)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, metavar="ROWS",
+                        help=f"Input rows per chunk (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--format", choices=TABLE_FORMATS, default=None,
+                        help="Output table format (default: OUTPUT_FORMAT in config.py)")
+    args = parser.parse_args()
+
+    name = next((k for k in DATASET_FS if k.upper() == args.dataset.upper()), args.dataset)
+    harmonize_dataset(name, args.input_root, args.output_root, fs_out=args.fs, fs_in=args.source_fs,
+                      workers=args.workers, chunksize=args.chunksize, fmt=args.format)
+
+
+if __name__ == "__main__":
+    main()